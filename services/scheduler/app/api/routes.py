@@ -1,26 +1,196 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException
+import asyncio
+import logging
+from contextlib import contextmanager
+from typing import Iterator
 
-from ..domain.models import SolveRequest, SolveResponse
-from ..service import scheduler_service
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+
+from ..domain.models import (
+    BatchSolveRequest,
+    BatchSolveResponse,
+    CacheStats,
+    HorizonSolveRequest,
+    HorizonSolveResponse,
+    RepairRequest,
+    ScenarioComparison,
+    ScenarioRequest,
+    SolveJobInfo,
+    SolveRequest,
+    SolveResponse,
+    TemplateInfo,
+    TemplateSolveRequest,
+    TemplateUpload,
+)
+from ..jobs import SolveJob, job_manager
+from ..metrics import CONTENT_TYPE, render
+from ..service import (
+    SchedulerBusyError,
+    SchedulerUnavailableError,
+    scheduler_service,
+)
+from ..templates import UnknownTemplateError
+from .wire import body_of, encode_response, request_body_schema
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/v1", tags=["schedule"])
+# Served at the root path where Prometheus scrapes by default
+metrics_router = APIRouter(tags=["metrics"])
+
+RETRY_AFTER_SECONDS = "5"
 
 
-@router.post("/solve", response_model=SolveResponse)
-async def solve_schedule(request: SolveRequest) -> SolveResponse:
+@contextmanager
+def _service_errors(action: str) -> Iterator[None]:
+    """Map errors raised while the service handles ``action`` to HTTP responses."""
     try:
-        return scheduler_service.generate_schedule(request)
+        yield
+    except HTTPException:
+        raise
+    except UnknownTemplateError as exc:
+        raise HTTPException(status_code=404, detail=f"Unknown template {exc.args[0]}") from exc
+    except SchedulerBusyError as exc:
+        raise HTTPException(
+            status_code=429, detail=str(exc), headers={"Retry-After": RETRY_AFTER_SECONDS}
+        ) from exc
+    except SchedulerUnavailableError as exc:
+        raise HTTPException(
+            status_code=503, detail=str(exc), headers={"Retry-After": RETRY_AFTER_SECONDS}
+        ) from exc
     except ValueError as exc:
         raise HTTPException(status_code=422, detail=str(exc)) from exc
     except Exception as exc:  # pragma: no cover - safety net
-        import traceback
+        logger.exception(f"{action} failed")
+        raise HTTPException(status_code=500, detail=f"{action} failed: {exc}") from exc
+
+
+@router.post("/solve", response_model=SolveResponse, openapi_extra=request_body_schema(SolveRequest))
+async def solve_schedule(
+    http_request: Request, request: SolveRequest = Depends(body_of(SolveRequest))
+) -> Response:
+    with _service_errors("Solve"):
+        return encode_response(http_request, await scheduler_service.solve(request))
+
+
+@router.post(
+    "/solve/batch", response_model=BatchSolveResponse, openapi_extra=request_body_schema(BatchSolveRequest)
+)
+async def solve_batch(
+    http_request: Request, request: BatchSolveRequest = Depends(body_of(BatchSolveRequest))
+) -> Response:
+    with _service_errors("Batch solve"):
+        return encode_response(http_request, await scheduler_service.solve_batch(request))
+
+
+@router.post(
+    "/solve/template", response_model=SolveResponse, openapi_extra=request_body_schema(TemplateSolveRequest)
+)
+async def solve_template(
+    http_request: Request, request: TemplateSolveRequest = Depends(body_of(TemplateSolveRequest))
+) -> Response:
+    with _service_errors("Template solve"):
+        return encode_response(http_request, await scheduler_service.solve_template(request))
+
+
+@router.post(
+    "/solve/horizon", response_model=HorizonSolveResponse, openapi_extra=request_body_schema(HorizonSolveRequest)
+)
+async def solve_horizon(
+    http_request: Request, request: HorizonSolveRequest = Depends(body_of(HorizonSolveRequest))
+) -> Response:
+    with _service_errors("Horizon solve"):
+        return encode_response(http_request, await scheduler_service.solve_horizon(request))
+
+
+@router.post("/repair", response_model=SolveResponse, openapi_extra=request_body_schema(RepairRequest))
+async def repair_schedule(
+    http_request: Request, request: RepairRequest = Depends(body_of(RepairRequest))
+) -> Response:
+    with _service_errors("Repair"):
+        return encode_response(http_request, await scheduler_service.repair(request))
+
+
+@router.post(
+    "/scenarios", response_model=ScenarioComparison, openapi_extra=request_body_schema(ScenarioRequest)
+)
+async def compare_scenarios(
+    http_request: Request, request: ScenarioRequest = Depends(body_of(ScenarioRequest))
+) -> Response:
+    with _service_errors("Scenario comparison"):
+        return encode_response(http_request, await scheduler_service.compare_scenarios(request))
+
+
+@router.post(
+    "/templates", response_model=TemplateInfo, status_code=201, openapi_extra=request_body_schema(TemplateUpload)
+)
+async def upload_template(request: TemplateUpload = Depends(body_of(TemplateUpload))) -> TemplateInfo:
+    with _service_errors("Template upload"):
+        return scheduler_service.templates.put(request)
 
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Solver failed: {exc}") from exc
+
+@router.get("/templates/{version_id}", response_model=TemplateInfo)
+async def get_template(version_id: str) -> TemplateInfo:
+    with _service_errors("Template lookup"):
+        return scheduler_service.templates.info(version_id)
+
+
+@router.post(
+    "/jobs", response_model=SolveJobInfo, status_code=202, openapi_extra=request_body_schema(SolveRequest)
+)
+async def submit_job(request: SolveRequest = Depends(body_of(SolveRequest))) -> SolveJobInfo:
+    with _service_errors("Job submission"):
+        return job_manager.submit(request).info()
+
+
+@router.get("/jobs/{job_id}", response_model=SolveJobInfo)
+async def get_job(job_id: str) -> SolveJobInfo:
+    return _require_job(job_id).info()
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job(job_id: str) -> StreamingResponse:
+    job = _require_job(job_id)
+    return StreamingResponse(
+        job_manager.stream(job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.delete("/jobs/{job_id}", response_model=SolveJobInfo)
+async def cancel_job(job_id: str) -> SolveJobInfo:
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job.info()
+
+
+def _require_job(job_id: str) -> SolveJob:
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job
+
+
+@router.get("/cache/stats", response_model=CacheStats)
+async def cache_stats() -> CacheStats:
+    return await asyncio.to_thread(scheduler_service.cache.stats)  # Counts the SQLite tier
+
+
+@router.delete("/cache", response_model=CacheStats)
+async def clear_cache() -> CacheStats:
+    await asyncio.to_thread(scheduler_service.cache.clear)
+    return await asyncio.to_thread(scheduler_service.cache.stats)
 
 
 @router.get("/health")
 async def health() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    return Response(content=render(), media_type=CONTENT_TYPE)
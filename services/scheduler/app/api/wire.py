@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import gzip
+import hmac
+import zlib
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Type, TypeVar
+
+import msgpack
+import orjson
+from fastapi import HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+from pydantic.fields import SHAPE_DICT, SHAPE_LIST, SHAPE_MAPPING, SHAPE_SINGLETON, ModelField
+
+from ..config import settings
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+_MSGPACK_TYPES = (MSGPACK, "application/x-msgpack")
+
+# Header carrying the shared secret of trusted internal callers
+TRUSTED_TOKEN_HEADER = "X-Scheduler-Token"
+
+# Responses smaller than this are not worth compressing
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 5
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def body_of(model: Type[M]) -> Callable[[Request], Awaitable[M]]:
+    """
+    Dependency parsing the request body into ``model``.
+
+    Accepts JSON or msgpack (``Content-Type``), optionally gzip-compressed
+    (``Content-Encoding: gzip``). Callers presenting the trusted token skip
+    pydantic validation; everyone else gets the usual 422 on invalid input.
+    """
+    _field_plan(model)  # Fields the trusted path cannot build fail when the route is declared
+
+    async def parse(request: Request) -> M:
+        data = decode_body(await request.body(), request.headers)
+        if is_trusted(request):
+            try:
+                return construct_trusted(model, data)
+            except (AttributeError, TypeError, ValueError) as exc:
+                raise HTTPException(status_code=400, detail=f"Malformed trusted payload: {exc}") from exc
+        try:
+            return model.parse_obj(data)
+        except ValidationError as exc:
+            raise RequestValidationError(
+                [{**error, "loc": ("body", *error["loc"])} for error in exc.errors()], body=data
+            ) from exc
+
+    return parse
+
+
+def decode_body(body: bytes, headers: Any) -> Any:
+    encoding = headers.get("content-encoding", "").strip().lower()
+    if encoding == "gzip":
+        try:
+            body = gzip.decompress(body)
+        except (OSError, EOFError, zlib.error) as exc:
+            raise HTTPException(status_code=400, detail="Request body is not valid gzip") from exc
+    elif encoding not in ("", "identity"):
+        raise HTTPException(status_code=415, detail=f"Unsupported Content-Encoding {encoding!r}")
+
+    media_type = headers.get("content-type", JSON).split(";")[0].strip().lower()
+    try:
+        if media_type in _MSGPACK_TYPES:
+            return msgpack.unpackb(body, raw=False)
+        if media_type == JSON or media_type.endswith("+json"):
+            return orjson.loads(body)
+    except (ValueError, msgpack.ExtraData, msgpack.FormatError, msgpack.StackError) as exc:
+        raise HTTPException(status_code=400, detail=f"Request body is not valid {media_type}") from exc
+    raise HTTPException(status_code=415, detail=f"Unsupported Content-Type {media_type!r}")
+
+
+def is_trusted(request: Request) -> bool:
+    token = settings.trusted_caller_token
+    presented = request.headers.get(TRUSTED_TOKEN_HEADER)
+    return bool(token) and presented is not None and hmac.compare_digest(presented, token)
+
+
+def encode_response(request: Request, model: BaseModel, status_code: int = 200) -> Response:
+    """
+    Serialize ``model`` as the client asked: msgpack when ``Accept`` names it, JSON
+    (through orjson) otherwise, gzip-compressed when ``Accept-Encoding`` allows.
+    """
+    payload = model.dict()
+    if any(media in request.headers.get("accept", "") for media in _MSGPACK_TYPES):
+        content, media_type = msgpack.packb(payload, use_bin_type=True), MSGPACK
+    else:
+        content, media_type = orjson.dumps(payload), JSON
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if len(content) >= GZIP_MIN_BYTES and "gzip" in request.headers.get("accept-encoding", ""):
+        content = gzip.compress(content, compresslevel=GZIP_LEVEL)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=content, status_code=status_code, media_type=media_type, headers=headers)
+
+
+def construct_trusted(model: Type[M], data: Any) -> M:
+    """Build ``model`` from already valid data without running validators.
+
+    Nested models and enums are still converted, so the result behaves like a
+    parsed model; missing optional fields take their defaults.
+    """
+    if not isinstance(data, dict):
+        raise TypeError(f"{model.__name__} expects an object, got {type(data).__name__}")
+    values = {}
+    for name, alias, required, convert in _field_plan(model):
+        if alias in data:
+            value = data[alias]
+            values[name] = value if convert is None or value is None else convert(value)
+        elif required:
+            raise ValueError(f"{model.__name__}.{alias} is required")
+    return model.construct(**values)
+
+
+@lru_cache(maxsize=None)
+def _field_plan(model: Type[BaseModel]) -> List[Tuple[str, str, bool, Optional[Callable[[Any], Any]]]]:
+    """Per field of ``model``: name, alias, whether it is required, and the converter of its raw value."""
+    return [
+        (name, field.alias, bool(field.required), _converter(field))
+        for name, field in model.__fields__.items()
+    ]
+
+
+def _converter(field: ModelField) -> Optional[Callable[[Any], Any]]:
+    """Converter of a raw value of ``field``, or None when the raw value is kept as it is.
+
+    Lists and dicts are converted item by item, at any depth. Other shapes raise
+    ``TypeError``: passing them through would leave values ``parse_obj`` converts.
+    """
+    if field.shape == SHAPE_SINGLETON:
+        if field.sub_fields:  # Union of several types
+            if any(_converter(sub_field) is not None for sub_field in field.sub_fields):
+                raise TypeError(f"Trusted payloads cannot tell the members of union field {field.name!r} apart")
+            return None
+        return _type_converter(field.type_)
+    if field.shape not in (SHAPE_LIST, SHAPE_DICT, SHAPE_MAPPING) or not field.sub_fields:
+        raise TypeError(f"Trusted payloads do not support the shape of field {field.name!r}")
+    convert = _converter(field.sub_fields[0])
+    if convert is None:
+        return None
+    if field.shape == SHAPE_LIST:
+        return lambda values: [None if value is None else convert(value) for value in values]
+    return lambda values: {key: None if value is None else convert(value) for key, value in values.items()}
+
+
+def _type_converter(target: Any) -> Optional[Callable[[Any], Any]]:
+    if isinstance(target, type) and issubclass(target, BaseModel):
+        _field_plan(target)
+
+        def convert(value: Any) -> Any:
+            return construct_trusted(target, value)
+
+        return convert
+    if isinstance(target, type) and issubclass(target, Enum):
+        return target
+    return None
+
+
+def request_body_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """OpenAPI ``requestBody`` of a route whose body is parsed by ``body_of(model)``."""
+    schema = model.schema()  # Cached by pydantic, so left unmodified
+    definitions = schema.get("definitions", {})
+    schema = _inline_refs({key: value for key, value in schema.items() if key != "definitions"}, definitions)
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {JSON: {"schema": schema}, MSGPACK: {"schema": schema}},
+        }
+    }
+
+
+def _inline_refs(node: Any, definitions: Dict[str, Any]) -> Any:
+    if isinstance(node, dict):
+        ref = node.get("$ref")
+        if ref is not None:
+            return _inline_refs(definitions[ref.rsplit("/", 1)[-1]], definitions)
+        return {key: _inline_refs(value, definitions) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_inline_refs(item, definitions) for item in node]
+    return node
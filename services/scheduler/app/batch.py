@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from typing import Dict, List
+
+from .domain.models import (
+    AssignmentSegment,
+    BatchSolveRequest,
+    BatchSolveResponse,
+    SolveMetrics,
+    SolveRequest,
+    SolveResponse,
+    StoreShifts,
+)
+
+
+def batch_store_id(batch: BatchSolveRequest) -> str:
+    """Identifier used for the joint request, the region when given."""
+    return batch.region_id or ",".join(store.store_id for store in batch.stores)
+
+
+def merge_batch(batch: BatchSolveRequest) -> SolveRequest:
+    """
+    Combine every store of a batch into one solve request over the shared employee pool.
+
+    Weekly limits and overlaps are then enforced across stores, and the solver's
+    decomposition keeps stores without shared employees in separate sub-problems.
+    """
+    return SolveRequest(
+        store_id=batch_store_id(batch),
+        iso_week=batch.iso_week,
+        shifts=[shift for store in batch.stores for shift in store.shifts],
+        employees=batch.employees,
+        locked_assignments=[locked for store in batch.stores for locked in store.locked_assignments],
+        options=batch.options,
+        previous_assignments=[seg for store in batch.stores for seg in store.previous_assignments],
+    )
+
+
+def split_batch(batch: BatchSolveRequest, response: SolveResponse) -> BatchSolveResponse:
+    """Break a joint solve response back into one response per store."""
+    store_of_shift: Dict[str, str] = {
+        shift.id: store.store_id for store in batch.stores for shift in store.shifts
+    }
+    assignments: Dict[str, List[AssignmentSegment]] = {store.store_id: [] for store in batch.stores}
+    uncovered: Dict[str, List[AssignmentSegment]] = {store.store_id: [] for store in batch.stores}
+    for seg in response.assignments:
+        store_id = store_of_shift.get(seg.shift_id)
+        if store_id is not None:
+            assignments[store_id].append(seg)
+    for seg in response.uncovered_segments:
+        store_id = store_of_shift.get(seg.shift_id)
+        if store_id is not None:
+            uncovered[store_id].append(seg)
+
+    return BatchSolveResponse(
+        region_id=batch.region_id,
+        iso_week=batch.iso_week,
+        responses=[
+            _store_response(batch, store, response, assignments[store.store_id], uncovered[store.store_id])
+            for store in batch.stores
+        ],
+        metrics=response.metrics,
+    )
+
+
+def _store_response(
+    batch: BatchSolveRequest,
+    store: StoreShifts,
+    response: SolveResponse,
+    assignments: List[AssignmentSegment],
+    uncovered: List[AssignmentSegment],
+) -> SolveResponse:
+    total_minutes = sum(seg.end_minute - seg.start_minute for seg in assignments)
+    total_capacity_minutes = sum(
+        (shift.end_minute - shift.start_minute) * shift.capacity
+        for shift in store.shifts
+    )
+    coverage_ratio = total_minutes / total_capacity_minutes if total_capacity_minutes > 0 else 1.0
+    return SolveResponse(
+        store_id=store.store_id,
+        iso_week=batch.iso_week,
+        assignments=assignments,
+        metrics=SolveMetrics(
+            status=response.metrics.status,
+            # The objective is only meaningful for the joint solve, see the batch metrics
+            objective_value=None,
+            total_assigned_minutes=total_minutes,
+            solver_wall_time_ms=response.metrics.solver_wall_time_ms,
+            coverage_ratio=coverage_ratio,
+        ),
+        infeasible_reason=response.infeasible_reason,
+        uncovered_segments=uncovered,
+        # Conflicts of the joint solve; the employee pool is shared, so they are not split by store
+        infeasibility=response.infeasibility,
+    )
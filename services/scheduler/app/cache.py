@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .config import Settings, settings
+from .domain.models import CacheStats, SolveRequest, SolveResponse
+
+# Options that change how a solve is scheduled, not what it returns
+_NON_SEMANTIC_OPTIONS = ("deadline_seconds", "use_cache")
+
+
+def request_fingerprint(request: SolveRequest) -> str:
+    """Content hash of a request, independent of list ordering and transport-only options."""
+    payload = request.dict()
+    payload["employees"] = sorted(
+        (_normalize_employee(emp) for emp in payload["employees"]), key=lambda emp: emp["id"]
+    )
+    payload["shifts"] = sorted(payload["shifts"], key=lambda shift: shift["id"])
+    for assignments in ("locked_assignments", "previous_assignments"):
+        payload[assignments] = sorted(
+            payload[assignments],
+            key=lambda assignment: (assignment["shift_id"], assignment["slot"], assignment["employee_id"]),
+        )
+    for option in _NON_SEMANTIC_OPTIONS:
+        payload["options"].pop(option, None)
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _normalize_employee(employee: Dict[str, Any]) -> Dict[str, Any]:
+    employee["role_ids"] = sorted(employee["role_ids"])
+    employee["role_names"] = sorted(employee["role_names"])
+    employee["availability"] = sorted(
+        employee["availability"],
+        key=lambda slot: (slot["day"], slot["start_minute"], slot["end_minute"], slot["is_off"]),
+    )
+    return employee
+
+
+class SolveResultCache:
+    """
+    LRU cache of solve responses keyed by ``request_fingerprint``.
+
+    The in-memory tier is bounded by entry count and serialized size; when a SQLite
+    path is configured, entries also persist on disk and survive restarts.
+    """
+
+    def __init__(self, config: Settings = settings) -> None:
+        self._max_entries = config.cache_max_entries
+        self._max_bytes = config.cache_max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._disk_hits = 0
+        self._lock = threading.Lock()
+        self._disk: Optional[_SQLiteTier] = None
+        if config.cache_sqlite_path:
+            self._disk = _SQLiteTier(config.cache_sqlite_path, config.cache_sqlite_max_entries)
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_entries > 0 or self._disk is not None
+
+    def key_for(self, request: SolveRequest) -> Optional[str]:
+        """Cache key for ``request``, or None when caching is off for it."""
+        if not self.enabled or not request.options.use_cache:
+            return None
+        return request_fingerprint(request)
+
+    @property
+    def persistent(self) -> bool:
+        """Whether entries also go to the SQLite tier, whose reads and writes block on disk."""
+        return self._disk is not None
+
+    def get(self, key: str) -> Optional[SolveResponse]:
+        cached = self.get_memory(key)
+        return cached if cached is not None else self.get_disk(key)
+
+    def get_memory(self, key: str) -> Optional[SolveResponse]:
+        """Response held in memory for ``key``; a miss here is only counted by ``get_disk``."""
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        return SolveResponse.parse_raw(payload)
+
+    def get_disk(self, key: str) -> Optional[SolveResponse]:
+        """Response stored on disk for ``key``, promoted to memory when found."""
+        payload = self._disk.get(key) if self._disk is not None else None
+        with self._lock:
+            if payload is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._disk_hits += 1
+            self._store(key, payload)
+        return SolveResponse.parse_raw(payload)
+
+    def put(self, key: str, response: SolveResponse) -> None:
+        self.put_disk(key, self.put_memory(key, response))
+
+    def put_memory(self, key: str, response: SolveResponse) -> bytes:
+        """Keep ``response`` in memory and return its serialized payload for ``put_disk``."""
+        payload = response.json().encode("utf-8")
+        with self._lock:
+            self._store(key, payload)
+        return payload
+
+    def put_disk(self, key: str, payload: bytes) -> None:
+        if self._disk is not None:
+            self._disk.put(key, payload)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self._disk is not None:
+            self._disk.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                bytes=self._bytes,
+                disk_hits=self._disk_hits,
+                disk_entries=self._disk.count() if self._disk is not None else None,
+            )
+
+    def _store(self, key: str, payload: bytes) -> None:
+        if self._max_entries == 0 or len(payload) > self._max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous)
+        self._entries[key] = payload
+        self._bytes += len(payload)
+        while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self._evictions += 1
+
+
+class _SQLiteTier:
+    """Persistent second tier; evicts least recently used rows beyond ``max_entries``."""
+
+    def __init__(self, path: str, max_entries: int) -> None:
+        self._path = path
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        # Opened lazily so solver worker processes importing this module never touch the file
+        if self._connection is None:
+            self._connection = sqlite3.connect(self._path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS solve_cache ("
+                " key TEXT PRIMARY KEY, payload BLOB NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM solve_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE solve_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return bytes(row[0])
+
+    def put(self, key: str, payload: bytes) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO solve_cache (key, payload, last_used) VALUES (?, ?, ?)",
+                (key, payload, time.time()),
+            )
+            self._conn.execute(
+                "DELETE FROM solve_cache WHERE key NOT IN"
+                " (SELECT key FROM solve_cache ORDER BY last_used DESC LIMIT ?)",
+                (self._max_entries,),
+            )
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM solve_cache").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM solve_cache")
+            self._conn.commit()
+
+
+result_cache = SolveResultCache()
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import os
+from typing import Literal, Optional
+
+from pydantic import BaseSettings, Field
+
+
+# Cores each solver process gets by default; the balanced profile searches with at most 8 workers
+CORES_PER_SOLVER_PROCESS = 8
+
+
+def _default_pool_workers() -> int:
+    """Solver processes that leave each solve ``CORES_PER_SOLVER_PROCESS`` cores, at least one process."""
+    return max(1, (os.cpu_count() or 2) // CORES_PER_SOLVER_PROCESS)
+
+
+class Settings(BaseSettings):
+    """Runtime configuration, overridable through ``SCHEDULER_*`` environment variables."""
+
+    solver_pool_workers: int = Field(default_factory=_default_pool_workers, ge=1)
+    solver_queue_size: int = Field(8, ge=0)
+    solve_deadline_grace_seconds: float = Field(10.0, ge=0)
+    solve_max_deadline_seconds: float = Field(120.0, gt=0)
+    solver_profile: Literal["fast", "balanced", "quality"] = "balanced"  # When the request names none
+    solver_search_workers: Optional[int] = Field(None, ge=1)  # Per solve; default splits cores over the pool
+
+    job_workers: int = Field(default_factory=_default_pool_workers, ge=1)
+    job_queue_size: int = Field(32, ge=0)
+    job_retention: int = Field(256, ge=1)  # Finished jobs kept for polling
+    job_stream_poll_seconds: float = Field(0.25, gt=0)
+
+    cache_max_entries: int = Field(256, ge=0)
+    cache_max_bytes: int = Field(64 * 1024 * 1024, ge=0)
+    cache_sqlite_path: Optional[str] = None  # Enables the on-disk tier
+    cache_sqlite_max_entries: int = Field(4096, ge=1)
+
+    template_max_entries: int = Field(64, ge=1)  # Template versions kept parsed in memory
+    template_sqlite_path: Optional[str] = None  # Persists every uploaded template version
+
+    trusted_caller_token: Optional[str] = None  # Callers sending it in X-Scheduler-Token skip body validation
+
+    class Config:
+        env_prefix = "SCHEDULER_"
+
+
+settings = Settings()
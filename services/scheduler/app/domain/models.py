@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, PrivateAttr, validator
 
 
 class Weekday(str, Enum):
@@ -80,6 +81,33 @@ class SolveOptions(BaseModel):
     solver_time_limit_seconds: Optional[int] = Field(15, ge=1)
     allow_uncovered: bool = False
     stint_start_penalty: int = Field(50, ge=0)
+    deadline_seconds: Optional[float] = Field(None, gt=0)  # Queue wait + solve budget for this request
+    use_cache: bool = True  # Reuse the stored response of an identical earlier request
+    change_penalty: int = Field(0, ge=0)  # Per-assignment cost of deviating from previous_assignments
+    profile: Optional[Literal["fast", "balanced", "quality"]] = None  # None uses the server default
+    portfolio: bool = False  # Race greedy against CP-SAT, first to reach target_coverage wins
+    target_coverage: float = Field(1.0, gt=0, le=1)
+    segment_mode: bool = False  # Let employees cover parts of a shift, on a slot_size_minutes grid
+    explain_infeasibility: bool = False  # Name the conflicting rules when CP-SAT proves the request infeasible
+    soft_coverage: bool = False  # Leave the fewest slots open instead of falling back to greedy when not all can be covered
+
+
+class AssignmentSegment(BaseModel):
+    shift_id: str
+    day: Weekday
+    employee_id: str
+    start_minute: int
+    end_minute: int
+    slot: int = 0  # Slot number within the shift (0, 1, 2, etc.)
+    locked: bool = False
+
+
+class CarryOver(BaseModel):
+    """What the weeks before leave to an employee's next week."""
+    employee_id: str
+    consecutive_days: int = Field(0, ge=0)  # Working days in a row up to and including the previous Sunday
+    last_shift_end_minute: Optional[int] = Field(None, ge=0, le=24 * 60)  # End of the previous Sunday's last shift
+    minutes_behind_target: int = 0  # Earlier weekly targets minus minutes worked; negative when ahead
 
 
 class SolveRequest(BaseModel):
@@ -89,16 +117,141 @@ class SolveRequest(BaseModel):
     employees: List[Employee]
     locked_assignments: List[LockedAssignment] = []
     options: SolveOptions = SolveOptions()
+    previous_assignments: List[AssignmentSegment] = []  # Prior schedule used as a warm start
+    carry_over: List[CarryOver] = []  # State from the previous week, for rest, consecutive days and balancing
 
+    # Names the employee set when it comes from a template, so solver workers can reuse its eligibility index
+    _eligibility_key: Optional[str] = PrivateAttr(None)
 
-class AssignmentSegment(BaseModel):
-    shift_id: str
-    day: Weekday
-    employee_id: str
-    start_minute: int
-    end_minute: int
-    slot: int = 0  # Slot number within the shift (0, 1, 2, etc.)
-    locked: bool = False
+
+class StoreShifts(BaseModel):
+    """One store's part of a batch solve; employees are shared across the batch."""
+    store_id: str
+    shifts: List[Shift]
+    locked_assignments: List[LockedAssignment] = []
+    previous_assignments: List[AssignmentSegment] = []
+
+    @validator("shifts")
+    def validate_store(cls, v: List[Shift], values):  # type: ignore[override]
+        store_id = values.get("store_id")
+        for shift in v:
+            if store_id is not None and shift.store_id != store_id:
+                raise ValueError(f"Shift {shift.id} belongs to store {shift.store_id}, not {store_id}")
+        return v
+
+
+class BatchSolveRequest(BaseModel):
+    region_id: Optional[str] = None
+    iso_week: str
+    stores: List[StoreShifts] = Field(..., min_items=1)
+    employees: List[Employee]  # Shared pool; weekly limits hold across all stores in the batch
+    options: SolveOptions = SolveOptions()
+
+    @validator("stores")
+    def validate_unique(cls, v: List[StoreShifts]):  # type: ignore[override]
+        store_ids = set()
+        shift_ids = set()
+        for store in v:
+            if store.store_id in store_ids:
+                raise ValueError(f"Store {store.store_id} appears more than once")
+            store_ids.add(store.store_id)
+            for shift in store.shifts:
+                if shift.id in shift_ids:
+                    raise ValueError(f"Shift id {shift.id} appears more than once")
+                shift_ids.add(shift.id)
+        return v
+
+
+class TemplateUpload(BaseModel):
+    """Employees and shift templates of a store, uploaded once and referenced by version."""
+    store_id: str
+    employees: List[Employee]
+    shifts: List[Shift]
+
+
+class TemplateInfo(BaseModel):
+    version_id: str  # Content hash; uploading identical templates returns the same version
+    store_id: str
+    employee_count: int
+    shift_count: int
+    created_at: datetime
+
+
+class WeekOverrides(BaseModel):
+    """Changes to a template for one week."""
+    availability: Dict[str, List[AvailabilitySlot]] = {}  # Replaces the employee's availability
+    absent_employees: List[str] = []
+    extra_employees: List[Employee] = []
+    removed_shifts: List[str] = []
+    extra_shifts: List[Shift] = []
+
+
+class TemplateSolveRequest(BaseModel):
+    template_version: str
+    iso_week: str
+    overrides: WeekOverrides = WeekOverrides()
+    locked_assignments: List[LockedAssignment] = []
+    options: SolveOptions = SolveOptions()
+    previous_assignments: List[AssignmentSegment] = []
+
+
+class HorizonWeek(BaseModel):
+    """One week of a horizon; overrides change the horizon employees for this week only."""
+    iso_week: str
+    shifts: List[Shift]
+    overrides: WeekOverrides = WeekOverrides()
+    locked_assignments: List[LockedAssignment] = []
+    previous_assignments: List[AssignmentSegment] = []
+
+
+class HorizonSolveRequest(BaseModel):
+    store_id: str
+    employees: List[Employee]
+    weeks: List[HorizonWeek] = Field(..., min_items=1, max_items=12)  # Consecutive weeks, in order
+    options: SolveOptions = SolveOptions()  # Applies to every week
+    carry_over: List[CarryOver] = []  # State entering the first week
+
+
+class RepairRequest(BaseModel):
+    """A solved week, its current schedule and what changed since it was solved."""
+    request: SolveRequest  # The week as it was solved
+    assignments: List[AssignmentSegment]  # Current schedule; its locked segments stay locked
+    disruption: WeekOverrides
+    neighborhood_days: int = Field(0, ge=0, le=6)  # Days on each side of a disrupted day that are re-solved too
+    time_limit_seconds: int = Field(1, ge=1)
+
+
+class Scenario(BaseModel):
+    """One what-if variant of a week, described as changes to the base request."""
+    name: str
+    changes: WeekOverrides = WeekOverrides()
+    cross_store_employees: List[str] = []  # Employees allowed to work in other stores in this variant
+
+
+class ScenarioRequest(BaseModel):
+    base: SolveRequest
+    scenarios: List[Scenario] = Field(..., min_items=1, max_items=32)
+    include_base: bool = True  # Also solve the unchanged week, reported first as "base"
+
+    @validator("scenarios")
+    def validate_names(cls, v: List[Scenario]):  # type: ignore[override]
+        names = set()
+        for scenario in v:
+            if scenario.name == "base" or scenario.name in names:
+                raise ValueError(f"Scenario name {scenario.name} is reserved or appears more than once")
+            names.add(scenario.name)
+        return v
+
+
+class PhaseTimings(BaseModel):
+    """Wall time per solve phase; phases of decomposed parts solved in parallel are summed."""
+    validation_ms: float = 0.0
+    eligibility_ms: float = 0.0
+    slot_building_ms: float = 0.0
+    model_build_ms: float = 0.0
+    solve_ms: float = 0.0  # CP-SAT presolve and search, or the greedy run
+    extraction_ms: float = 0.0
+    total_ms: float = 0.0
 
 
 class SolveMetrics(BaseModel):
@@ -107,6 +260,28 @@ class SolveMetrics(BaseModel):
     total_assigned_minutes: int
     solver_wall_time_ms: Optional[int]
     coverage_ratio: float
+    algorithm: Optional[str] = None  # cpsat, greedy or decomposed
+    timings: Optional[PhaseTimings] = None
+    num_variables: Optional[int] = None  # CP-SAT model size, summed over decomposed parts
+    num_constraints: Optional[int] = None
+    target_deviation_minutes: Optional[int] = None  # Sum over employees of |worked - weekly_minutes_target|
+
+
+class InfeasibilityConflict(BaseModel):
+    """One rule of a conflicting set; the ids say which employee or slot it constrains."""
+    kind: Literal["coverage", "weekly_limit", "no_overlap", "daily_limit", "consecutive_days", "carry_over"]
+    message: str
+    employee_id: Optional[str] = None
+    shift_id: Optional[str] = None
+    slot: Optional[int] = None
+    day: Optional[Weekday] = None
+    limit_minutes: Optional[int] = None
+
+
+class InfeasibilityExplanation(BaseModel):
+    """Rules that cannot all hold; relaxing any one of them removes this conflict."""
+    conflicts: List[InfeasibilityConflict]
+    minimal: bool  # False when the time budget ran out before every rule was checked
 
 
 class SolveResponse(BaseModel):
@@ -116,5 +291,70 @@ class SolveResponse(BaseModel):
     metrics: SolveMetrics
     infeasible_reason: Optional[str] = None
     uncovered_segments: List[AssignmentSegment] = []
+    infeasibility: Optional[InfeasibilityExplanation] = None  # Set with options.explain_infeasibility
 
 
+class BatchSolveResponse(BaseModel):
+    region_id: Optional[str] = None
+    iso_week: str
+    responses: List[SolveResponse]  # One per store, in request order
+    metrics: SolveMetrics  # Totals for the joint solve
+
+
+class ScenarioResult(BaseModel):
+    """One row of a scenario comparison."""
+    name: str
+    status: str
+    algorithm: Optional[str] = None
+    coverage_ratio: float
+    uncovered_minutes: int  # Shift capacity minutes nobody works
+    objective_value: Optional[int] = None
+    assigned_minutes: int  # Paid minutes; requests carry no wage rates, so this is the labor cost
+    target_deviation_minutes: Optional[int] = None
+    solver_wall_time_ms: Optional[int] = None
+
+
+class ScenarioComparison(BaseModel):
+    store_id: str
+    iso_week: str
+    results: List[ScenarioResult]  # Base first when requested, then the scenarios in request order
+
+
+class HorizonSolveResponse(BaseModel):
+    store_id: str
+    weeks: List[SolveResponse]  # One per requested week, in order
+    carry_over: List[CarryOver]  # State after the last week; pass it to the next horizon
+
+
+class CacheStats(BaseModel):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+    disk_hits: int = 0
+    disk_entries: Optional[int] = None  # None when the on-disk tier is disabled
+
+
+class JobStatus(str, Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+    @property
+    def is_terminal(self) -> bool:
+        return self in (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+class SolveJobInfo(BaseModel):
+    job_id: str
+    status: JobStatus
+    store_id: str
+    iso_week: str
+    created_at: datetime
+    updated_at: datetime
+    solutions_found: int = 0  # Intermediate solutions reported so far
+    result: Optional[SolveResponse] = None  # Best schedule so far, final once the job is terminal
+    error: Optional[str] = None
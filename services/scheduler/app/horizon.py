@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from typing import Dict, List, Set
+
+from .domain.models import (
+    CarryOver,
+    HorizonSolveRequest,
+    HorizonSolveResponse,
+    SolveRequest,
+    SolveResponse,
+    Weekday,
+)
+from .solver.cpsat import CPSATSolver
+from .solver.labor import DAY_POSITION
+from .templates import apply_overrides, eligibility_key, employees_key
+
+logger = logging.getLogger(__name__)
+
+LAST_DAY = DAY_POSITION[Weekday.SUN]
+
+
+def horizon_weeks(request: HorizonSolveRequest) -> List[SolveRequest]:
+    """
+    One solve request per week of the horizon, without its carry-over yet.
+
+    Weeks that do not change the horizon employees share an eligibility key, so
+    the solver builds their index once and every later week reuses it.
+
+    Raises ``ValueError`` when a week's overrides name employees or shifts it does not have.
+    """
+    base_key = employees_key("horizon", request.employees)
+    weeks: List[SolveRequest] = []
+    for week in request.weeks:
+        employees, shifts = apply_overrides(request.employees, week.shifts, week.overrides, f"week {week.iso_week}")
+        # Every part is already validated, so the request is assembled without a second pass
+        solve_request = SolveRequest.construct(
+            store_id=request.store_id,
+            iso_week=week.iso_week,
+            shifts=shifts,
+            employees=employees,
+            locked_assignments=week.locked_assignments,
+            options=request.options,
+            previous_assignments=week.previous_assignments,
+        )
+        solve_request._eligibility_key = eligibility_key(base_key, week.overrides)
+        weeks.append(solve_request)
+    return weeks
+
+
+def solve_horizon(solver: CPSATSolver, request: HorizonSolveRequest) -> HorizonSolveResponse:
+    """Solve the weeks in order, fixing each one and carrying its end state into the next."""
+    carry_over = list(request.carry_over)
+    responses: List[SolveResponse] = []
+    for week in horizon_weeks(request):
+        week.carry_over = carry_over
+        response = solver.solve(week)
+        responses.append(response)
+        carry_over = next_carry_over(request, week, response, carry_over)
+        logger.info(
+            f"Horizon week {week.iso_week} solved with {response.metrics.coverage_ratio:.1%} coverage, "
+            f"carrying state of {len(carry_over)} employees"
+        )
+    return HorizonSolveResponse(store_id=request.store_id, weeks=responses, carry_over=carry_over)
+
+
+def next_carry_over(
+    request: HorizonSolveRequest, week: SolveRequest, response: SolveResponse, carry_over: List[CarryOver]
+) -> List[CarryOver]:
+    """State each horizon employee takes into the week after ``week``.
+
+    Employees who were absent that week rested: their run of working days ends and
+    their balance is unchanged, so a vacation is not made up afterwards.
+    """
+    previous = {carry.employee_id: carry for carry in carry_over}
+    present = {emp.id for emp in week.employees}
+    worked_days: Dict[str, Set[int]] = defaultdict(set)
+    worked_minutes: Dict[str, int] = defaultdict(int)
+    sunday_end: Dict[str, int] = {}
+    for seg in response.assignments:
+        position = DAY_POSITION[seg.day]
+        worked_days[seg.employee_id].add(position)
+        worked_minutes[seg.employee_id] += seg.end_minute - seg.start_minute
+        if position == LAST_DAY:
+            sunday_end[seg.employee_id] = max(sunday_end.get(seg.employee_id, 0), seg.end_minute)
+
+    result: List[CarryOver] = []
+    for emp in request.employees:
+        carried = previous.get(emp.id)
+        behind = carried.minutes_behind_target if carried is not None else 0
+        if emp.id not in present:
+            result.append(CarryOver(employee_id=emp.id, minutes_behind_target=behind))
+            continue
+        days = worked_days.get(emp.id, set())
+        run = 0
+        while LAST_DAY - run >= 0 and LAST_DAY - run in days:
+            run += 1
+        if run == len(DAY_POSITION) and carried is not None:
+            run += carried.consecutive_days
+        result.append(CarryOver(
+            employee_id=emp.id,
+            consecutive_days=run,
+            last_shift_end_minute=sunday_end.get(emp.id),
+            minutes_behind_target=behind + emp.weekly_minutes_target - worked_minutes[emp.id],
+        ))
+    return result
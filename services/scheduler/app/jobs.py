@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Optional, Tuple
+
+from .cache import SolveResultCache, result_cache
+from .config import Settings, settings
+from .domain.models import JobStatus, SolveJobInfo, SolveRequest, SolveResponse
+from .metrics import record_solve
+from .service import SchedulerBusyError, SchedulerService, scheduler_service
+
+logger = logging.getLogger(__name__)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class SolveJob:
+    """
+    A background solve that can be polled, streamed, and cancelled.
+
+    The search runs in a solver process; its improving schedules arrive through
+    ``on_solution``, and ``bind_cancel`` hands over the function that raises its
+    cancel flag.
+    """
+
+    def __init__(self, request: SolveRequest) -> None:
+        self.id = uuid.uuid4().hex
+        self.request = request
+        self.status = JobStatus.QUEUED
+        self.result: Optional[SolveResponse] = None
+        self.error: Optional[str] = None
+        self.solutions_found = 0
+        self.created_at = _now()
+        self.updated_at = self.created_at
+        self.revision = 0  # Bumped on every observable change; used by streams
+        self._cancel: Optional[Callable[[], None]] = None
+        self._cancel_requested = False
+        self._lock = threading.Lock()
+
+    def on_solution(self, response: SolveResponse) -> None:
+        with self._lock:
+            if self.status != JobStatus.RUNNING:
+                return  # Progress that arrived after the final result
+            self.result = response
+            self.solutions_found += 1
+            self._touch()
+
+    def bind_cancel(self, cancel: Callable[[], None]) -> None:
+        with self._lock:
+            self._cancel = cancel
+            cancelled = self._cancel_requested
+        if cancelled:
+            cancel()
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self.status.is_terminal:
+                return
+            self._cancel_requested = True
+            cancel = self._cancel
+            if self.status == JobStatus.QUEUED:
+                self.status = JobStatus.CANCELLED
+            self._touch()
+        if cancel is not None:
+            cancel()
+
+    def info(self) -> SolveJobInfo:
+        with self._lock:
+            return SolveJobInfo(
+                job_id=self.id,
+                status=self.status,
+                store_id=self.request.store_id,
+                iso_week=self.request.iso_week,
+                created_at=self.created_at,
+                updated_at=self.updated_at,
+                solutions_found=self.solutions_found,
+                result=self.result,
+                error=self.error,
+            )
+
+    def run(self, submit: Callable[["SolveJob"], Future], cache: SolveResultCache) -> None:
+        """Answer from the cache, or hand the solve to ``submit`` and wait for its result."""
+        with self._lock:
+            if self.status != JobStatus.QUEUED:
+                return
+            self.status = JobStatus.RUNNING
+            self._touch()
+        key = cache.key_for(self.request)
+        cached = cache.get(key) if key else None
+        if cached is not None:
+            self._finish(JobStatus.SUCCEEDED, result=cached)
+            return
+        try:
+            response = submit(self).result()
+        except Exception as exc:
+            logger.exception(f"Solve job {self.id} failed")
+            self._finish(JobStatus.FAILED, error=str(exc))
+            return
+        record_solve(self.request, response)
+        if self._cancel_requested:
+            self._finish(JobStatus.CANCELLED, result=response)
+            return
+        if key:
+            cache.put(key, response)
+        self._finish(JobStatus.SUCCEEDED, result=response)
+
+    def _finish(
+        self, status: JobStatus, result: Optional[SolveResponse] = None, error: Optional[str] = None
+    ) -> None:
+        with self._lock:
+            self.status = status
+            if result is not None:
+                self.result = result
+            self.error = error
+            self._touch()
+
+    def _touch(self) -> None:
+        self.updated_at = _now()
+        self.revision += 1
+
+
+class JobManager:
+    """
+    Runs solve jobs in the solver process pool.
+
+    ``job_workers`` threads take queued jobs and wait on their pool solves, so the
+    CP-SAT search runs outside the API process and within the pool's core budget.
+    Progress comes back over one queue of a multiprocessing manager, and each job
+    gets a manager event as its cancel flag. The manager starts with the first job.
+    """
+
+    def __init__(
+        self,
+        config: Settings = settings,
+        cache: SolveResultCache = result_cache,
+        service: SchedulerService = scheduler_service,
+    ) -> None:
+        self._settings = config
+        self._cache = cache
+        self._service = service
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: "OrderedDict[str, SolveJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._manager: Optional[Any] = None
+        self._progress: Optional[Any] = None
+
+    def submit(self, request: SolveRequest) -> SolveJob:
+        job = SolveJob(request)
+        with self._lock:
+            active = sum(1 for existing in self._jobs.values() if not existing.status.is_terminal)
+            if active >= self._settings.job_workers + self._settings.job_queue_size:
+                raise SchedulerBusyError(f"Job queue is full ({active} jobs pending)")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._settings.job_workers, thread_name_prefix="solve-job"
+                )
+            self._jobs[job.id] = job
+            self._evict_finished()
+            self._executor.submit(job.run, self._submit_solve, self._cache)
+        logger.info(f"Queued solve job {job.id} for store {request.store_id}, week {request.iso_week}")
+        return job
+
+    def _submit_solve(self, job: SolveJob) -> Future:
+        progress, cancelled = self._channel()
+        job.bind_cancel(cancelled.set)
+        return self._service.submit_job(job.request, job.id, progress, cancelled)
+
+    def _channel(self) -> Tuple[Any, Any]:
+        """The shared progress queue and a new cancel flag, starting the manager on first use."""
+        with self._lock:
+            if self._manager is None:
+                self._manager = multiprocessing.get_context("spawn").Manager()
+                self._progress = self._manager.Queue()
+                threading.Thread(
+                    target=self._forward_progress, args=(self._progress,), name="job-progress", daemon=True
+                ).start()
+            return self._progress, self._manager.Event()
+
+    def _forward_progress(self, progress: Any) -> None:
+        while True:
+            try:
+                item = progress.get()
+            except (EOFError, OSError):
+                return  # The manager was shut down
+            if item is None:
+                return
+            job_id, response = item
+            job = self.get(job_id)
+            if job is not None:
+                job.on_solution(response)
+
+    def get(self, job_id: str) -> Optional[SolveJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[SolveJob]:
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
+        return job
+
+    async def stream(self, job: SolveJob) -> AsyncIterator[str]:
+        """Server-sent events: one ``progress`` event per change, then a final ``done`` event."""
+        revision = -1
+        while True:
+            if job.revision != revision:
+                revision = job.revision
+                info = job.info()
+                event = "done" if info.status.is_terminal else "progress"
+                yield f"event: {event}\nid: {revision}\ndata: {info.json()}\n\n"
+                if event == "done":
+                    return
+            await asyncio.sleep(self._settings.job_stream_poll_seconds)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            manager, self._manager = self._manager, None
+            progress, self._progress = self._progress, None
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if manager is not None:
+            progress.put(None)
+            manager.shutdown()
+
+    def _evict_finished(self) -> None:
+        overflow = len(self._jobs) - self._settings.job_retention
+        if overflow <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.status.is_terminal][:overflow]:
+            del self._jobs[job_id]
+
+
+job_manager = JobManager()
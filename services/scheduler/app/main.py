@@ -4,12 +4,21 @@ import logging
 
 from fastapi import FastAPI
 
-from .api.routes import router as schedule_router
+from .api.routes import metrics_router, router as schedule_router
+from .jobs import job_manager
+from .service import scheduler_service
 
 logging.basicConfig(level=logging.INFO)
 
 app = FastAPI(title="Scheduler Solver Service", version="0.1.0")
 app.include_router(schedule_router)
+app.include_router(metrics_router)
+
+
+@app.on_event("shutdown")
+def shutdown_solver_pool() -> None:
+    job_manager.shutdown()
+    scheduler_service.shutdown()
 
 
 @app.get("/")
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+from .domain.models import SolveRequest, SolveResponse
+from .solver.timing import PHASES
+
+# Shift count upper bounds for the store_size label
+SIZE_BUCKETS = ((50, "small"), (200, "medium"), (1000, "large"))
+
+_SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+_COUNT_BUCKETS = (100, 500, 1000, 5000, 10000, 50000, 100000, 500000)
+
+SOLVES = Counter(
+    "scheduler_solves_total",
+    "Completed solves (cache hits excluded)",
+    ["algorithm", "store_size", "status"],
+)
+SOLVE_SECONDS = Histogram(
+    "scheduler_solve_seconds",
+    "End-to-end solver time per request",
+    ["algorithm", "store_size"],
+    buckets=_SECONDS_BUCKETS,
+)
+PHASE_SECONDS = Histogram(
+    "scheduler_solve_phase_seconds",
+    "Solver time per phase",
+    ["algorithm", "store_size", "phase"],
+    buckets=_SECONDS_BUCKETS,
+)
+MODEL_VARIABLES = Histogram(
+    "scheduler_model_variables",
+    "CP-SAT model variables per solve",
+    ["algorithm", "store_size"],
+    buckets=_COUNT_BUCKETS,
+)
+MODEL_CONSTRAINTS = Histogram(
+    "scheduler_model_constraints",
+    "CP-SAT model constraints per solve",
+    ["algorithm", "store_size"],
+    buckets=_COUNT_BUCKETS,
+)
+
+
+def store_size(request: SolveRequest) -> str:
+    shift_count = len(request.shifts)
+    for limit, label in SIZE_BUCKETS:
+        if shift_count <= limit:
+            return label
+    return "xlarge"
+
+
+def record_solve(request: SolveRequest, response: SolveResponse) -> None:
+    """Observe a finished solve; call from the API process, solves in pool workers report here."""
+    metrics = response.metrics
+    algorithm = metrics.algorithm or "none"
+    size = store_size(request)
+    SOLVES.labels(algorithm, size, metrics.status).inc()
+    if metrics.timings is not None:
+        SOLVE_SECONDS.labels(algorithm, size).observe(metrics.timings.total_ms / 1000)
+        for phase in PHASES:
+            PHASE_SECONDS.labels(algorithm, size, phase).observe(getattr(metrics.timings, f"{phase}_ms") / 1000)
+    if metrics.num_variables is not None:
+        MODEL_VARIABLES.labels(algorithm, size).observe(metrics.num_variables)
+    if metrics.num_constraints is not None:
+        MODEL_CONSTRAINTS.labels(algorithm, size).observe(metrics.num_constraints)
+
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+
+def render() -> bytes:
+    """Current metrics in the Prometheus text exposition format."""
+    return generate_latest()
+
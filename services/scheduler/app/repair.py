@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+from .domain.models import (
+    AssignmentSegment,
+    AvailabilitySlot,
+    LockedAssignment,
+    RepairRequest,
+    SolveMetrics,
+    SolveRequest,
+    SolveResponse,
+    Weekday,
+)
+from .solver.compiled import compile_request
+from .solver.eligibility import EligibilityIndex
+from .solver.labor import DAY_POSITION
+from .templates import apply_overrides
+
+logger = logging.getLogger(__name__)
+
+REPAIR_PROFILE = "fast"
+REPAIR_CHANGE_PENALTY = 100  # Used when the week was solved without a change penalty
+
+
+@dataclass
+class RepairPlan:
+    """The part of a disrupted week that is solved again, and the part that is kept."""
+    week: SolveRequest  # The whole week after the disruption
+    kept: List[AssignmentSegment]  # Current segments that stay as they are
+    days: Set[Weekday]
+    request: Optional[SolveRequest] = None  # None when there is nothing to re-solve
+
+
+def plan_repair(repair: RepairRequest) -> RepairPlan:
+    """
+    Cut the neighborhood of a disruption out of a solved week.
+
+    Segments the disruption breaks (removed shifts, absent employees, times the
+    new availability no longer covers) are dropped. Their days and the days of
+    added shifts, widened by ``neighborhood_days``, are solved again, with only
+    the employees who could take a vacated or added shift free to move. Everything
+    else is passed as locked assignments, so weekly limits, rest and daily caps
+    still see it, and the free employees' current segments are the warm start.
+
+    Raises ``ValueError`` when the disruption or the schedule names employees or
+    shifts the week does not have.
+    """
+    base = repair.request
+    disruption = repair.disruption
+    employees, shifts = apply_overrides(base.employees, base.shifts, disruption, "the request")
+    week = base.copy(update={"employees": employees, "shifts": shifts})
+
+    employee_ids = {emp.id for emp in base.employees}
+    shift_ids = {shift.id for shift in base.shifts}
+    for seg in repair.assignments:
+        if seg.employee_id not in employee_ids:
+            raise ValueError(f"Assignment of employee {seg.employee_id}, who is not in the request")
+        if seg.shift_id not in shift_ids:
+            raise ValueError(f"Assignment to shift {seg.shift_id}, which is not in the request")
+
+    absent = set(disruption.absent_employees)
+    removed = set(disruption.removed_shifts)
+    broken_days: Set[Weekday] = {shift.day for shift in disruption.extra_shifts}
+    open_shifts: Set[str] = {shift.id for shift in disruption.extra_shifts}
+    free: Set[str] = {emp.id for emp in disruption.extra_employees}
+    free.update(employee_id for employee_id in disruption.availability if employee_id not in absent)
+    current: List[AssignmentSegment] = []
+    for seg in repair.assignments:
+        if seg.shift_id in removed:
+            # The employee may now take another shift of the day
+            broken_days.add(seg.day)
+            if seg.employee_id not in absent:
+                free.add(seg.employee_id)
+        elif seg.employee_id in absent or (
+            not seg.locked and not _available(disruption.availability.get(seg.employee_id), seg)
+        ):
+            broken_days.add(seg.day)
+            open_shifts.add(seg.shift_id)
+        else:
+            current.append(seg)
+
+    if not broken_days:
+        return RepairPlan(week=week, kept=current, days=set())
+
+    positions = {DAY_POSITION[day] for day in broken_days}
+    reach = repair.neighborhood_days
+    days = {
+        Weekday.from_iso_index(pos + offset)
+        for pos in positions
+        for offset in range(-reach, reach + 1)
+        if 0 <= pos + offset < 7
+    }
+
+    compiled = compile_request(week)
+    index = EligibilityIndex(compiled.employees)
+    for shift in compiled.shifts:
+        if shift.id in open_shifts:
+            free.update(emp.id for emp in index.feasible_employees(shift))
+            if week.options.segment_mode:
+                free.update(emp.id for emp, _, _ in index.partial_windows(shift))
+
+    if not free:
+        # Nobody can take the vacated or added shifts, so they stay open
+        return RepairPlan(week=week, kept=current, days=days)
+
+    kept: List[AssignmentSegment] = []
+    warm_start: List[AssignmentSegment] = []
+    for seg in current:
+        if seg.day in days and seg.employee_id in free and not seg.locked:
+            warm_start.append(seg)
+        else:
+            kept.append(seg)
+
+    day_shifts = [shift for shift in week.shifts if shift.day in days]
+    day_shift_ids = {shift.id for shift in day_shifts}
+    options = week.options.copy(update={
+        "solver_time_limit_seconds": repair.time_limit_seconds,
+        "profile": REPAIR_PROFILE,
+        "portfolio": False,
+        # A vacated slot nobody can take stays open instead of sending the repair to greedy
+        "soft_coverage": True,
+        "change_penalty": week.options.change_penalty or REPAIR_CHANGE_PENALTY,
+    })
+    request = week.copy(update={
+        "shifts": day_shifts,
+        "employees": [emp for emp in week.employees if emp.id in free],
+        # Segments of the schedule are already validated, so they become locks without a second pass
+        "locked_assignments": [
+            LockedAssignment.construct(
+                employee_id=seg.employee_id,
+                shift_id=seg.shift_id,
+                day=seg.day,
+                start_minute=seg.start_minute,
+                end_minute=seg.end_minute,
+                slot=seg.slot,
+            )
+            for seg in kept
+            if seg.shift_id in day_shift_ids or seg.employee_id in free
+        ],
+        "previous_assignments": warm_start,
+        "options": options,
+    })
+    logger.info(
+        f"Repairing store {week.store_id}, week {week.iso_week}: {len(day_shifts)} shifts on "
+        f"{len(days)} days with {len(request.employees)} free employees, {len(kept)} segments kept"
+    )
+    return RepairPlan(week=week, kept=kept, days=days, request=request)
+
+
+def finish_repair(plan: RepairPlan, response: Optional[SolveResponse]) -> SolveResponse:
+    """Join the kept segments and the repaired days into a response for the whole week."""
+    assignments = list(plan.kept)
+    if response is not None:
+        # Locked segments of the response are the kept ones, already in the list
+        assignments.extend(seg for seg in response.assignments if not seg.locked)
+        metrics = response.metrics
+    else:
+        metrics = SolveMetrics(
+            # FEASIBLE: broken segments were dropped, but nobody could take their place
+            status="FEASIBLE" if plan.days else "UNCHANGED",
+            total_assigned_minutes=0,
+            solver_wall_time_ms=0,
+            coverage_ratio=1.0,
+        )
+
+    week = plan.week
+    total_minutes = sum(seg.end_minute - seg.start_minute for seg in assignments)
+    total_capacity_minutes = sum(
+        (shift.end_minute - shift.start_minute) * shift.capacity
+        for shift in week.shifts
+    )
+    worked: Dict[str, int] = defaultdict(int)
+    for seg in assignments:
+        worked[seg.employee_id] += seg.end_minute - seg.start_minute
+    return SolveResponse(
+        store_id=week.store_id,
+        iso_week=week.iso_week,
+        assignments=assignments,
+        metrics=metrics.copy(update={
+            "total_assigned_minutes": total_minutes,
+            "coverage_ratio": total_minutes / total_capacity_minutes if total_capacity_minutes > 0 else 1.0,
+            "target_deviation_minutes": sum(
+                abs(worked[emp.id] - emp.weekly_minutes_target) for emp in week.employees
+            ),
+        }),
+        infeasible_reason=response.infeasible_reason if response is not None else None,
+    )
+
+
+def _available(availability: Optional[List[AvailabilitySlot]], seg: AssignmentSegment) -> bool:
+    """Whether the segment fits the availability; None means the availability did not change."""
+    if availability is None:
+        return True
+    return any(
+        slot.day == seg.day and not slot.is_off
+        and slot.start_minute <= seg.start_minute and seg.end_minute <= slot.end_minute
+        for slot in availability
+    )
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+from .domain.models import (
+    Scenario,
+    ScenarioComparison,
+    ScenarioRequest,
+    ScenarioResult,
+    SolveRequest,
+    SolveResponse,
+)
+from .templates import apply_overrides, employees_key
+
+BASE_SCENARIO = "base"
+
+
+def scenario_variants(request: ScenarioRequest) -> List[Tuple[str, SolveRequest]]:
+    """
+    One solve request per scenario, the unchanged week first when ``include_base`` is set.
+
+    Variants that keep the base employees share an eligibility key, so a solver
+    worker builds the base eligibility index once for all of them.
+
+    Raises ``ValueError`` when a scenario names employees or shifts the base week does not have.
+    """
+    base = request.base
+    base_key = base._eligibility_key or employees_key("scenario", base.employees)
+    variants: List[Tuple[str, SolveRequest]] = []
+    if request.include_base:
+        variants.append((BASE_SCENARIO, _with_key(base, base_key)))
+    for scenario in request.scenarios:
+        variant = _apply(base, scenario)
+        variants.append((scenario.name, _with_key(variant, base_key if _keeps_employees(scenario) else None)))
+    return variants
+
+
+def compare(request: ScenarioRequest, results: List[Tuple[str, SolveRequest, SolveResponse]]) -> ScenarioComparison:
+    """Comparison table of solved variants, in the order of ``scenario_variants``."""
+    return ScenarioComparison(
+        store_id=request.base.store_id,
+        iso_week=request.base.iso_week,
+        results=[_result(name, variant, response) for name, variant, response in results],
+    )
+
+
+def _apply(base: SolveRequest, scenario: Scenario) -> SolveRequest:
+    source = f"the base of scenario {scenario.name}"
+    employees, shifts = apply_overrides(base.employees, base.shifts, scenario.changes, source)
+    if scenario.cross_store_employees:
+        employee_ids = {emp.id for emp in employees}
+        for employee_id in scenario.cross_store_employees:
+            if employee_id not in employee_ids:
+                raise ValueError(f"Cross-store employee {employee_id} is not in {source}")
+        cross_store = set(scenario.cross_store_employees)
+        employees = [
+            emp.copy(update={"can_work_across_stores": True}) if emp.id in cross_store else emp
+            for emp in employees
+        ]
+    shift_ids = {shift.id for shift in shifts}
+    employee_ids = {emp.id for emp in employees}
+    return base.copy(update={
+        "employees": employees,
+        "shifts": shifts,
+        # Locks on removed shifts or absent employees no longer apply
+        "locked_assignments": [
+            locked for locked in base.locked_assignments
+            if locked.shift_id in shift_ids and locked.employee_id in employee_ids
+        ],
+    })
+
+
+def _keeps_employees(scenario: Scenario) -> bool:
+    changes = scenario.changes
+    return not (
+        changes.availability or changes.absent_employees or changes.extra_employees
+        or scenario.cross_store_employees
+    )
+
+
+def _with_key(request: SolveRequest, key: Optional[str]) -> SolveRequest:
+    # A copy, so the key is never set on the caller's request
+    variant = request.copy()
+    variant._eligibility_key = key
+    return variant
+
+
+def _result(name: str, request: SolveRequest, response: SolveResponse) -> ScenarioResult:
+    metrics = response.metrics
+    capacity_minutes = sum((shift.end_minute - shift.start_minute) * shift.capacity for shift in request.shifts)
+    return ScenarioResult(
+        name=name,
+        status=metrics.status,
+        algorithm=metrics.algorithm,
+        coverage_ratio=metrics.coverage_ratio,
+        uncovered_minutes=max(0, capacity_minutes - metrics.total_assigned_minutes),
+        objective_value=metrics.objective_value,
+        assigned_minutes=metrics.total_assigned_minutes,
+        target_deviation_minutes=metrics.target_deviation_minutes,
+        solver_wall_time_ms=metrics.solver_wall_time_ms,
+    )
@@ -1,17 +1,414 @@
 from __future__ import annotations
 
-from .domain.models import SolveRequest, SolveResponse
+import asyncio
+import logging
+import math
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar, Union
+
+from .batch import merge_batch, split_batch
+from .cache import SolveResultCache, result_cache
+from .config import Settings, settings
+from .domain.models import (
+    BatchSolveRequest,
+    BatchSolveResponse,
+    HorizonSolveRequest,
+    HorizonSolveResponse,
+    RepairRequest,
+    ScenarioComparison,
+    ScenarioRequest,
+    SolveRequest,
+    SolveResponse,
+    TemplateSolveRequest,
+)
+from .horizon import horizon_weeks, solve_horizon
+from .metrics import record_solve
+from .repair import finish_repair, plan_repair
+from .scenarios import compare, scenario_variants
 from .solver.cpsat import CPSATSolver
+from .solver.profiles import DEFAULT_TIME_LIMIT_SECONDS, cores_per_solve
+from .solver.progress import QueueObserver
+from .templates import TemplateRegistry, template_registry
+
+logger = logging.getLogger(__name__)
+
+# Time around the search (model build, extraction, transfer) kept free when a deadline cuts the time limit
+SOLVE_OVERHEAD_SECONDS = 1.0
+# Weight of the latest solve in the running average used to predict queue waits
+SOLVE_TIME_SMOOTHING = 0.2
+
+R = TypeVar("R", bound=Union[SolveRequest, HorizonSolveRequest])
+
+
+class SchedulerBusyError(RuntimeError):
+    """Raised when every worker is busy and the solve queue is full."""
+
+
+class SchedulerUnavailableError(RuntimeError):
+    """Raised when a solve cannot be completed by the worker pool."""
+
+
+class SolveDeadlineExceeded(SchedulerUnavailableError):
+    """Raised when a solve does not finish within its request deadline."""
+
+
+_worker_solver: Optional[CPSATSolver] = None
+
+
+def _init_worker(default_profile: str, search_workers: int) -> None:
+    """Pool process initializer; builds the solver this process reuses for every solve."""
+    global _worker_solver
+    _worker_solver = CPSATSolver(default_profile=default_profile, search_workers=search_workers)
+
+
+def _solver() -> CPSATSolver:
+    """The solver ``_init_worker`` built for this pool process."""
+    if _worker_solver is None:
+        raise RuntimeError("Solver pool process was started without _init_worker")
+    return _worker_solver
+
+
+def _solve_in_worker(request: SolveRequest) -> SolveResponse:
+    """Entry point executed inside a pool process."""
+    return _solver().solve(request)
+
+
+def _solve_all_in_worker(requests: List[SolveRequest]) -> List[SolveResponse]:
+    """Solve several requests concurrently inside one pool process."""
+    return _solver().solve_all(requests)
+
+
+def _solve_job_in_worker(request: SolveRequest, job_id: str, progress: Any, cancelled: Any) -> SolveResponse:
+    """Solve a background job inside a pool process, reporting to ``progress`` and stopping on ``cancelled``."""
+    observer = QueueObserver(job_id, progress, cancelled)
+    try:
+        return _solver().solve(request, observer=observer)
+    finally:
+        observer.close()
+
+
+def _solve_horizon_in_worker(request: HorizonSolveRequest) -> HorizonSolveResponse:
+    """Solve every week of a horizon in one pool process, so the weeks share its eligibility indexes."""
+    return solve_horizon(_solver(), request)
 
 
 class SchedulerService:
     """Application service coordinating the CP-SAT solver."""
 
-    def __init__(self) -> None:
-        self._solver = CPSATSolver()
+    def __init__(
+        self,
+        config: Settings = settings,
+        cache: SolveResultCache = result_cache,
+        templates: TemplateRegistry = template_registry,
+    ) -> None:
+        self._settings = config
+        self._cache = cache
+        self._templates = templates
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._solve_seconds: Optional[float] = None  # Running average of pool solve times
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of solves that may be running or queued at once."""
+        return self._settings.solver_pool_workers + self._settings.solver_queue_size
+
+    @property
+    def search_workers(self) -> int:
+        """CP-SAT workers per solve, so a full pool does not oversubscribe the cores."""
+        return self._settings.solver_search_workers or cores_per_solve(self._settings.solver_pool_workers)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def cache(self) -> SolveResultCache:
+        return self._cache
+
+    @property
+    def templates(self) -> TemplateRegistry:
+        return self._templates
+
+    async def solve(self, request: SolveRequest) -> SolveResponse:
+        """Solve in the process pool without blocking the event loop.
+
+        Raises ``SchedulerBusyError`` when the queue is full and
+        ``SolveDeadlineExceeded`` when the request deadline elapses first.
+        Identical requests are answered from the result cache without a solve.
+        """
+        key, cached = (await self._cached([request]))[0]
+        if cached is not None:
+            logger.info(f"Serving cached schedule for store {request.store_id}, week {request.iso_week}")
+            return cached
+        deadline = self._deadline_for(request)
+        fitted = self._fit_to_deadline(request, deadline)
+        future = self._submit(fitted)
+        try:
+            response = await asyncio.wait_for(asyncio.wrap_future(future), timeout=deadline)
+        except asyncio.TimeoutError as exc:
+            future.cancel()
+            raise SolveDeadlineExceeded(
+                f"Solve for store {request.store_id} exceeded its deadline"
+            ) from exc
+        except BrokenProcessPool as exc:
+            self._reset_executor()
+            raise SchedulerUnavailableError("Solver worker pool crashed, retry the request") from exc
+        record_solve(request, response)
+        self._observe(response)
+        if key and fitted is request:  # A search cut short by the deadline is not kept for later requests
+            await self._remember([(key, response)])
+        return response
+
+    async def solve_batch(self, batch: BatchSolveRequest) -> BatchSolveResponse:
+        """Solve several stores jointly over their shared employee pool.
+
+        The stores go to the pool as one request, so weekly limits hold across
+        stores and the whole batch takes one queue slot and one model build.
+        """
+        response = await self.solve(merge_batch(batch))
+        return split_batch(batch, response)
+
+    async def solve_template(self, request: TemplateSolveRequest) -> SolveResponse:
+        """Solve a week described by a registered template plus its overrides.
+
+        Raises ``UnknownTemplateError`` when the template version is not registered.
+        """
+        return await self.solve(self._templates.resolve(request))
+
+    async def solve_horizon(self, request: HorizonSolveRequest) -> HorizonSolveResponse:
+        """Solve consecutive weeks in one call, each starting from the state the weeks before left.
+
+        The whole horizon runs in one pool process and takes one queue slot; its
+        deadline allows one solve per week. Raises ``ValueError`` when a week's
+        overrides name unknown employees or shifts.
+        """
+        weeks = horizon_weeks(request)
+        deadline = self._deadline_for(weeks[0], solves=len(weeks))
+        future = self._submit_all(
+            _solve_horizon_in_worker, [(self._fit_to_deadline(request, deadline, solves=len(weeks)),)]
+        )[0]
+        try:
+            response = await asyncio.wait_for(asyncio.wrap_future(future), timeout=deadline)
+        except asyncio.TimeoutError as exc:
+            future.cancel()
+            raise SolveDeadlineExceeded(
+                f"Horizon of {len(weeks)} weeks for store {request.store_id} exceeded its deadline"
+            ) from exc
+        except BrokenProcessPool as exc:
+            self._reset_executor()
+            raise SchedulerUnavailableError("Solver worker pool crashed, retry the request") from exc
+        for week, week_response in zip(weeks, response.weeks):
+            record_solve(week, week_response)
+            self._observe(week_response)
+        return response
+
+    async def repair(self, request: RepairRequest) -> SolveResponse:
+        """Re-solve only the days and employees a disruption touches, keeping the rest of the week.
+
+        Raises ``ValueError`` when the disruption or schedule names unknown employees or shifts.
+        """
+        plan = plan_repair(request)
+        if plan.request is None:
+            return finish_repair(plan, None)
+        return finish_repair(plan, await self.solve(plan.request))
+
+    async def compare_scenarios(self, request: ScenarioRequest) -> ScenarioComparison:
+        """Solve what-if variants of one week in parallel and tabulate their outcomes.
+
+        The variants are spread over the pool processes, and each process solves
+        its share concurrently with one eligibility index for the variants that keep
+        the base employees. Variants solved before are answered from the cache.
+        Raises ``ValueError`` when a scenario names unknown employees or shifts.
+        """
+        variants = await asyncio.to_thread(scenario_variants, request)  # Hashes the base employees
+        responses: Dict[int, SolveResponse] = {}
+        lookups = await self._cached([variant for _, variant in variants])
+        for position, (_, cached) in enumerate(lookups):
+            if cached is not None:
+                responses[position] = cached
+        pending = [position for position in range(len(variants)) if position not in responses]
+        if pending:
+            chunk_count = min(len(pending), self._settings.solver_pool_workers)
+            chunks = [pending[i::chunk_count] for i in range(chunk_count)]
+            deadline = self._deadline_for(request.base)
+            fitted = {
+                position: self._fit_to_deadline(variants[position][1], deadline, tasks=chunk_count)
+                for position in pending
+            }
+            futures = self._submit_all(
+                _solve_all_in_worker, [([fitted[position] for position in chunk],) for chunk in chunks]
+            )
+            try:
+                results = await asyncio.wait_for(
+                    asyncio.gather(*(asyncio.wrap_future(future) for future in futures)),
+                    timeout=deadline,
+                )
+            except asyncio.TimeoutError as exc:
+                for future in futures:
+                    future.cancel()
+                raise SolveDeadlineExceeded(
+                    f"Scenarios for store {request.base.store_id} exceeded their deadline"
+                ) from exc
+            except BrokenProcessPool as exc:
+                self._reset_executor()
+                raise SchedulerUnavailableError("Solver worker pool crashed, retry the request") from exc
+            solved = []
+            for chunk, chunk_responses in zip(chunks, results):
+                for position, response in zip(chunk, chunk_responses):
+                    record_solve(variants[position][1], response)
+                    self._observe(response)
+                    key = lookups[position][0]
+                    if key and fitted[position] is variants[position][1]:
+                        solved.append((key, response))
+                    responses[position] = response
+            await self._remember(solved)
+        logger.info(
+            f"Compared {len(variants)} scenarios for store {request.base.store_id}, "
+            f"{len(variants) - len(pending)} from the cache"
+        )
+        return compare(
+            request, [(name, variant, responses[position]) for position, (name, variant) in enumerate(variants)]
+        )
+
+    async def _cached(
+        self, requests: Sequence[SolveRequest]
+    ) -> List[Tuple[Optional[str], Optional[SolveResponse]]]:
+        """Cache key of each request, None when caching is off for it, and its cached response.
+
+        Fingerprinting and disk reads run in a thread so large requests and SQLite
+        do not block the event loop; the in-memory tier is read inline.
+        """
+        if not self._cache.enabled:
+            return [(None, None)] * len(requests)
+        keys = await asyncio.to_thread(lambda: [self._cache.key_for(request) for request in requests])
+        cached = [self._cache.get_memory(key) if key else None for key in keys]
+        missing = [position for position, key in enumerate(keys) if key and cached[position] is None]
+
+        def read_disk() -> List[Optional[SolveResponse]]:
+            return [self._cache.get_disk(keys[position]) for position in missing]
+
+        found = await asyncio.to_thread(read_disk) if missing and self._cache.persistent else read_disk()
+        for position, response in zip(missing, found):
+            cached[position] = response
+        return list(zip(keys, cached))
+
+    async def _remember(self, entries: Sequence[Tuple[str, SolveResponse]]) -> None:
+        """Cache ``entries`` in memory inline and write them to the disk tier in a thread."""
+        payloads = [(key, self._cache.put_memory(key, response)) for key, response in entries]
+        if payloads and self._cache.persistent:
+            await asyncio.to_thread(lambda: [self._cache.put_disk(key, payload) for key, payload in payloads])
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit_job(self, request: SolveRequest, job_id: str, progress: Any, cancelled: Any) -> Future:
+        """Run a background job's solve in the pool.
+
+        Improving schedules arrive on ``progress`` as ``(job_id, response)``, and
+        setting ``cancelled`` stops the search. Jobs are bounded by the job manager,
+        so they skip the solve queue limit, but they count as in flight.
+        """
+        future = self._submit_all(_solve_job_in_worker, [(request, job_id, progress, cancelled)], bounded=False)[0]
+        future.add_done_callback(self._reset_if_broken)
+        return future
+
+    def _submit(self, request: SolveRequest) -> Future:
+        return self._submit_all(_solve_in_worker, [(request,)])[0]
+
+    def _submit_all(self, fn: Callable, args: Sequence[Tuple], bounded: bool = True) -> List[Future]:
+        """Submit one pool task per argument tuple; all of them fit in the queue or none is submitted."""
+        with self._lock:
+            if bounded and self._in_flight + len(args) > self.capacity:
+                raise SchedulerBusyError(
+                    f"Solver queue is full ({self._in_flight} solves in flight)"
+                )
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._settings.solver_pool_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self._settings.solver_profile, self.search_workers),
+                )
+            futures = [self._executor.submit(fn, *task_args) for task_args in args]
+            self._in_flight += len(futures)
+        # Release a slot only when the worker is actually done, so a request that
+        # timed out while running still counts against the queue until it finishes.
+        for future in futures:
+            future.add_done_callback(self._release)
+        return futures
+
+    def _release(self, _: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def _reset_if_broken(self, future: Future) -> None:
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._reset_executor()
+
+    def _reset_executor(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        logger.warning("Solver process pool was reset after a worker crash")
+
+    def _deadline_for(self, request: SolveRequest, solves: int = 1) -> float:
+        options = request.options
+        if options.deadline_seconds is not None:
+            deadline = options.deadline_seconds
+        else:
+            deadline = (
+                float(options.solver_time_limit_seconds or 15) * solves + self._settings.solve_deadline_grace_seconds
+            )
+        return min(deadline, self._settings.solve_max_deadline_seconds)
+
+    def _fit_to_deadline(self, request: R, deadline: float, solves: int = 1, tasks: int = 1) -> R:
+        """``request`` with its solver time limit cut to what ``deadline`` leaves after the expected queue wait.
+
+        ``solves`` searches run one after another within the deadline, and ``tasks``
+        are submitted together. Returns ``request`` itself when its limit already fits.
+        """
+        options = request.options
+        budget = (deadline - self._expected_wait(tasks)) / solves - SOLVE_OVERHEAD_SECONDS
+        limit = max(1, math.floor(budget))
+        if limit >= (options.solver_time_limit_seconds or DEFAULT_TIME_LIMIT_SECONDS):
+            return request
+        logger.info(
+            f"Cutting the solver time limit to {limit}s to meet a {deadline:.0f}s deadline "
+            f"({self._in_flight} solves in flight)"
+        )
+        return request.copy(update={"options": options.copy(update={"solver_time_limit_seconds": limit})})
+
+    def _expected_wait(self, tasks: int = 1) -> float:
+        """Seconds the next ``tasks`` submissions are expected to wait for a free worker."""
+        workers = self._settings.solver_pool_workers
+        with self._lock:
+            ahead = self._in_flight + tasks - workers
+            solve_seconds = self._solve_seconds
+        if ahead <= 0:
+            return 0.0
+        if solve_seconds is None:
+            solve_seconds = float(DEFAULT_TIME_LIMIT_SECONDS)
+        return math.ceil(ahead / workers) * solve_seconds
 
-    def generate_schedule(self, request: SolveRequest) -> SolveResponse:
-        return self._solver.solve(request)
+    def _observe(self, response: SolveResponse) -> None:
+        timings = response.metrics.timings
+        if timings is None:
+            return
+        seconds = timings.total_ms / 1000
+        with self._lock:
+            if self._solve_seconds is None:
+                self._solve_seconds = seconds
+            else:
+                self._solve_seconds += SOLVE_TIME_SMOOTHING * (seconds - self._solve_seconds)
 
 
 scheduler_service = SchedulerService()
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import TYPE_CHECKING, Dict, List, Sequence, Tuple
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from ..domain.models import LockedAssignment
+from .compiled import EmployeeRecord
+from .labor import DAY_POSITION, MINUTES_PER_DAY
+
+if TYPE_CHECKING:
+    from .cpsat import ShiftSlot
+
+
+class CandidateMatrix:
+    """
+    Sparse employee × slot matrix of the assignment variables of one CP-SAT model.
+
+    Slot attributes (absolute start minute, duration, locked employee) are held
+    as NumPy columns, and every created variable is recorded as an (employee, slot)
+    entry. ``freeze`` sorts the entries by employee once, so per-employee
+    constraints read a contiguous range instead of probing every
+    employee × shift × slot combination.
+
+    Locked assignments that bind no slot (shifts outside the request, partial
+    segments) are kept as plain intervals, so the labor rules still see them.
+
+    A variable standing for a whole shift rather than one of its slots is recorded
+    at the shift's first unlocked slot; ``free_slot_numbers`` lists the unlocked
+    slots that extraction hands out to the chosen employees.
+    """
+
+    def __init__(
+        self,
+        employees: Sequence[EmployeeRecord],
+        slots: Sequence["ShiftSlot"],
+        locked_assignments: Sequence[LockedAssignment] = (),
+    ) -> None:
+        self.employees = list(employees)
+        self.slots = list(slots)
+        self._positions: Dict[str, int] = {emp.id: pos for pos, emp in enumerate(employees)}
+        self._employee_count = len(employees)
+        count = len(slots)
+        self.slot_start = np.fromiter((slot.day_start_minute for slot in slots), dtype=np.int64, count=count)
+        self.slot_duration = np.fromiter((slot.duration for slot in slots), dtype=np.int64, count=count)
+        self.slot_locked = np.fromiter(
+            (self._positions.get(slot.locked_employee_id, -1) if slot.locked_employee_id else -1 for slot in slots),
+            dtype=np.int64,
+            count=count,
+        )
+        self._slot_index: Dict[Tuple[str, int], int] = {
+            (slot.shift.id, slot.slot_number): pos for pos, slot in enumerate(slots)
+        }
+        self._unslotted_locks = _unslotted_locks(locked_assignments, slots)
+        self.free_slot_numbers: Dict[str, List[int]] = defaultdict(list)
+        for slot in slots:
+            if not slot.locked_employee_id:
+                self.free_slot_numbers[slot.shift.id].append(slot.slot_number)
+
+        self._rows: List[int] = []
+        self._cols: List[int] = []
+        self.variables: List[cp_model.IntVar] = []
+
+        # Filled by freeze()
+        self.entry_employee = np.empty(0, dtype=np.int64)
+        self.entry_slot = np.empty(0, dtype=np.int64)
+        self._var_index = np.empty(0, dtype=np.int64)
+        self._order = np.empty(0, dtype=np.int64)
+        self._cols_sorted = np.empty(0, dtype=np.int64)
+        self._bounds = np.zeros(self._employee_count + 1, dtype=np.int64)
+        self._locked_order = np.empty(0, dtype=np.int64)
+        self._locked_bounds = np.zeros(self._employee_count + 1, dtype=np.int64)
+
+    def add(self, employee_id: str, shift_id: str, slot_number: int, var: cp_model.IntVar) -> None:
+        self._rows.append(self._positions[employee_id])
+        self._cols.append(self._slot_index[(shift_id, slot_number)])
+        self.variables.append(var)
+
+    def freeze(self) -> None:
+        """Group the recorded entries by employee; call once all variables exist."""
+        rows = self.entry_employee = np.asarray(self._rows, dtype=np.int64)
+        cols = self.entry_slot = np.asarray(self._cols, dtype=np.int64)
+        self._var_index = np.fromiter((var.Index() for var in self.variables), dtype=np.int64, count=len(self.variables))
+        self._order = np.argsort(rows, kind="stable")
+        self._bounds = np.searchsorted(rows[self._order], np.arange(self._employee_count + 1))
+        self._cols_sorted = cols[self._order]
+
+        self._locked_order = np.argsort(self.slot_locked, kind="stable")
+        self._locked_bounds = np.searchsorted(
+            self.slot_locked[self._locked_order], np.arange(self._employee_count + 1)
+        )
+
+    def employee_terms(self, employee_id: str) -> Tuple[List[cp_model.IntVar], List[int], List[int], List[int]]:
+        """Variables of ``employee_id`` with their slot durations, absolute starts, and slot positions."""
+        pos = self._positions[employee_id]
+        lo, hi = self._bounds[pos], self._bounds[pos + 1]
+        entries = self._order[lo:hi]
+        slots = self._cols_sorted[lo:hi]
+        return (
+            [self.variables[entry] for entry in entries.tolist()],
+            self.slot_duration[slots].tolist(),
+            self.slot_start[slots].tolist(),
+            slots.tolist(),
+        )
+
+    def locked_slots(self, employee_id: str) -> List[int]:
+        """Positions of the slots locked to ``employee_id``."""
+        pos = self._positions[employee_id]
+        lo, hi = self._locked_bounds[pos], self._locked_bounds[pos + 1]
+        return self._locked_order[lo:hi].tolist()
+
+    def locked_intervals(self, employee_id: str) -> List[Tuple[int, int]]:
+        """(absolute start, duration) of all locked work of ``employee_id``, sorted by start."""
+        intervals = [
+            (int(self.slot_start[pos]), int(self.slot_duration[pos])) for pos in self.locked_slots(employee_id)
+        ]
+        intervals.extend(self._unslotted_locks.get(employee_id, ()))
+        return sorted(intervals)
+
+    def chosen(self, values: np.ndarray) -> np.ndarray:
+        """Entries set to 1 in ``values``, the model's solution indexed by variable index."""
+        return np.flatnonzero(values[self._var_index])
+
+    def assigned_minutes(self, values: np.ndarray) -> int:
+        """Minutes covered by the entries set to 1 in ``values``."""
+        return int(self.slot_duration[self.entry_slot[self.chosen(values)]].sum())
+
+
+def _unslotted_locks(
+    locked_assignments: Sequence[LockedAssignment], slots: Sequence["ShiftSlot"]
+) -> Dict[str, List[Tuple[int, int]]]:
+    """Per employee, (absolute start, duration) of the locked assignments that hold no slot."""
+    held = {
+        (slot.shift.id, slot.slot_number, slot.locked_employee_id, slot.start_minute, slot.end_minute)
+        for slot in slots
+        if slot.locked_employee_id
+    }
+    unslotted: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+    for locked in locked_assignments:
+        key = (locked.shift_id, locked.slot, locked.employee_id, locked.start_minute, locked.end_minute)
+        if key in held:
+            continue
+        start = DAY_POSITION[locked.day] * MINUTES_PER_DAY + locked.start_minute
+        unslotted[locked.employee_id].append((start, locked.end_minute - locked.start_minute))
+    return unslotted
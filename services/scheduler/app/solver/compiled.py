@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import sys
+from typing import FrozenSet, List, Optional, Sequence, Tuple
+
+from ..domain.models import (
+    AssignmentSegment,
+    CarryOver,
+    Employee,
+    LockedAssignment,
+    Shift,
+    SolveOptions,
+    SolveRequest,
+)
+from .labor import DAY_POSITION, MINUTES_PER_DAY
+
+# (day position, start minute, end minute)
+Window = Tuple[int, int, int]
+
+
+class EmployeeRecord:
+    """
+    Solver view of one ``Employee``, with plain attributes instead of model fields.
+
+    Role names are lowered, and role and store strings interned, so every
+    comparison in the eligibility and ranking loops is a set probe on shared
+    strings. Availability keeps only working windows, by day position.
+    ``position`` is the employee's row in the table it was compiled into.
+    """
+
+    __slots__ = (
+        "position",
+        "id",
+        "name",
+        "home_store_id",
+        "can_work_across_stores",
+        "contract_type",
+        "weekly_minutes_target",
+        "role_ids",
+        "role_names",
+        "windows",
+    )
+
+    def __init__(self, position: int, employee: Employee) -> None:
+        self.position = position
+        self.id = employee.id
+        self.name = employee.name
+        self.home_store_id = sys.intern(employee.home_store_id)
+        self.can_work_across_stores = employee.can_work_across_stores
+        self.contract_type = sys.intern(employee.contract_type)
+        self.weekly_minutes_target = employee.weekly_minutes_target
+        self.role_ids: FrozenSet[str] = frozenset(sys.intern(role_id) for role_id in employee.role_ids)
+        self.role_names: FrozenSet[str] = frozenset(sys.intern(name.lower()) for name in employee.role_names)
+        self.windows: Tuple[Window, ...] = tuple(
+            (DAY_POSITION[slot.day], slot.start_minute, slot.end_minute)
+            for slot in employee.availability
+            if not slot.is_off
+        )
+
+
+class ShiftRecord:
+    """Solver view of one ``Shift``, with its day position and absolute minutes of the week computed once."""
+
+    __slots__ = (
+        "id",
+        "role",
+        "role_key",
+        "day",
+        "day_position",
+        "start_minute",
+        "end_minute",
+        "duration",
+        "week_start",
+        "week_end",
+        "capacity",
+        "store_id",
+        "work_type_id",
+    )
+
+    def __init__(self, shift: Shift) -> None:
+        self.id = shift.id
+        self.role = shift.role
+        self.role_key = sys.intern(shift.role.lower())
+        self.day = shift.day
+        self.day_position = DAY_POSITION[shift.day]
+        self.start_minute = shift.start_minute
+        self.end_minute = shift.end_minute
+        self.duration = shift.end_minute - shift.start_minute
+        self.week_start = self.day_position * MINUTES_PER_DAY + shift.start_minute
+        self.week_end = self.day_position * MINUTES_PER_DAY + shift.end_minute
+        self.capacity = shift.capacity
+        self.store_id = sys.intern(shift.store_id)
+        self.work_type_id = sys.intern(shift.work_type_id) if shift.work_type_id else None
+
+
+class CompiledRequest:
+    """
+    A ``SolveRequest`` with its employees and shifts compiled to records.
+
+    Locks, options, the previous schedule and the carry-over are small and kept
+    as they came. Sub-problems are derived with ``replace``, which shares the
+    records instead of copying the request model.
+    """
+
+    __slots__ = (
+        "store_id",
+        "iso_week",
+        "employees",
+        "shifts",
+        "locked_assignments",
+        "options",
+        "previous_assignments",
+        "carry_over",
+    )
+
+    def __init__(
+        self,
+        store_id: str,
+        iso_week: str,
+        employees: List[EmployeeRecord],
+        shifts: List[ShiftRecord],
+        locked_assignments: List[LockedAssignment],
+        options: SolveOptions,
+        previous_assignments: List[AssignmentSegment],
+        carry_over: List[CarryOver],
+    ) -> None:
+        self.store_id = store_id
+        self.iso_week = iso_week
+        self.employees = employees
+        self.shifts = shifts
+        self.locked_assignments = locked_assignments
+        self.options = options
+        self.previous_assignments = previous_assignments
+        self.carry_over = carry_over
+
+    def replace(self, **changes) -> CompiledRequest:
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return CompiledRequest(**fields)
+
+
+def compile_employees(employees: Sequence[Employee]) -> List[EmployeeRecord]:
+    return [EmployeeRecord(position, emp) for position, emp in enumerate(employees)]
+
+
+def compile_request(request: SolveRequest, employees: Optional[List[EmployeeRecord]] = None) -> CompiledRequest:
+    """Compile ``request`` for the solver.
+
+    ``employees`` are records already compiled from the request's employees, such
+    as those of an eligibility index shared through the request's eligibility key.
+    """
+    return CompiledRequest(
+        store_id=request.store_id,
+        iso_week=request.iso_week,
+        employees=employees if employees is not None else compile_employees(request.employees),
+        shifts=[ShiftRecord(shift) for shift in request.shifts],
+        locked_assignments=request.locked_assignments,
+        options=request.options,
+        previous_assignments=request.previous_assignments,
+        carry_over=request.carry_over,
+    )
@@ -1,22 +1,39 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple, Set
-from collections import defaultdict
+from itertools import count
+from typing import Dict, List, Optional, Tuple, Set, Union
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import logging
+import threading
 
+import numpy as np
 from ortools.sat.python import cp_model
 
 from ..domain.models import (
     AssignmentSegment,
-    Employee,
+    CarryOver,
+    InfeasibilityExplanation,
     LockedAssignment,
-    Shift,
     SolveMetrics,
     SolveRequest,
     SolveResponse,
     Weekday,
 )
+from .candidates import CandidateMatrix
+from .compiled import CompiledRequest, EmployeeRecord, ShiftRecord, compile_employees, compile_request
+from .decomposition import ProblemDecomposer
+from .eligibility import EligibilityIndex
+from .explain import EXPLANATION_SECONDS, MAX_EXPLAINED_CANDIDATES, InfeasibilityExplainer
+from .extraction import extract_assignments, solution_values
+from .greedy import GreedySolver
+from .labor import DAY_POSITION, MAX_CONSECUTIVE_DAYS, MAX_DAILY_MINUTES, MIN_REST_MINUTES
+from .portfolio import PortfolioRace
+from .profiles import DEFAULT_PROFILE, SolverProfile, cores_per_solve, get_profile
+from .progress import SolutionProgressCallback, SolveObserver
+from .segments import Stint, StintSet, aligned_window, covers_span, grid
+from .timing import PhaseTimer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -26,11 +43,6 @@ logger = logging.getLogger(__name__)
 MINUTES_PER_DAY = 24 * 60
 MINUTES_PER_WEEK = 7 * 24 * 60
 
-# Belgian labor law compliance
-MIN_REST_MINUTES = 30  # Minimum rest between shifts
-MAX_DAILY_MINUTES = 12 * 60  # Maximum 12 hours per day
-MAX_CONSECUTIVE_DAYS = 6  # Maximum consecutive working days
-
 # Contract type weekly limits (Belgian standards)
 STUDENT_WEEKLY_LIMIT_MINUTES = 20 * 60  # 20 hours for students
 PART_TIME_WEEKLY_LIMIT_MINUTES = 32 * 60  # 32 hours part-time
@@ -38,26 +50,36 @@ FULL_TIME_WEEKLY_LIMIT_MINUTES = 40 * 60  # 40 hours full-time
 
 # Optimization weights
 UNCOVERED_PENALTY_WEIGHT = 10000  # High penalty for uncovered shifts
-FAIRNESS_WEIGHT = 100  # Weight for workload balancing
-PREFERENCE_WEIGHT = 50  # Weight for employee preferences
-CROSS_STORE_PENALTY = 25  # Small penalty for cross-store assignments
+UNCOVERED_MINUTE_PENALTY = 100  # Per minute left open in a shift split into segments
+FAIRNESS_WEIGHT = 100  # Per minute away from the weekly target, in the balancing stage
+PREFERENCE_WEIGHT = 50  # Per minute worked outside the employee's own roles; requests carry no other preferences
+CROSS_STORE_PENALTY = 25  # Per minute worked away from the home store
+
+# Adaptive candidate pruning: start with the top K employees per shift and widen
+# only around the slots left open, until their candidate lists are no longer cut
+INITIAL_CANDIDATES = 5
+CANDIDATE_GROWTH = 3
+PROBE_SECONDS = 0.2  # Time limit of the soft pass locating the open slots
+
+# Eligibility indexes of template employee sets kept per solver for reuse
+INDEX_CACHE_SIZE = 8
+MIN_ROUND_SECONDS = 0.5  # Do not start another round with less time left than this
+MIN_BALANCE_SECONDS = 0.1  # Skip the workload-balancing stage with less time than this for it
+BALANCE_TIME_FRACTION = 0.25  # Share of the time left that workload balancing may use
+BALANCE_TOLERANCE_MINUTES = 60  # Skip balancing when every employee is already this close to target
+BALANCE_GAP_LIMIT = 0.01  # Balancing stops within 1% of its bound; coverage is already settled
 
-# Day mapping for constraint programming
-DAY_INDEX: Dict[Weekday, int] = {
-    Weekday.MON: 0, Weekday.TUE: 1, Weekday.WED: 2, Weekday.THU: 3,
-    Weekday.FRI: 4, Weekday.SAT: 5, Weekday.SUN: 6,
-}
 
 @dataclass(frozen=True)
 class ShiftSlot:
     """Represents a single slot within a multi-capacity shift"""
-    shift: Shift
+    shift: ShiftRecord
     slot_number: int  # 0, 1, 2, etc. for capacity slots
     locked_employee_id: Optional[str] = None
 
     @property
     def duration(self) -> int:
-        return self.shift.end_minute - self.shift.start_minute
+        return self.shift.duration
     
     @property
     def start_minute(self) -> int:
@@ -69,13 +91,52 @@ class ShiftSlot:
 
     @property
     def day_start_minute(self) -> int:
-        """Absolute minute from start of week"""
-        return DAY_INDEX[self.shift.day] * MINUTES_PER_DAY + self.shift.start_minute
+        """Absolute minute from start of week, computed when the shift was compiled"""
+        return self.shift.week_start
 
     @property
     def day_end_minute(self) -> int:
-        """Absolute minute from start of week"""
-        return DAY_INDEX[self.shift.day] * MINUTES_PER_DAY + self.shift.end_minute
+        """Absolute minute from start of week, computed when the shift was compiled"""
+        return self.shift.week_end
+
+
+@dataclass
+class _ModelBuild:
+    """One CP-SAT model over a given set of candidates per shift"""
+    model: cp_model.CpModel
+    assign_vars: Dict[Tuple[str, str], cp_model.IntVar]  # One per (employee, shift) for whole-shift slots
+    uncovered_vars: Dict[str, List[cp_model.IntVar]]  # Per shift, counts of its open slots
+    candidates: CandidateMatrix
+    candidates_by_shift: Dict[str, List[EmployeeRecord]]
+    partial_by_shift: Dict[str, List[Tuple[EmployeeRecord, int, int]]]
+    stints: StintSet
+    employee_minutes: Dict[str, cp_model.IntVar]
+    coverage_objective: Optional[cp_model.LinearExpr]  # None when the model has nothing to minimize
+    has_objective: bool
+
+
+class _SearchControl:
+    """Stop handle handed to the observer once, valid across every search round"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._solver: Optional[cp_model.CpSolver] = None
+        self.stopped = False
+
+    def attach(self, solver: cp_model.CpSolver) -> None:
+        with self._lock:
+            self._solver = solver
+
+    def detach(self) -> None:
+        with self._lock:
+            self._solver = None
+
+    def stop(self) -> None:
+        with self._lock:
+            self.stopped = True
+            solver = self._solver
+        if solver is not None:
+            solver.StopSearch()
 
 
 class CPSATSolver:
@@ -91,24 +152,201 @@ class CPSATSolver:
     - Advanced constraint satisfaction
     """
 
-    def solve(self, request: SolveRequest) -> SolveResponse:
+    def __init__(
+        self,
+        decomposer: Optional[ProblemDecomposer] = None,
+        default_profile: str = DEFAULT_PROFILE,
+        search_workers: Optional[int] = None,
+    ) -> None:
+        self._decomposer = decomposer or ProblemDecomposer()
+        self._greedy = GreedySolver(self._get_weekly_limit)
+        self._default_profile = get_profile(default_profile)
+        # CP-SAT workers one solve may use; decomposed parts running in parallel share them
+        self._search_workers = search_workers or cores_per_solve()
+        self._indexes: "OrderedDict[str, EligibilityIndex]" = OrderedDict()
+        self._indexes_lock = threading.Lock()
+
+    def solve(
+        self,
+        request: SolveRequest,
+        observer: Optional[SolveObserver] = None,
+        search_workers: Optional[int] = None,
+    ) -> SolveResponse:
+        """Solve a schedule; ``observer`` receives intermediate solutions and may stop the search.
+
+        ``search_workers`` overrides the CP-SAT workers of this solve, for solves sharing the cores.
+        """
         logger.info(f"Starting optimized CP-SAT solve for store {request.store_id}, week {request.iso_week}")
         logger.info(f"Employees: {len(request.employees)}, Shifts: {len(request.shifts)}")
         
-        # Log which algorithm will be used
-        if len(request.shifts) > 50 or len(request.employees) > 25:
-            logger.info("Will use GREEDY algorithm (large problem)")
-        else:
-            logger.info("Will use CP-SAT algorithm (optimal solving)")
+        timer = PhaseTimer()
+        
+        # Eligibility index shared by every feasibility lookup in this solve (lookups are memoized)
+        index = self._eligibility_index(request)
+        # The solver works on compiled records from here on; the index's employees are those of the request
+        compiled = compile_request(request, index.employees)
+        for shift in compiled.shifts:
+            index.feasible_employees(shift)
+        timer.lap("eligibility")
         
         # Quick feasibility check
-        if not self._quick_feasibility_check(request):
-            return self._create_infeasible_response(request, "Quick feasibility check failed")
+        feasible = self._quick_feasibility_check(compiled, index)
+        timer.lap("validation")
+        if not feasible:
+            response = self._create_infeasible_response(compiled, "Quick feasibility check failed")
+            if compiled.options.explain_infeasibility and compiled.employees:
+                _, all_slots = self._build_shift_slots(compiled.shifts, compiled.locked_assignments)
+                self._with_explanation(response, self._explain_infeasibility(
+                    compiled,
+                    all_slots,
+                    {shift.id: index.feasible_employees(shift) for shift in compiled.shifts},
+                    self._calculate_employee_metrics(compiled.employees, compiled.locked_assignments),
+                    EXPLANATION_SECONDS,
+                ))
+            return timer.attach(response)
+        
+        # Large problems are split into independent sub-problems solved in parallel
+        if not self._decomposer.is_small(compiled):
+            logger.info("Large problem detected, using decomposition")
+            return timer.attach(self._solve_decomposed(compiled, index, observer, search_workers), "decomposed")
+        
+        logger.info("Will use CP-SAT algorithm (optimal solving)")
+        return timer.attach(self._solve_cpsat(compiled, index, observer, search_workers=search_workers))
+
+    def solve_all(self, requests: List[SolveRequest]) -> List[SolveResponse]:
+        """Solve independent requests concurrently, splitting this solver's search workers between them.
+
+        CP-SAT releases the GIL while searching, so the searches run in parallel;
+        requests with the same eligibility key share one index.
+        """
+        if len(requests) <= 1:
+            return [self.solve(request) for request in requests]
+        search_workers = max(1, self._search_workers // len(requests))
+        with ThreadPoolExecutor(max_workers=len(requests), thread_name_prefix="solve-all") as pool:
+            return list(pool.map(lambda request: self.solve(request, search_workers=search_workers), requests))
+
+    def _eligibility_index(self, request: SolveRequest) -> EligibilityIndex:
+        """Index of the request's employees; requests built from the same template employees share one."""
+        key = request._eligibility_key
+        if key is None:
+            return EligibilityIndex(compile_employees(request.employees))
+        with self._indexes_lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+                return index
+            index = self._indexes[key] = EligibilityIndex(compile_employees(request.employees))
+            if len(self._indexes) > INDEX_CACHE_SIZE:
+                self._indexes.popitem(last=False)
+            return index
+
+    def _solve_decomposed(
+        self,
+        request: CompiledRequest,
+        index: EligibilityIndex,
+        observer: Optional[SolveObserver],
+        search_workers: Optional[int] = None,
+    ) -> SolveResponse:
+        options = request.options
+        profile = get_profile(options.profile) if options.profile else self._default_profile
+        # Greedy over the whole request budgets and seeds the parts, and is the floor of the stitched result
+        floor = self._solve_greedy(request, index)
+        solution = self._decomposer.solve(
+            request,
+            index,
+            self._get_weekly_limit,
+            lambda part, part_observer: self._solve_cpsat(
+                part.request,
+                part.index or index,
+                part_observer,
+                minute_caps=part.minute_caps,
+                search_workers=max(1, (search_workers or self._search_workers) // self._decomposer.max_workers),
+                explain=False,
+                time_limit=part.time_limit,
+            ),
+            observer,
+            baseline=floor.assignments,
+            time_limit=profile.time_limit(options.solver_time_limit_seconds),
+            report=lambda assignments, wall_time_ms: self._build_solution_response(
+                request, assignments, status="FEASIBLE", objective_value=None, wall_time_ms=wall_time_ms
+            ),
+        )
+        response = self._build_solution_response(
+            request,
+            solution.assignments,
+            status=solution.status,
+            objective_value=solution.objective_value,
+            wall_time_ms=solution.wall_time_ms,
+        )
+        if response.metrics.coverage_ratio < floor.metrics.coverage_ratio:
+            logger.info(
+                f"Stitched parts cover {response.metrics.coverage_ratio:.1%}, "
+                f"below greedy's {floor.metrics.coverage_ratio:.1%}; keeping the greedy schedule"
+            )
+            response = floor
+        parts_timer = PhaseTimer()
+        parts_timer.add(floor.metrics.timings)
+        floor.metrics.timings = None  # Charged to this solve's timer whichever response is kept
+        for metrics in solution.part_metrics:
+            parts_timer.add(metrics.timings)
+            parts_timer.add_model_size(metrics.num_variables, metrics.num_constraints)
+        parts_timer.attach(response)
+        if request.options.explain_infeasibility and response.metrics.coverage_ratio < 1.0:
+            # Parts are not explained on their own: day blocks only see their share of the weekly limits
+            self._with_explanation(response, self._explain_infeasibility(
+                request,
+                self._build_shift_slots(request.shifts, request.locked_assignments)[1],
+                {shift.id: index.feasible_employees(shift) for shift in request.shifts},
+                self._calculate_employee_metrics(request.employees, request.locked_assignments),
+                EXPLANATION_SECONDS,
+            ))
+        logger.info(
+            f"Decomposed solve over {solution.parts} parts generated {len(solution.assignments)} assignments "
+            f"({solution.stitched_assignments} stitched) with {response.metrics.coverage_ratio:.1%} coverage"
+        )
+        return response
+
+    def _solve_cpsat(
+        self,
+        request: CompiledRequest,
+        index: EligibilityIndex,
+        observer: Optional[SolveObserver] = None,
+        minute_caps: Optional[Dict[str, int]] = None,
+        search_workers: Optional[int] = None,
+        explain: bool = True,
+        time_limit: Optional[float] = None,
+    ) -> SolveResponse:
+        """Solve one (sub-)problem with CP-SAT, falling back to greedy.
+
+        ``minute_caps`` bounds the unlocked minutes per employee when this is a
+        day block of a decomposed solve sharing the weekly budget with other blocks.
+        Parts of a decomposed solve pass ``explain=False``; the whole request is explained instead,
+        and ``time_limit``, their share of the request's search time.
+        """
+        timer = PhaseTimer()
+        response = self._run_cpsat(
+            request, index, observer, minute_caps, search_workers, explain, timer, time_limit
+        )
+        return timer.attach(response, "cpsat")
+
+    def _run_cpsat(
+        self,
+        request: CompiledRequest,
+        index: EligibilityIndex,
+        observer: Optional[SolveObserver],
+        minute_caps: Optional[Dict[str, int]],
+        search_workers: Optional[int],
+        explain: bool,
+        timer: PhaseTimer,
+        part_time_limit: Optional[float] = None,
+    ) -> SolveResponse:
+        options = request.options
+        profile = get_profile(options.profile) if options.profile else self._default_profile
         
-        # Use greedy algorithm for very large problems or as fallback
-        if len(request.shifts) > 50 or len(request.employees) > 25:
-            logger.info("Very large problem detected, using greedy algorithm")
-            return self._solve_greedy(request)
+        # Portfolio mode: greedy runs alongside the model build and search
+        race = PortfolioRace(options.target_coverage) if options.portfolio else None
+        if race is not None:
+            race.start_greedy(lambda: self._solve_greedy(request, index, minute_caps))
         
         # Build shift slots for multi-capacity shifts
         slots_by_shift, all_slots = self._build_shift_slots(request.shifts, request.locked_assignments)
@@ -116,17 +354,267 @@ class CPSATSolver:
         # Pre-calculate employee metrics
         employee_metrics = self._calculate_employee_metrics(request.employees, request.locked_assignments)
         
+        # (employee_id, shift_id) pairs of the prior schedule, if this is a re-solve
+        previous_pairs = self._previous_pairs(request)
+        
+        # Candidates per shift, best first; each round keeps the top K of them
+        ranked_candidates = {
+            shift.id: self._rank_employees_for_shift(
+                index.feasible_employees(shift), employee_metrics, shift
+            )
+            for shift in request.shifts
+        }
+        candidate_limits = {shift.id: INITIAL_CANDIDATES for shift in request.shifts}
+        # In segment mode, employees who can cover part of a shift, longest part first. Shifts without
+        # enough whole-shift candidates for their capacity are split into stints
+        partial_candidates = self._partial_candidates(request, index) if options.segment_mode else {}
+        split_shifts = {
+            shift.id for shift in request.shifts
+            if shift.id in partial_candidates and len(ranked_candidates[shift.id]) < shift.capacity
+        }
+        timer.lap("slot_building")
+        
+        control = _SearchControl()
+        if observer is not None:
+            observer.bind_stop(control.stop)
+        
+        solver = cp_model.CpSolver()
+        profile.apply(solver, options.solver_time_limit_seconds, search_workers or self._search_workers)
+        if part_time_limit is not None:
+            solver.parameters.max_time_in_seconds = min(solver.parameters.max_time_in_seconds, part_time_limit)
+        time_limit = solver.parameters.max_time_in_seconds
+        logger.info(
+            f"Profile {profile.name}: {solver.parameters.num_search_workers} workers, "
+            f"{time_limit:.0f}s limit"
+        )
+        
+        # Candidate list lengths without pruning
+        full_limits = {
+            shift_id: max(len(ranked), len(partial_candidates.get(shift_id, ())))
+            for shift_id, ranked in ranked_candidates.items()
+        }
+        hints: Optional[Set[Tuple[str, str]]] = None
+        fallback: Optional[SolveResponse] = None
+        previous_open: Optional[int] = None
+        wall_time = 0.0
+        for round_number in count(1):
+            build = self._build_model(
+                request,
+                slots_by_shift,
+                all_slots,
+                employee_metrics,
+                minute_caps,
+                {shift_id: self._pruned(ranked, candidate_limits[shift_id], shift_id, previous_pairs)
+                 for shift_id, ranked in ranked_candidates.items()},
+                {shift_id: partial_candidates[shift_id][:candidate_limits[shift_id]] for shift_id in split_shifts},
+                soft=options.soft_coverage,
+            )
+            self._add_hints(build, request, slots_by_shift, previous_pairs, hints)
+            proto = build.model.Proto()
+            timer.add_model_size(len(proto.variables), len(proto.constraints))
+            timer.lap("model_build")
+            
+            if race is not None and race.greedy_won:
+                # Greedy already covered enough while the model was being built
+                return race.wait_greedy()
+            
+            solver.parameters.max_time_in_seconds = max(time_limit - wall_time, 0.1)
+            status, round_time = self._search(solver, build, request, slots_by_shift, control, observer, race)
+            wall_time += round_time
+            timer.lap("solve")
+            logger.info(
+                f"Round {round_number}: {len(build.candidates.variables)} candidates, "
+                f"status {solver.StatusName(status)} in {round_time:.2f}s"
+            )
+            
+            solved = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+            open_slots = self._open_slots(solver, build) if solved else None
+            if solved and not open_slots:
+                break
+            if control.stopped or (race is not None and race.winner is not None):
+                break
+            if time_limit - wall_time < MIN_ROUND_SECONDS:
+                break
+            
+            if open_slots is None:
+                if all(candidate_limits[shift_id] >= limit for shift_id, limit in full_limits.items()):
+                    break  # Nothing was pruned, so widening cannot help
+                # The greedy schedule seeds the probe, and is the fallback if the rounds still fail.
+                # A race's greedy runs on its own thread and is the fallback there, so the probe goes without
+                if fallback is None and race is None:
+                    fallback = self._solve_greedy(request, index, minute_caps)
+                    timer.lap("solve")
+                if hints is None and fallback is not None:
+                    hints = {(seg.employee_id, seg.shift_id) for seg in fallback.assignments if not seg.locked}
+                # Infeasible (or no solution yet) with hard coverage: a quick soft pass
+                # shows which slots the pruned candidate lists cannot fill
+                probe = self._build_model(
+                    request, slots_by_shift, all_slots, employee_metrics, minute_caps,
+                    build.candidates_by_shift, build.partial_by_shift, soft=True,
+                )
+                self._add_hints(probe, request, slots_by_shift, previous_pairs, hints)
+                solver.parameters.max_time_in_seconds = max(
+                    min(time_limit - wall_time, PROBE_SECONDS), 0.1
+                )
+                probe_status, probe_time = self._search(solver, probe, request, slots_by_shift, control, None, None)
+                wall_time += probe_time
+                timer.lap("solve")
+                if probe_status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                    break
+                open_slots = self._open_slots(solver, probe)
+                hints = self._assigned_keys(solver, probe)
+            else:
+                hints = self._assigned_keys(solver, build)
+            
+            widened = self._shifts_to_widen(open_slots, hints, ranked_candidates, candidate_limits)
+            if not widened:
+                break
+            still_open = sum(open_slots.values())
+            if previous_open is not None and still_open >= previous_open:
+                # The last widening closed no open slot; chasing holders further costs more rounds than the full model
+                widened = {shift_id for shift_id, limit in full_limits.items() if candidate_limits[shift_id] < limit}
+                candidate_limits.update(full_limits)
+            else:
+                for shift_id in widened:
+                    candidate_limits[shift_id] *= CANDIDATE_GROWTH
+            previous_open = still_open
+            logger.info(
+                f"Widening candidate lists of {len(widened)} shifts around {sum(open_slots.values())} open slots"
+            )
+        
+        explanation: Optional[InfeasibilityExplanation] = None
+        if status == cp_model.INFEASIBLE and options.explain_infeasibility and explain:
+            if split_shifts:
+                logger.info("Not explaining infeasibility: the explanation model has no split shifts")
+            else:
+                explanation = self._explain_infeasibility(
+                    request, all_slots, ranked_candidates, employee_metrics, time_limit, minute_caps
+                )
+                timer.lap("solve")
+        
+        greedy_response: Optional[SolveResponse] = None
+        if race is not None and not race.cpsat_won:
+            # The greedy thread is left to finish on its own once CP-SAT has won
+            greedy_response = race.wait_greedy()
+            timer.lap("solve")
+            if race.greedy_won or status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                return self._with_explanation(greedy_response, explanation)
+        
+        # If CP-SAT times out or fails, fall back to greedy
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            logger.warning(f"CP-SAT failed with status {solver.StatusName(status)}, falling back to greedy algorithm")
+            if fallback is not None:
+                fallback.metrics.timings = None  # Already charged to this solve's timer
+                return self._with_explanation(fallback, explanation)
+            return self._with_explanation(self._solve_greedy(request, index, minute_caps), explanation)
+        
+        # Status and objective are those of the coverage stage, which balancing never worsens
+        status_name = solver.StatusName(status)
+        objective_value = int(solver.ObjectiveValue()) if status == cp_model.OPTIMAL else None
+        values = solution_values(solver)
+        if race is None and not control.stopped:
+            values, balance_time = self._balance_workloads(
+                solver, build, request, slots_by_shift, employee_metrics, minute_caps,
+                control, observer, profile, values, time_limit - wall_time,
+            )
+            wall_time += balance_time
+            timer.lap("solve")
+        
+        # Process results
+        assignments = extract_assignments(build.candidates, values, request.locked_assignments, build.stints)
+        response = self._build_solution_response(
+            request,
+            assignments,
+            status=status_name,
+            objective_value=objective_value,
+            wall_time_ms=int(wall_time * 1000),
+        )
+        
+        timer.lap("extraction")
+        logger.info(f"Generated {len(assignments)} assignments with {response.metrics.coverage_ratio:.1%} coverage")
+        
+        if greedy_response is not None and greedy_response.metrics.coverage_ratio > response.metrics.coverage_ratio:
+            # Neither reached the target; keep whichever covers more
+            return greedy_response
+        return response
+
+    def _pruned(
+        self, ranked: List[EmployeeRecord], limit: int, shift_id: str, previous_pairs: Set[Tuple[str, str]]
+    ) -> List[EmployeeRecord]:
+        """Top ``limit`` candidates, keeping prior assignees beyond the cutoff"""
+        if len(ranked) <= limit:
+            return ranked
+        return ranked[:limit] + [emp for emp in ranked[limit:] if (emp.id, shift_id) in previous_pairs]
+
+    def _shifts_to_widen(
+        self,
+        open_slots: Dict[str, int],
+        assigned: Set[Tuple[str, str]],
+        ranked_candidates: Dict[str, List[EmployeeRecord]],
+        candidate_limits: Dict[str, int],
+    ) -> Set[str]:
+        """Pruned shifts to widen so the open slots can be filled.
+
+        Starts from the open shifts and the shifts holding their candidates in the
+        current solution, then follows those holders outward until it reaches
+        shifts whose candidate lists were actually cut.
+        """
+        shifts_of: Dict[str, Set[str]] = defaultdict(set)
+        for employee_id, shift_id in assigned:
+            shifts_of[employee_id].add(shift_id)
+        
+        def holders(shift_ids: Set[str]) -> Set[str]:
+            return {
+                held
+                for shift_id in shift_ids
+                for emp in ranked_candidates[shift_id]
+                for held in shifts_of.get(emp.id, ())
+            }
+        
+        open_shifts = set(open_slots)
+        seen = open_shifts | holders(open_shifts)
+        frontier = seen
+        while frontier:
+            pruned = {shift_id for shift_id in seen if candidate_limits[shift_id] < len(ranked_candidates[shift_id])}
+            if pruned:
+                return pruned
+            frontier = holders(frontier) - seen
+            seen |= frontier
+        return set()
+
+    def _build_model(
+        self,
+        request: CompiledRequest,
+        slots_by_shift: Dict[str, List[ShiftSlot]],
+        all_slots: List[ShiftSlot],
+        employee_metrics: Dict[str, Dict],
+        minute_caps: Optional[Dict[str, int]],
+        candidates_by_shift: Dict[str, List[EmployeeRecord]],
+        partial_by_shift: Dict[str, List[Tuple[EmployeeRecord, int, int]]],
+        soft: bool,
+    ) -> _ModelBuild:
+        """Build the assignment model over the given candidates.
+
+        With ``soft`` coverage every open slot gets an ``uncovered`` variable with a
+        heavy penalty, so the model stays feasible and shows which slots cannot be filled.
+        Shifts in ``partial_by_shift`` are covered by stints instead of whole-slot variables.
+
+        The slots of a shift are interchangeable, so a candidate gets one Boolean per
+        shift and the shift's Booleans add up to its open slots. Per-slot Booleans would
+        give every staffing k! equivalent solutions for CP-SAT to tell apart;
+        extraction numbers the slots afterwards.
+        """
         # Create CP-SAT model with optimizations
         model = cp_model.CpModel()
         
-        # Decision variables: assign_vars[(employee_id, shift_id, slot_number)]
-        assign_vars: Dict[Tuple[str, str, int], cp_model.IntVar] = {}
-        uncovered_vars: Dict[Tuple[str, int], cp_model.IntVar] = {}
+        # Decision variables: assign_vars[(employee_id, shift_id)]
+        assign_vars: Dict[Tuple[str, str], cp_model.IntVar] = {}
+        uncovered_vars: Dict[str, List[cp_model.IntVar]] = defaultdict(list)
         
         # Employee workload tracking with proper integer variables
         employee_minutes: Dict[str, cp_model.IntVar] = {}
         for emp in request.employees:
-            weekly_limit = self._get_weekly_limit(emp)
+            weekly_limit = self._minute_limit(emp, employee_metrics[emp.id], minute_caps)
             employee_minutes[emp.id] = model.NewIntVar(
                 employee_metrics[emp.id]['locked_minutes'],  # minimum (locked minutes)
                 weekly_limit,  # maximum (weekly limit)
@@ -136,155 +624,458 @@ class CPSATSolver:
         logger.info("Creating optimized decision variables...")
         
         # Create variables only for feasible assignments
-        total_variables = 0
+        candidates = CandidateMatrix(request.employees, all_slots, request.locked_assignments)
+        stints = StintSet()
+        uncovered_minutes: List[cp_model.IntVar] = []
         for shift in request.shifts:
-            for slot in slots_by_shift[shift.id]:
-                if slot.locked_employee_id:
-                    # Locked assignments are already included in the initial value
-                    pass
-                else:
-                    # Find feasible employees (pre-filtered)
-                    feasible_employees = self._find_feasible_employees_for_shift(shift, request.employees)
-                    
-                    if not feasible_employees:
-                        if request.options.allow_uncovered:
-                            uncovered_vars[(shift.id, slot.slot_number)] = model.NewBoolVar(
-                                f"uncovered_{shift.id}_{slot.slot_number}"
-                            )
-                        continue
-                    
-                    # Limit to top candidates for performance
-                    if len(feasible_employees) > 5:
-                        feasible_employees = self._rank_employees_for_shift(
-                            feasible_employees, employee_metrics, shift
-                        )[:5]
-                    
-                    slot_vars = []
-                    for employee in feasible_employees:
-                        var = model.NewBoolVar(f"assign_{employee.id}_{shift.id}_{slot.slot_number}")
-                        assign_vars[(employee.id, shift.id, slot.slot_number)] = var
-                        slot_vars.append(var)
-                        total_variables += 1
-                        
-                        # Workload will be constrained after all variables are created
-                    
-                    # Exactly one employee per slot (or uncovered if allowed)
-                    if request.options.allow_uncovered and (shift.id, slot.slot_number) in uncovered_vars:
-                        model.Add(sum(slot_vars) + uncovered_vars[(shift.id, slot.slot_number)] == 1)
-                    else:
-                        model.Add(sum(slot_vars) == 1)
-        
-        logger.info(f"Created {total_variables} decision variables")
-        
-        # CRITICAL: Add no-overlap constraints to prevent conflicting assignments
-        logger.info("Adding no-overlap constraints...")
-        for employee in request.employees:
-            self._add_no_overlap_constraints(model, employee, all_slots, assign_vars)
+            feasible_employees = candidates_by_shift[shift.id]
+            
+            if shift.id in partial_by_shift:
+                # May be split between employees; whole-shift candidates get stints too
+                uncovered_minutes.extend(self._add_stint_slots(
+                    model, request, slots_by_shift[shift.id], feasible_employees,
+                    partial_by_shift[shift.id], stints, uncovered_vars, soft,
+                ))
+                continue
+            
+            # Locked assignments are already included in the initial value
+            open_slots = [slot for slot in slots_by_shift[shift.id] if not slot.locked_employee_id]
+            if not open_slots:
+                continue
+            holders = {slot.locked_employee_id for slot in slots_by_shift[shift.id] if slot.locked_employee_id}
+            
+            shift_vars = []
+            for employee in feasible_employees:
+                if employee.id in holders:
+                    continue  # Already holds a locked slot of this shift
+                var = model.NewBoolVar(f"assign_{employee.id}_{shift.id}")
+                assign_vars[(employee.id, shift.id)] = var
+                candidates.add(employee.id, shift.id, open_slots[0].slot_number, var)
+                shift_vars.append(var)
+            
+            # As many employees as open slots (or fewer, the rest uncovered, if allowed)
+            covered = cp_model.LinearExpr.Sum(shift_vars)
+            if soft or not shift_vars:
+                if not soft and not request.options.allow_uncovered:
+                    continue  # Rejected up front by the quick feasibility check
+                uncovered = model.NewIntVar(0, len(open_slots), f"uncovered_{shift.id}")
+                uncovered_vars[shift.id].append(uncovered)
+                model.Add(covered + uncovered == len(open_slots))
+            else:
+                model.Add(covered == len(open_slots))
         
-        # Add workload constraints
-        logger.info("Adding workload constraints...")
+        candidates.freeze()
+        stints.freeze()
+        logger.info(f"Created {len(candidates.variables)} decision variables and {len(stints.stints)} stints")
+        
+        # Workload and no-overlap constraints read each employee's variables from the candidate matrix
+        logger.info("Adding workload and no-overlap constraints...")
+        carry_over = {carry.employee_id: carry for carry in request.carry_over}
         for employee in request.employees:
-            # Calculate total assigned minutes for this employee
-            assigned_minutes = []
-            for shift in request.shifts:
-                for slot in slots_by_shift[shift.id]:
-                    if not slot.locked_employee_id:  # Skip locked slots
-                        var = assign_vars.get((employee.id, shift.id, slot.slot_number))
-                        if var is not None:
-                            assigned_minutes.append(slot.duration * var)
+            variables, durations, starts, slot_positions = candidates.employee_terms(employee.id)
+            employee_stints = stints.employee_stints(employee.id)
+            locked_minutes = employee_metrics[employee.id]['locked_minutes']
             
             # Constraint: employee_minutes[employee.id] = locked_minutes + sum(assigned_minutes)
-            if assigned_minutes:
-                model.Add(employee_minutes[employee.id] == 
-                         employee_metrics[employee.id]['locked_minutes'] + sum(assigned_minutes))
+            if variables or employee_stints:
+                model.Add(
+                    employee_minutes[employee.id]
+                    == locked_minutes
+                    + cp_model.LinearExpr.WeightedSum(variables, durations)
+                    + cp_model.LinearExpr.Sum([stint.size for stint in employee_stints])
+                )
             else:
                 # No possible assignments for this employee
-                model.Add(employee_minutes[employee.id] == employee_metrics[employee.id]['locked_minutes'])
+                model.Add(employee_minutes[employee.id] == locked_minutes)
+            
+            # CRITICAL: prevent conflicting assignments (and keep the minimum rest between them)
+            carry = carry_over.get(employee.id)
+            self._add_no_overlap_constraints(
+                model, employee, candidates, variables, durations, starts, slot_positions, employee_stints, carry
+            )
+            self._add_labor_constraints(
+                model, employee, candidates, variables, durations, starts, employee_stints, carry
+            )
         
         # Simplified objective (just minimize uncovered shifts)
         objective_terms = []
         
         if uncovered_vars:
-            uncovered_total = sum(uncovered_vars.values())
+            uncovered_total = cp_model.LinearExpr.Sum([var for counts in uncovered_vars.values() for var in counts])
             objective_terms.append(uncovered_total * UNCOVERED_PENALTY_WEIGHT)
+        if uncovered_minutes:
+            objective_terms.append(cp_model.LinearExpr.Sum(uncovered_minutes) * UNCOVERED_MINUTE_PENALTY)
         
-        # Simple workload balancing
-        if len(request.employees) <= 10:  # Only for small teams
-            max_minutes = model.NewIntVar(0, MINUTES_PER_WEEK, "max_minutes")
-            for employee in request.employees:
-                model.Add(employee_minutes[employee.id] <= max_minutes)
-            objective_terms.append(max_minutes)
-        
-        if objective_terms:
-            model.Minimize(sum(objective_terms))
+        # Every stint is one hand-off; the stint-start penalty keeps split shifts in few pieces
+        if stints and request.options.stint_start_penalty:
+            objective_terms.append(
+                cp_model.LinearExpr.Sum([stint.presence for stint in stints.stints]) * request.options.stint_start_penalty
+            )
         
-        logger.info("Solving optimized CP-SAT model...")
+        # Optionally penalize churn against the previous schedule
+        previous_pairs = self._previous_pairs(request)
+        if previous_pairs and request.options.change_penalty:
+            objective_terms.append(
+                self._change_penalty_term(assign_vars, previous_pairs, request.options.change_penalty)
+            )
         
-        # Aggressive solver settings for speed
-        solver = cp_model.CpSolver()
-        solver.parameters.max_time_in_seconds = min(15.0, float(request.options.solver_time_limit_seconds or 15))
-        solver.parameters.num_search_workers = 2  # Reduced for stability
-        solver.parameters.log_search_progress = False
-        solver.parameters.cp_model_presolve = True
-        solver.parameters.cp_model_probing_level = 0  # Disable probing for speed
-        solver.parameters.linearization_level = 2  # Aggressive linearization
+        # Workload balancing is a second stage, see _balance_workloads
+        coverage_objective = sum(objective_terms) if objective_terms else None
+        if coverage_objective is not None:
+            model.Minimize(coverage_objective)
         
-        status = solver.Solve(model)
+        return _ModelBuild(
+            model=model,
+            assign_vars=assign_vars,
+            uncovered_vars=uncovered_vars,
+            candidates=candidates,
+            candidates_by_shift=candidates_by_shift,
+            partial_by_shift=partial_by_shift,
+            stints=stints,
+            employee_minutes=employee_minutes,
+            coverage_objective=coverage_objective,
+            has_objective=bool(objective_terms),
+        )
+
+    def _balance_workloads(
+        self,
+        solver: cp_model.CpSolver,
+        build: _ModelBuild,
+        request: CompiledRequest,
+        slots_by_shift: Dict[str, List[ShiftSlot]],
+        employee_metrics: Dict[str, Dict],
+        minute_caps: Optional[Dict[str, int]],
+        control: _SearchControl,
+        observer: Optional[SolveObserver],
+        profile: SolverProfile,
+        values: np.ndarray,
+        time_left: float,
+    ) -> Tuple[np.ndarray, float]:
+        """Second stage: re-solve for fair workloads with the coverage objective held at its first-stage value.
+
+        Starts from the first-stage schedule, so any solution it finds is at least as
+        well covered. Gets a fraction of the time left, and is skipped when the first
+        stage already has every employee within tolerance of their target. Returns the
+        values of the schedule to keep and the time spent.
+
+        It never runs for a portfolio race, which returns the first schedule to reach
+        the target, after a stopped search, or under a profile with no fairness time
+        (``fast``, which repairs use). Those responses report the deviation of the
+        unbalanced first-stage schedule.
+        """
+        budget = time_left * BALANCE_TIME_FRACTION
+        if profile.fairness_seconds is not None:
+            budget = min(budget, profile.fairness_seconds)
+        if budget < MIN_BALANCE_SECONDS:
+            return values, 0.0
+        targets = self._balance_targets(build, request, employee_metrics, minute_caps)
+        minutes = build.employee_minutes
+        deviation = max(
+            (abs(solver.Value(minutes[employee_id]) - target) for employee_id, target in targets.items()), default=0
+        )
+        if deviation <= BALANCE_TOLERANCE_MINUTES:
+            logger.info(f"Workload balancing skipped: every employee within {deviation} minutes of target")
+            return values, 0.0
+        fairness = self._fairness_objective(build, request, targets)
+        if fairness is None:
+            return values, 0.0
         
-        logger.info(f"Solver status: {solver.StatusName(status)} in {solver.WallTime():.2f}s")
+        model = build.model
+        if build.coverage_objective is not None:
+            model.Add(build.coverage_objective <= round(solver.ObjectiveValue()))
+        model.ClearHints()
+        hint = model.Proto().solution_hint
+        hint.vars.extend(range(len(values)))
+        hint.values.extend(values.tolist())
+        model.Minimize(fairness)
+        build.has_objective = True
         
-        # If CP-SAT times out or fails, fall back to greedy
+        solver.parameters.max_time_in_seconds = budget
+        solver.parameters.relative_gap_limit = BALANCE_GAP_LIMIT
+        status, balance_time = self._search(solver, build, request, slots_by_shift, control, observer, None)
         if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-            logger.warning(f"CP-SAT failed with status {solver.StatusName(status)}, falling back to greedy algorithm")
-            return self._solve_greedy(request)
-        
-        # Process results
-        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-            assignments = self._extract_assignments(
-                solver, assign_vars, request.shifts, slots_by_shift, request.locked_assignments
+            logger.info(f"Workload balancing: status {solver.StatusName(status)} in {balance_time:.2f}s")
+            return values, balance_time
+        logger.info(
+            f"Workload balancing: status {solver.StatusName(status)} in {balance_time:.2f}s, "
+            f"objective {solver.ObjectiveValue():.0f} (bound {solver.BestObjectiveBound():.0f})"
+        )
+        return solution_values(solver), balance_time
+
+    def _balance_targets(
+        self,
+        build: _ModelBuild,
+        request: CompiledRequest,
+        employee_metrics: Dict[str, Dict],
+        minute_caps: Optional[Dict[str, int]],
+    ) -> Dict[str, int]:
+        """Target minutes of each employee with candidates; the others' deviation is a constant.
+
+        Targets make up for minutes an employee is behind from earlier weeks.
+        """
+        targets = {}
+        behind = {carry.employee_id: carry.minutes_behind_target for carry in request.carry_over}
+        for employee in request.employees:
+            if not build.candidates.employee_terms(employee.id)[0] and not build.stints.employee_stints(employee.id):
+                continue
+            targets[employee.id] = self._target_minutes(
+                employee, employee_metrics[employee.id], minute_caps, behind.get(employee.id, 0)
             )
+        return targets
+
+    def _fairness_objective(
+        self, build: _ModelBuild, request: CompiledRequest, targets: Dict[str, int]
+    ) -> Optional[cp_model.LinearExpr]:
+        """L1 deviation from ``targets`` plus per-minute preference and cross-store penalties.
+
+        One deviation variable per employee with candidates, bounded below by the
+        gap on either side of the target, so the term stays linear at any store size.
+        """
+        model = build.model
+        deviations = []
+        for employee_id, target in targets.items():
+            minutes = build.employee_minutes[employee_id]
+            deviation = model.NewIntVar(0, MINUTES_PER_WEEK, f"deviation_{employee_id}")
+            model.Add(deviation >= minutes - target)
+            model.Add(deviation >= target - minutes)
+            deviations.append(deviation)
+        
+        employees = {emp.id: emp for emp in request.employees}
+        shifts = {shift.id: shift for shift in request.shifts}
+        penalty_vars: List[cp_model.IntVar] = []
+        penalty_coefficients: List[int] = []
+        for (employee_id, shift_id), var in build.assign_vars.items():
+            shift = shifts[shift_id]
+            penalty = self._assignment_penalty(employees[employee_id], shift)
+            if penalty:
+                penalty_vars.append(var)
+                penalty_coefficients.append(penalty * shift.duration)
+        for stint in build.stints.stints:
+            penalty = self._assignment_penalty(stint.employee, stint.slot.shift)
+            if penalty:
+                penalty_vars.append(stint.size)
+                penalty_coefficients.append(penalty)
+        
+        if not deviations and not penalty_vars:
+            return None
+        return (
+            cp_model.LinearExpr.Sum(deviations) * FAIRNESS_WEIGHT
+            + cp_model.LinearExpr.WeightedSum(penalty_vars, penalty_coefficients)
+        )
+
+    def _target_minutes(
+        self, employee: EmployeeRecord, metrics: Dict, minute_caps: Optional[Dict[str, int]], behind: int = 0
+    ) -> int:
+        """Minutes the employee should work in this (sub-)problem, locked minutes included"""
+        target = max(0, employee.weekly_minutes_target + behind)
+        if not minute_caps or employee.id not in minute_caps:
+            return target
+        # A day block aims at its share of the target, in proportion to its share of the weekly budget
+        remaining = metrics['remaining_capacity']
+        open_target = max(0, target - metrics['locked_minutes'])
+        share = open_target * minute_caps[employee.id] // remaining if remaining else 0
+        return metrics['locked_minutes'] + share
+
+    def _assignment_penalty(self, employee: EmployeeRecord, shift: ShiftRecord) -> int:
+        """Per-minute cost of a working minute outside the employee's own role or home store.
+
+        Requests carry no shift or time preferences, so the roles an employee lists
+        stand in for them: a shift matching neither their role ids nor their role
+        names, which only employees listing no role names are eligible for, costs
+        ``PREFERENCE_WEIGHT``.
+        """
+        penalty = 0
+        if employee.home_store_id != shift.store_id:
+            penalty += CROSS_STORE_PENALTY
+        if shift.work_type_id not in employee.role_ids and shift.role_key not in employee.role_names:
+            # Eligible only because the employee lists no role names
+            penalty += PREFERENCE_WEIGHT
+        return penalty
+
+    def _partial_candidates(
+        self, request: CompiledRequest, index: EligibilityIndex
+    ) -> Dict[str, List[Tuple[EmployeeRecord, int, int]]]:
+        """Per shift, employees who can cover a grid-aligned part of it (at least one slot), longest first"""
+        slot_size = request.options.slot_size_minutes
+        partial_candidates = {}
+        for shift in request.shifts:
+            boundaries = grid(shift, slot_size)
+            min_minutes = min(slot_size, shift.duration)
+            windows = []
+            for emp, start, end in index.partial_windows(shift):
+                window = aligned_window(boundaries, start, end, min_minutes)
+                if window is not None:
+                    windows.append((emp, *window))
+            if windows:
+                windows.sort(key=lambda item: item[2] - item[1], reverse=True)
+                partial_candidates[shift.id] = windows
+        return partial_candidates
+
+    def _add_stint_slots(
+        self,
+        model: cp_model.CpModel,
+        request: CompiledRequest,
+        slots: List[ShiftSlot],
+        full_employees: List[EmployeeRecord],
+        partial: List[Tuple[EmployeeRecord, int, int]],
+        stints: StintSet,
+        uncovered_vars: Dict[str, List[cp_model.IntVar]],
+        soft: bool,
+    ) -> List[cp_model.IntVar]:
+        """Cover each open slot of a shift by non-overlapping stints; returns its uncovered-minute variables"""
+        shift = slots[0].shift
+        duration = shift.duration
+        min_minutes = min(request.options.slot_size_minutes, duration)
+        windows = [(emp, (shift.start_minute, shift.end_minute)) for emp in full_employees]
+        windows.extend((emp, (start, end)) for emp, start, end in partial)
+        coverable = covers_span(shift.start_minute, shift.end_minute, [window for _, window in windows])
+        # Hand-offs only where someone's (grid-aligned) availability begins or ends: tiny start/end
+        # domains keep the search fast, and splitting anywhere else would not let anyone else in
+        boundaries = sorted({point for _, window in windows for point in window})
+        
+        gaps = []
+        for slot in slots:
+            if slot.locked_employee_id:
+                continue
+            slot_stints = [
+                stints.add(model, emp, slot, boundaries, window, min_minutes) for emp, window in windows
+            ]
+            if len(slot_stints) > 1:
+                model.AddNoOverlap([stint.interval for stint in slot_stints])
+            covered = cp_model.LinearExpr.Sum([stint.size for stint in slot_stints])
+            # As with whole slots, allow_uncovered only lets slots that nobody can work from start to end stay open
+            if soft or not coverable or (not full_employees and request.options.allow_uncovered):
+                if not soft and not request.options.allow_uncovered:
+                    continue  # Rejected up front by the quick feasibility check
+                # Minutes left open; the slot counts as uncovered as soon as any are
+                gap = model.NewIntVar(0, duration, f"uncovered_minutes_{shift.id}_{slot.slot_number}")
+                uncovered = model.NewBoolVar(f"uncovered_{shift.id}_{slot.slot_number}")
+                model.Add(gap <= duration * uncovered)
+                uncovered_vars[shift.id].append(uncovered)
+                gaps.append(gap)
+                model.Add(covered + gap == duration)
+            else:
+                # Non-overlapping stints inside the slot that add up to its length cover all of it
+                model.Add(covered == duration)
+        return gaps
+
+    def _add_hints(
+        self,
+        build: _ModelBuild,
+        request: CompiledRequest,
+        slots_by_shift: Dict[str, List[ShiftSlot]],
+        previous_pairs: Set[Tuple[str, str]],
+        hints: Optional[Set[Tuple[str, str]]],
+    ) -> None:
+        """Warm start from the previous pruning round, or else from the previous schedule"""
+        if hints is not None:
+            for key, var in build.assign_vars.items():
+                build.model.AddHint(var, 1 if key in hints else 0)
+        elif previous_pairs:
+            self._add_previous_assignment_hints(build.model, build.assign_vars, slots_by_shift, request)
+
+    def _search(
+        self,
+        solver: cp_model.CpSolver,
+        build: _ModelBuild,
+        request: CompiledRequest,
+        slots_by_shift: Dict[str, List[ShiftSlot]],
+        control: _SearchControl,
+        observer: Optional[SolveObserver],
+        race: Optional[PortfolioRace],
+    ) -> Tuple[int, float]:
+        """Run one CP-SAT search, reporting solutions to the observer and the portfolio race.
+
+        Returns the status and the search's wall time; a search stopped before it started takes none.
+        """
+        logger.info("Solving optimized CP-SAT model...")
+        if control.stopped:
+            return cp_model.UNKNOWN, 0.0
+        control.attach(solver)
+        try:
+            if observer is None and race is None:
+                return solver.Solve(build.model), solver.WallTime()
             
-            # Calculate metrics
-            total_minutes = sum(seg.end_minute - seg.start_minute for seg in assignments)
-            total_capacity_minutes = sum(
-                (shift.end_minute - shift.start_minute) * shift.capacity 
-                for shift in request.shifts
+            # Coverage of an intermediate solution, for the portfolio race
+            locked_minutes = sum(locked.end_minute - locked.start_minute for locked in request.locked_assignments)
+            capacity_minutes = sum(
+                shift.duration * shift.capacity for shift in request.shifts
             )
-            coverage_ratio = total_minutes / total_capacity_minutes if total_capacity_minutes > 0 else 1.0
             
-            logger.info(f"Generated {len(assignments)} assignments with {coverage_ratio:.1%} coverage")
-            
-            return SolveResponse(
-                store_id=request.store_id,
-                iso_week=request.iso_week,
-                assignments=assignments,
-                metrics=SolveMetrics(
-                    status=solver.StatusName(status),
-                    objective_value=int(solver.ObjectiveValue()) if status == cp_model.OPTIMAL else None,
-                    total_assigned_minutes=total_minutes,
-                    solver_wall_time_ms=int(solver.WallTime() * 1000),
-                    coverage_ratio=coverage_ratio,
-                ),
-            )
-        else:
-            # Handle infeasible cases
-            infeasible_reason = self._diagnose_infeasibility(request, employee_metrics)
+            def on_solution(cb: SolutionProgressCallback) -> None:
+                values = solution_values(cb)
+                if race is not None:
+                    covered = locked_minutes + build.candidates.assigned_minutes(values)
+                    if build.stints:
+                        covered += build.stints.assigned_minutes(values)
+                    if race.offer_cpsat(covered / capacity_minutes if capacity_minutes > 0 else 1.0):
+                        cb.StopSearch()
+                if observer is not None:
+                    observer.on_solution(self._build_solution_response(
+                        request,
+                        extract_assignments(build.candidates, values, request.locked_assignments, build.stints),
+                        status="FEASIBLE",
+                        objective_value=int(cb.ObjectiveValue()) if build.has_objective else None,
+                        wall_time_ms=int(cb.WallTime() * 1000),
+                    ))
             
-            return SolveResponse(
-                store_id=request.store_id,
-                iso_week=request.iso_week,
-                assignments=[],
-                metrics=SolveMetrics(
-                    status=solver.StatusName(status),
-                    total_assigned_minutes=0,
-                    solver_wall_time_ms=int(solver.WallTime() * 1000),
-                    coverage_ratio=0.0,
+            # The race must see every solution, so it is not throttled
+            callback = SolutionProgressCallback(on_solution, min_interval_seconds=0.0 if race else 0.25)
+            if race is not None:
+                race.bind_stop(solver.StopSearch)
+            return solver.Solve(build.model, callback), solver.WallTime()
+        finally:
+            control.detach()
+
+    def _open_slots(self, solver: cp_model.CpSolver, build: _ModelBuild) -> Dict[str, int]:
+        """Number of slots each shift has left uncovered in the current solution"""
+        open_slots = {
+            shift_id: sum(solver.Value(var) for var in counts) for shift_id, counts in build.uncovered_vars.items()
+        }
+        return {shift_id: count for shift_id, count in open_slots.items() if count}
+
+    def _assigned_keys(self, solver: cp_model.CpSolver, build: _ModelBuild) -> Set[Tuple[str, str]]:
+        return {
+            (seg.employee_id, seg.shift_id)
+            for seg in extract_assignments(build.candidates, solution_values(solver), [], build.stints)
+        }
+
+    def _build_solution_response(
+        self,
+        request: CompiledRequest,
+        assignments: List[AssignmentSegment],
+        status: str,
+        objective_value: Optional[int],
+        wall_time_ms: int,
+    ) -> SolveResponse:
+        """Wrap extracted assignments with coverage metrics"""
+        total_minutes = sum(seg.end_minute - seg.start_minute for seg in assignments)
+        total_capacity_minutes = sum(
+            shift.duration * shift.capacity for shift in request.shifts
+        )
+        coverage_ratio = total_minutes / total_capacity_minutes if total_capacity_minutes > 0 else 1.0
+        worked: Dict[str, int] = defaultdict(int)
+        for seg in assignments:
+            worked[seg.employee_id] += seg.end_minute - seg.start_minute
+        
+        return SolveResponse(
+            store_id=request.store_id,
+            iso_week=request.iso_week,
+            assignments=assignments,
+            metrics=SolveMetrics(
+                status=status,
+                objective_value=objective_value,
+                total_assigned_minutes=total_minutes,
+                solver_wall_time_ms=wall_time_ms,
+                coverage_ratio=coverage_ratio,
+                target_deviation_minutes=sum(
+                    abs(worked[emp.id] - emp.weekly_minutes_target) for emp in request.employees
                 ),
-                infeasible_reason=infeasible_reason,
-            )
+            ),
+        )
 
     def _build_shift_slots(
-        self, shifts: List[Shift], locked_assignments: List[LockedAssignment]
+        self, shifts: List[ShiftRecord], locked_assignments: List[LockedAssignment]
     ) -> Tuple[Dict[str, List[ShiftSlot]], List[ShiftSlot]]:
         """Build shift slots for multi-capacity shifts"""
         slots_by_shift: Dict[str, List[ShiftSlot]] = {}
@@ -315,72 +1106,74 @@ class CPSATSolver:
         return slots_by_shift, all_slots
 
     def _calculate_employee_metrics(
-        self, employees: List[Employee], locked_assignments: List[LockedAssignment]
+        self, employees: List[EmployeeRecord], locked_assignments: List[LockedAssignment]
     ) -> Dict[str, Dict]:
         """Pre-calculate employee workload metrics"""
         metrics = {}
         
+        # One pass over the locks instead of one per employee
+        daily_locked_minutes: Dict[str, Dict[Weekday, int]] = defaultdict(lambda: defaultdict(int))
+        for locked in locked_assignments:
+            daily_locked_minutes[locked.employee_id][locked.day] += locked.end_minute - locked.start_minute
+        
         for employee in employees:
-            locked_minutes = 0
-            daily_locked_minutes = defaultdict(int)
-            
-            for locked in locked_assignments:
-                if locked.employee_id == employee.id:
-                    duration = locked.end_minute - locked.start_minute
-                    locked_minutes += duration
-                    daily_locked_minutes[locked.day] += duration
-            
+            daily = daily_locked_minutes.get(employee.id, {})
+            locked_minutes = sum(daily.values())
+            weekly_limit = self._get_weekly_limit(employee)
             metrics[employee.id] = {
                 'locked_minutes': locked_minutes,
-                'daily_locked_minutes': dict(daily_locked_minutes),
+                'daily_locked_minutes': dict(daily),
                 'weekly_target': employee.weekly_minutes_target,
-                'weekly_limit': self._get_weekly_limit(employee),
-                'remaining_capacity': max(0, self._get_weekly_limit(employee) - locked_minutes),
+                'weekly_limit': weekly_limit,
+                'remaining_capacity': max(0, weekly_limit - locked_minutes),
             }
         
         return metrics
 
-    def _find_feasible_employees_for_shift(
-        self, shift: Shift, employees: List[Employee]
-    ) -> List[Employee]:
-        """Find employees who can work this shift based on role, store, and availability"""
-        feasible: List[Employee] = []
-        
-        for emp in employees:
-            # Check work type compatibility
-            if shift.work_type_id:
-                # For cross-store employees, validate by work type name instead of ID
-                if emp.home_store_id == shift.store_id:
-                    # Same store - validate by exact work type ID
-                    if shift.work_type_id not in emp.role_ids:
-                        continue
-                else:
-                    # Cross-store - validate by work type name (more flexible)
-                    if emp.role_names and shift.role.lower() not in [r.lower() for r in emp.role_names]:
-                        continue
-            elif emp.role_names and shift.role.lower() not in [r.lower() for r in emp.role_names]:
-                continue
-            
-            # Check store compatibility
-            if emp.home_store_id != shift.store_id and not emp.can_work_across_stores:
+    def _previous_pairs(self, request: CompiledRequest) -> Set[Tuple[str, str]]:
+        """(employee_id, shift_id) pairs of the unlocked part of the prior schedule"""
+        return {
+            (seg.employee_id, seg.shift_id) for seg in request.previous_assignments if not seg.locked
+        }
+
+    def _add_previous_assignment_hints(
+        self,
+        model: cp_model.CpModel,
+        assign_vars: Dict[Tuple[str, str], cp_model.IntVar],
+        slots_by_shift: Dict[str, List[ShiftSlot]],
+        request: CompiledRequest,
+    ):
+        """Hint every decision variable from the prior schedule (complete hints help CP-SAT most)"""
+        free_slots = {
+            shift_id: sum(1 for slot in slots if not slot.locked_employee_id)
+            for shift_id, slots in slots_by_shift.items()
+        }
+        hinted: Set[Tuple[str, str]] = set()
+        for seg in sorted(request.previous_assignments, key=lambda seg: seg.slot):
+            key = (seg.employee_id, seg.shift_id)
+            # No more prior assignees per shift than it has open slots
+            if seg.locked or key in hinted or key not in assign_vars or not free_slots[seg.shift_id]:
                 continue
-            
-            # Check availability
-            available = False
-            for availability_slot in emp.availability:
-                if (availability_slot.day == shift.day and 
-                    not availability_slot.is_off and
-                    availability_slot.start_minute <= shift.start_minute and
-                    availability_slot.end_minute >= shift.end_minute):
-                    available = True
-                    break
-            
-            if available:
-                feasible.append(emp)
+            hinted.add(key)
+            free_slots[seg.shift_id] -= 1
         
-        return feasible
+        for key, var in assign_vars.items():
+            model.AddHint(var, 1 if key in hinted else 0)
+        logger.info(f"Warm start: hinted {len(hinted)} of {len(request.previous_assignments)} previous assignments")
+
+    def _change_penalty_term(
+        self,
+        assign_vars: Dict[Tuple[str, str], cp_model.IntVar],
+        previous_pairs: Set[Tuple[str, str]],
+        penalty: int,
+    ) -> cp_model.LinearExpr:
+        """Penalty per added or dropped (employee, shift) pair relative to the prior schedule"""
+        # Dropped pair: penalty * (1 - var); added pair: penalty * var
+        kept = [var for pair, var in assign_vars.items() if pair in previous_pairs]
+        added = [var for pair, var in assign_vars.items() if pair not in previous_pairs]
+        return penalty * (len(previous_pairs) - cp_model.LinearExpr.Sum(kept) + cp_model.LinearExpr.Sum(added))
 
-    def _get_weekly_limit(self, employee: Employee) -> int:
+    def _get_weekly_limit(self, employee: EmployeeRecord) -> int:
         """Get weekly hour limit based on contract type"""
         if employee.contract_type == 'STUDENT':
             return STUDENT_WEEKLY_LIMIT_MINUTES
@@ -391,6 +1184,13 @@ class CPSATSolver:
         else:
             return employee.weekly_minutes_target
 
+    def _minute_limit(self, employee: EmployeeRecord, metrics: Dict, minute_caps: Optional[Dict[str, int]]) -> int:
+        """Weekly limit, or for a day block its locked minutes plus its cap if that is lower"""
+        limit = self._get_weekly_limit(employee)
+        if minute_caps and employee.id in minute_caps:
+            limit = min(limit, metrics['locked_minutes'] + minute_caps[employee.id])
+        return limit
+
     def _add_locked_assignment_constraints(
         self, 
         model: cp_model.CpModel,
@@ -408,115 +1208,161 @@ class CPSATSolver:
     def _add_no_overlap_constraints(
         self,
         model: cp_model.CpModel,
-        employee: Employee,
-        all_slots: List[ShiftSlot],
-        assign_vars: Dict[Tuple[str, str, int], cp_model.IntVar]
+        employee: EmployeeRecord,
+        candidates: CandidateMatrix,
+        variables: List[cp_model.IntVar],
+        durations: List[int],
+        starts: List[int],
+        slot_positions: List[int],
+        employee_stints: List[Stint],
+        carry: Optional[CarryOver] = None,
     ):
-        """Add constraints to prevent overlapping shifts for an employee"""
+        """Add constraints to prevent overlapping shifts for an employee.
+
+        Every interval is extended by the minimum rest, so the no-overlap also keeps
+        that rest between consecutive shifts, and with the previous week's last shift.
+        """
         employee_intervals = []
         
-        for slot in all_slots:
-            if slot.locked_employee_id == employee.id:
-                # Locked assignment - create fixed interval (just the shift duration, no rest time)
-                start = slot.day_start_minute
-                interval = model.NewIntervalVar(
-                    start,
-                    slot.duration,
-                    start + slot.duration,
-                    f"locked_interval_{employee.id}_{slot.shift.id}_{slot.slot_number}"
-                )
-                employee_intervals.append(interval)
-            else:
-                # Optional assignment - create conditional interval
-                var = assign_vars.get((employee.id, slot.shift.id, slot.slot_number))
-                if var is not None:
-                    start = slot.day_start_minute
-                    interval = model.NewOptionalIntervalVar(
-                        start,
-                        slot.duration,
-                        start + slot.duration,
-                        var,
-                        f"interval_{employee.id}_{slot.shift.id}_{slot.slot_number}"
-                    )
-                    employee_intervals.append(interval)
+        # Locked assignments - fixed intervals; their rest never reaches into the next locked one,
+        # so locks that are already closer together stay feasible
+        locked = candidates.locked_intervals(employee.id)
+        for i, (start, duration) in enumerate(locked):
+            rest = MIN_REST_MINUTES
+            if i + 1 < len(locked):
+                rest = max(0, min(rest, locked[i + 1][0] - start - duration))
+            employee_intervals.append(model.NewFixedSizedIntervalVar(
+                start, duration + rest, f"locked_interval_{employee.id}_{i}"
+            ))
+        
+        # Optional assignments - conditional intervals
+        for var, duration, start, pos in zip(variables, durations, starts, slot_positions):
+            employee_intervals.append(model.NewOptionalFixedSizedIntervalVar(
+                start, duration + MIN_REST_MINUTES, var, f"interval_{employee.id}_{pos}"
+            ))
+        employee_intervals.extend(stint.rest_interval(model) for stint in employee_stints)
+        
+        # The rest after the previous Sunday's last shift, unless a lock on Monday already starts inside it
+        if carry is not None and carry.last_shift_end_minute is not None:
+            rest_end = carry.last_shift_end_minute - MINUTES_PER_DAY + MIN_REST_MINUTES
+            if rest_end > 0 and not (locked and locked[0][0] < rest_end):
+                employee_intervals.append(model.NewFixedSizedIntervalVar(
+                    rest_end - MIN_REST_MINUTES, MIN_REST_MINUTES, f"carried_rest_{employee.id}"
+                ))
         
         # No overlapping intervals for this employee
         if len(employee_intervals) > 1:
             model.AddNoOverlap(employee_intervals)
 
-    def _extract_assignments(
+    def _add_labor_constraints(
         self,
-        solver: cp_model.CpSolver,
-        assign_vars: Dict[Tuple[str, str, int], cp_model.IntVar],
-        shifts: List[Shift],
-        slots_by_shift: Dict[str, List[ShiftSlot]],
-        locked_assignments: List[LockedAssignment]
-    ) -> List[AssignmentSegment]:
-        """Extract assignments from solved model"""
-        assignments = []
-        
-        # Add locked assignments (preserve original times)
-        for locked in locked_assignments:
-            assignments.append(AssignmentSegment(
-                shift_id=locked.shift_id,
-                day=locked.day,
-                employee_id=locked.employee_id,
-                start_minute=locked.start_minute,
-                end_minute=locked.end_minute,
-                slot=locked.slot,
-                locked=True,
-            ))
+        model: cp_model.CpModel,
+        employee: EmployeeRecord,
+        candidates: CandidateMatrix,
+        variables: List[cp_model.IntVar],
+        durations: List[int],
+        starts: List[int],
+        employee_stints: List[Stint],
+        carry: Optional[CarryOver] = None,
+    ):
+        """Cap daily minutes and consecutive working days for an employee.
+
+        Constraints are only added where the candidates could break the rule: a
+        daily sum when the day's candidate minutes exceed the cap, and day
+        indicators only for windows in which every day has possible work.
+        Days the employee worked at the end of the previous week count as
+        locked days before Monday.
+        """
+        # Per day: minute terms with their coefficients, the literals that mean work, and the most minutes possible
+        day_terms: Dict[int, Tuple[List[cp_model.IntVar], List[int], List[cp_model.IntVar]]] = defaultdict(
+            lambda: ([], [], [])
+        )
+        day_capacity: Dict[int, int] = defaultdict(int)
+        for var, duration, start in zip(variables, durations, starts):
+            day = start // MINUTES_PER_DAY
+            terms = day_terms[day]
+            terms[0].append(var)
+            terms[1].append(duration)
+            terms[2].append(var)
+            day_capacity[day] += duration
+        for stint in employee_stints:
+            day = stint.slot.day_start_minute // MINUTES_PER_DAY
+            terms = day_terms[day]
+            terms[0].append(stint.size)
+            terms[1].append(1)
+            terms[2].append(stint.presence)
+            day_capacity[day] += stint.slot.duration
+        locked_minutes: Dict[int, int] = defaultdict(int)
+        for start, duration in candidates.locked_intervals(employee.id):
+            locked_minutes[start // MINUTES_PER_DAY] += duration
+        carried_days = min(carry.consecutive_days, MAX_CONSECUTIVE_DAYS) if carry is not None else 0
+        for day in range(-carried_days, 0):
+            locked_minutes[day] = 1
         
-        # Add solved assignments (use original shift template times)
-        for (employee_id, shift_id, slot_number), var in assign_vars.items():
-            if solver.Value(var) == 1:
-                shift = next(s for s in shifts if s.id == shift_id)
-                assignments.append(AssignmentSegment(
-                    shift_id=shift_id,
-                    day=shift.day,
-                    employee_id=employee_id,
-                    # Use the original shift times from the template
-                    start_minute=shift.start_minute,
-                    end_minute=shift.end_minute,
-                    slot=slot_number,
-                    locked=False,
-                ))
+        for day, (day_vars, coefficients, _) in day_terms.items():
+            if locked_minutes[day] + day_capacity[day] > MAX_DAILY_MINUTES:
+                model.Add(
+                    cp_model.LinearExpr.WeightedSum(day_vars, coefficients)
+                    <= max(0, MAX_DAILY_MINUTES - locked_minutes[day])
+                )
         
-        return assignments
+        window = MAX_CONSECUTIVE_DAYS + 1
+        worked: Dict[int, Union[cp_model.IntVar, int]] = {}
+        for first in range(-carried_days, len(DAY_POSITION) - window + 1):
+            days = range(first, first + window)
+            if not all(day in day_terms or locked_minutes[day] for day in days):
+                continue
+            if sum(1 for day in days if locked_minutes[day]) > MAX_CONSECUTIVE_DAYS:
+                continue  # Locked work already breaks the rule; locks take precedence
+            for day in days:
+                if day in worked:
+                    continue
+                if locked_minutes[day]:
+                    worked[day] = 1
+                    continue
+                indicator = worked[day] = model.NewBoolVar(f"works_{employee.id}_{day}")
+                for literal in day_terms[day][2]:
+                    model.AddImplication(literal, indicator)
+            model.Add(sum(worked[day] for day in days) <= MAX_CONSECUTIVE_DAYS)
 
-    def _diagnose_infeasibility(
-        self, request: SolveRequest, employee_metrics: Dict[str, Dict]
-    ) -> str:
-        """Diagnose why the problem is infeasible"""
-        issues = []
-        
-        # Check if there are enough employees
-        total_shift_minutes = sum(
-            (shift.end_minute - shift.start_minute) * shift.capacity 
-            for shift in request.shifts
+    def _explain_infeasibility(
+        self,
+        request: CompiledRequest,
+        all_slots: List[ShiftSlot],
+        candidates_by_shift: Dict[str, List[EmployeeRecord]],
+        employee_metrics: Dict[str, Dict],
+        time_limit: float,
+        minute_caps: Optional[Dict[str, int]] = None,
+    ) -> Optional[InfeasibilityExplanation]:
+        """Minimal set of conflicting rules over every feasible candidate, None if they can all hold.
+
+        With ``minute_caps`` the weekly-limit rules use the day block's caps, as the solve model does.
+        """
+        candidate_count = sum(
+            len(candidates_by_shift[slot.shift.id]) for slot in all_slots if not slot.locked_employee_id
         )
-        total_employee_capacity = sum(
-            metrics['remaining_capacity'] for metrics in employee_metrics.values()
+        if candidate_count > MAX_EXPLAINED_CANDIDATES:
+            logger.info(f"Not explaining infeasibility: {candidate_count} candidates is too many")
+            return None
+        explainer = InfeasibilityExplainer(
+            request,
+            all_slots,
+            candidates_by_shift,
+            {emp.id: self._minute_limit(emp, employee_metrics[emp.id], minute_caps) for emp in request.employees},
+            {emp_id: metrics['locked_minutes'] for emp_id, metrics in employee_metrics.items()},
         )
-        
-        if total_shift_minutes > total_employee_capacity:
-            issues.append(f"Insufficient employee capacity: need {total_shift_minutes} minutes, have {total_employee_capacity}")
-        
-        # Check for shifts with no feasible employees
-        uncoverable_shifts = []
-        for shift in request.shifts:
-            feasible = self._find_feasible_employees_for_shift(shift, request.employees)
-            if not feasible:
-                uncoverable_shifts.append(f"{shift.role} on {shift.day} {shift.start_minute//60:02d}:{shift.start_minute%60:02d}")
-        
-        if uncoverable_shifts:
-            issues.append(f"Shifts with no available employees: {', '.join(uncoverable_shifts[:3])}")
-            if len(uncoverable_shifts) > 3:
-                issues.append(f"...and {len(uncoverable_shifts) - 3} more")
-        
-        return "; ".join(issues) if issues else "Unknown infeasibility - check employee availability and shift requirements"
+        return explainer.explain(min(EXPLANATION_SECONDS, time_limit))
 
-    def _quick_feasibility_check(self, request: SolveRequest) -> bool:
+    def _with_explanation(
+        self, response: SolveResponse, explanation: Optional[InfeasibilityExplanation]
+    ) -> SolveResponse:
+        """Attach the conflicting rules, and a readable summary of them, to a fallback response"""
+        if explanation is not None:
+            response.infeasibility = explanation
+            response.infeasible_reason = "; ".join(conflict.message for conflict in explanation.conflicts)
+        return response
+
+    def _quick_feasibility_check(self, request: CompiledRequest, index: EligibilityIndex) -> bool:
         """Quick feasibility check to avoid expensive CP-SAT setup"""
         if not request.employees:
             return False
@@ -524,101 +1370,54 @@ class CPSATSolver:
         if not request.shifts:
             return True
         
-        # Check if any employee can work any shift
+        # Check if any employee can work any shift (or, in segment mode, every part of it)
         for shift in request.shifts:
-            feasible = self._find_feasible_employees_for_shift(shift, request.employees)
-            if not feasible and not request.options.allow_uncovered:
-                return False
+            feasible = index.feasible_employees(shift)
+            if not feasible and not (request.options.allow_uncovered or request.options.soft_coverage):
+                if not request.options.segment_mode:
+                    return False
+                windows = [(start, end) for _, start, end in index.partial_windows(shift)]
+                if not covers_span(shift.start_minute, shift.end_minute, windows):
+                    return False
         
         return True
 
-    def _solve_greedy(self, request: SolveRequest) -> SolveResponse:
-        """Fast greedy algorithm for large problems"""
+    def _solve_greedy(
+        self,
+        request: CompiledRequest,
+        index: EligibilityIndex,
+        minute_caps: Optional[Dict[str, int]] = None,
+    ) -> SolveResponse:
+        """Fast greedy algorithm with local-search repair, used as the CP-SAT fallback"""
         logger.info("Using greedy algorithm for fast solving")
         
-        assignments = []
-        employee_workload = {emp.id: 0 for emp in request.employees}
-        
-        # Add locked assignments
-        for locked in request.locked_assignments:
-            assignments.append(AssignmentSegment(
-                shift_id=locked.shift_id,
-                day=locked.day,
-                employee_id=locked.employee_id,
-                start_minute=locked.start_minute,
-                end_minute=locked.end_minute,
-                slot=locked.slot,
-                locked=True,
-            ))
-            employee_workload[locked.employee_id] += locked.end_minute - locked.start_minute
-        
-        # Greedy assignment
-        for shift in request.shifts:
-            for slot_num in range(shift.capacity):
-                # Check if this slot is locked
-                is_locked = any(
-                    locked.shift_id == shift.id and locked.slot == slot_num
-                    for locked in request.locked_assignments
-                )
-                if is_locked:
-                    continue
-                
-                # Find best available employee
-                feasible = self._find_feasible_employees_for_shift(shift, request.employees)
-                if not feasible:
-                    continue
-                
-                # Sort by current workload (prefer under-utilized employees)
-                feasible.sort(key=lambda emp: (
-                    employee_workload[emp.id],
-                    -emp.weekly_minutes_target  # Prefer higher targets as tiebreaker
-                ))
-                
-                best_employee = feasible[0]
-                shift_duration = shift.end_minute - shift.start_minute
-                
-                # Check if employee can take this shift (weekly limit + no overlaps)
-                if (employee_workload[best_employee.id] + shift_duration <= self._get_weekly_limit(best_employee) and
-                    not self._has_overlapping_assignment(best_employee.id, shift, assignments)):
-                    assignments.append(AssignmentSegment(
-                        shift_id=shift.id,
-                        day=shift.day,
-                        employee_id=best_employee.id,
-                        # Use the original shift template times
-                        start_minute=shift.start_minute,
-                        end_minute=shift.end_minute,
-                        slot=slot_num,
-                        locked=False,
-                    ))
-                    employee_workload[best_employee.id] += shift_duration
-        
-        # Calculate metrics
-        total_minutes = sum(seg.end_minute - seg.start_minute for seg in assignments if not seg.locked)
-        total_capacity_minutes = sum(
-            (shift.end_minute - shift.start_minute) * shift.capacity 
-            for shift in request.shifts
+        timer = PhaseTimer()
+        result = self._greedy.solve(request, index, minute_caps)
+        timer.lap("solve")
+        response = self._build_solution_response(
+            request,
+            result.assignments,
+            status="GREEDY_SOLUTION",
+            objective_value=None,
+            wall_time_ms=result.wall_time_ms,
         )
-        coverage_ratio = total_minutes / total_capacity_minutes if total_capacity_minutes > 0 else 1.0
-        
-        logger.info(f"Greedy algorithm generated {len(assignments)} assignments with {coverage_ratio:.1%} coverage")
+        timer.lap("extraction")
+        timer.attach(response, "greedy")
         
-        return SolveResponse(
-            store_id=request.store_id,
-            iso_week=request.iso_week,
-            assignments=assignments,
-            metrics=SolveMetrics(
-                status="GREEDY_SOLUTION",
-                total_assigned_minutes=total_minutes,
-                solver_wall_time_ms=50,  # Greedy is very fast
-                coverage_ratio=coverage_ratio,
-            ),
+        logger.info(
+            f"Greedy algorithm generated {len(result.assignments)} assignments "
+            f"with {response.metrics.coverage_ratio:.1%} coverage"
         )
+        return response
 
     def _rank_employees_for_shift(
-        self, employees: List[Employee], employee_metrics: Dict[str, Dict], shift: Shift
-    ) -> List[Employee]:
+        self,
+        employees: List[EmployeeRecord],
+        employee_metrics: Dict[str, Dict],
+        shift: ShiftRecord,
+    ) -> List[EmployeeRecord]:
         """Rank employees by suitability for a shift"""
-        def score_employee(emp: Employee) -> float:
+        def score_employee(emp: EmployeeRecord) -> float:
             score = 0.0
             
             # Prefer employees under their weekly target
@@ -635,7 +1434,7 @@ class CPSATSolver:
                 if emp.home_store_id == shift.store_id and shift.work_type_id in emp.role_ids:
                     # Same store with exact work type ID match
                     score += 5.0
-                elif emp.home_store_id != shift.store_id and emp.role_names and shift.role.lower() in [r.lower() for r in emp.role_names]:
+                elif emp.home_store_id != shift.store_id and shift.role_key in emp.role_names:
                     # Cross-store with work type name match
                     score += 3.0  # Slightly lower bonus for cross-store
             
@@ -643,19 +1442,7 @@ class CPSATSolver:
         
         return sorted(employees, key=score_employee, reverse=True)
 
-    def _has_overlapping_assignment(
-        self, employee_id: str, new_shift: Shift, existing_assignments: List[AssignmentSegment]
-    ) -> bool:
-        """Check if assigning this shift would create an overlap for the employee"""
-        for assignment in existing_assignments:
-            if (assignment.employee_id == employee_id and 
-                assignment.day == new_shift.day and
-                not (new_shift.end_minute <= assignment.start_minute or 
-                     new_shift.start_minute >= assignment.end_minute)):
-                return True
-        return False
-
-    def _create_infeasible_response(self, request: SolveRequest, reason: str) -> SolveResponse:
+    def _create_infeasible_response(self, request: CompiledRequest, reason: str) -> SolveResponse:
         """Create a response for infeasible problems"""
         return SolveResponse(
             store_id=request.store_id,
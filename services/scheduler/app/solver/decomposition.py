@@ -0,0 +1,591 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from ..domain.models import AssignmentSegment, SolveMetrics, SolveResponse, Weekday
+from .compiled import CompiledRequest, EmployeeRecord, ShiftRecord
+from .eligibility import EligibilityIndex
+from .labor import DAY_POSITION, WorkLog, apply_carry_over
+from .progress import SolveObserver
+
+logger = logging.getLogger(__name__)
+
+# Largest sub-problem handed to CP-SAT as one model
+MAX_PART_SHIFTS = 50
+MAX_PART_EMPLOYEES = 25
+# Least search time a part gets when the request's time limit is shared between parts
+MIN_PART_SECONDS = 0.5
+# Least time between two stitched progress reports of a decomposed solve
+PROGRESS_INTERVAL_SECONDS = 0.25
+
+WEEKDAY_ORDER: List[Weekday] = [Weekday.from_iso_index(i) for i in range(7)]
+
+
+@dataclass
+class SubProblem:
+    """A self-contained slice of a solve request."""
+    request: CompiledRequest
+    # employee_id -> unlocked minutes this part may assign (day blocks share one weekly budget)
+    minute_caps: Optional[Dict[str, int]] = None
+    # Offers only the part's own employees when one day is split between parts
+    index: Optional[EligibilityIndex] = None
+    # Seconds of search this part may use
+    time_limit: Optional[float] = None
+
+
+@dataclass
+class DecomposedSolution:
+    assignments: List[AssignmentSegment]
+    status: str
+    objective_value: Optional[int]
+    wall_time_ms: int
+    parts: int
+    stitched_assignments: int = 0  # Slots filled after stitching with leftover weekly budget
+    part_metrics: List[SolveMetrics] = field(default_factory=list)
+
+
+PartSolver = Callable[[SubProblem, Optional[SolveObserver]], SolveResponse]
+
+
+class _PartGroup:
+    """
+    Observers of all parts of a decomposed solve.
+
+    One stop request reaches every part. Each improving part schedule is joined
+    with the latest schedules of the other parts, or their baseline segments
+    while they have none yet, and ``stitch`` turns the whole week into a response.
+    The solve's observer gets it when it improves on the last one reported: more
+    coverage, or as much with less deviation from the targets. Joins happen at most
+    every ``min_interval_seconds`` (the first always goes through).
+    """
+
+    def __init__(
+        self,
+        observer: Optional[SolveObserver],
+        locked: List[AssignmentSegment],
+        latest: List[List[AssignmentSegment]],
+        stitch: Optional[Callable[[List[AssignmentSegment], int], SolveResponse]],
+        min_interval_seconds: float = PROGRESS_INTERVAL_SECONDS,
+    ) -> None:
+        self._observer = observer
+        self._locked = locked
+        self._latest = latest
+        self._stitch = stitch
+        self._min_interval = min_interval_seconds
+        self._started = time.monotonic()
+        self._last_report: Optional[float] = None
+        self._best: Optional[Tuple[float, int]] = None
+        self._stops: List[Callable[[], None]] = []
+        self._stopped = False
+        self._lock = threading.Lock()
+
+    def observer(self, position: int) -> Optional[SolveObserver]:
+        """Observer of the part at ``position``; None when nobody watches the solve, so parts skip callbacks"""
+        return _PartObserver(self, position) if self._observer is not None else None
+
+    def on_part_solution(self, position: int, response: SolveResponse) -> None:
+        if self._observer is None or self._stitch is None:
+            return
+        with self._lock:
+            self._latest[position] = [seg for seg in response.assignments if not seg.locked]
+            now = time.monotonic()
+            if self._last_report is not None and now - self._last_report < self._min_interval:
+                return
+            self._last_report = now
+            assignments = self._locked + [seg for part in self._latest for seg in part]
+        stitched = self._stitch(assignments, int((now - self._started) * 1000))
+        metrics = stitched.metrics
+        score = (metrics.coverage_ratio, -(metrics.target_deviation_minutes or 0))
+        with self._lock:
+            if self._best is not None and score <= self._best:
+                return
+            self._best = score
+        self._observer.on_solution(stitched)
+
+    def bind_stop(self, stop: Callable[[], None]) -> None:
+        with self._lock:
+            self._stops.append(stop)
+            stopped = self._stopped
+        if stopped:
+            stop()
+
+    def stop_all(self) -> None:
+        with self._lock:
+            self._stopped = True
+            stops = list(self._stops)
+        for stop in stops:
+            stop()
+
+
+class _PartObserver:
+    """Observer handed to one part's solve; reports to the part's group."""
+
+    def __init__(self, group: _PartGroup, position: int) -> None:
+        self._group = group
+        self._position = position
+
+    def on_solution(self, response: SolveResponse) -> None:
+        self._group.on_part_solution(self._position, response)
+
+    def bind_stop(self, stop: Callable[[], None]) -> None:
+        self._group.bind_stop(stop)
+
+
+class ProblemDecomposer:
+    """
+    Splits large solve requests into independent sub-problems solved in parallel.
+
+    Connected components of the employee–shift eligibility graph share no employee,
+    so they are solved separately without losing optimality. A component that is
+    still too large is cut into blocks of consecutive days, and a day that is too
+    large on its own into groups of shifts that divide the day's employees between
+    them. A baseline schedule of the whole request (the greedy one) keeps the cut
+    honest: each employee's remaining weekly budget is split across blocks so that
+    their baseline work fits every block, with the slack shared by the work they
+    could take there, and the baseline seeds each part's search. Parts cover softly,
+    so a part that cannot fill every slot still returns its best schedule, and
+    leftover budget is used afterwards to fill slots the blocks left open.
+    """
+
+    def __init__(
+        self,
+        max_shifts: int = MAX_PART_SHIFTS,
+        max_employees: int = MAX_PART_EMPLOYEES,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        self._max_shifts = max_shifts
+        self._max_employees = max_employees
+        self._max_workers = max_workers or max(1, (os.cpu_count() or 2) // 2)
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    def is_small(self, request: CompiledRequest) -> bool:
+        return len(request.shifts) <= self._max_shifts and len(request.employees) <= self._max_employees
+
+    def split(
+        self,
+        request: CompiledRequest,
+        index: EligibilityIndex,
+        weekly_limit: Callable[[EmployeeRecord], int],
+        baseline: Sequence[AssignmentSegment] = (),
+    ) -> List[SubProblem]:
+        options = {"soft_coverage": True}
+        if baseline and not request.previous_assignments:
+            # The baseline only seeds the search; it is not a prior schedule to stay close to
+            options["change_penalty"] = 0
+            request = request.replace(previous_assignments=[seg for seg in baseline if not seg.locked])
+        request = request.replace(options=request.options.copy(update=options))
+        parts: List[SubProblem] = []
+        for employees, shifts in self._components(request, index):
+            if len(shifts) <= self._max_shifts and len(employees) <= self._max_employees:
+                employee_ids = {emp.id for emp in employees}
+                shift_ids = {shift.id for shift in shifts}
+                locked = [
+                    locked for locked in request.locked_assignments
+                    if locked.shift_id in shift_ids or locked.employee_id in employee_ids
+                ]
+                parts.append(SubProblem(self._sub_request(request, employees, shifts, locked)))
+            else:
+                parts.extend(self._day_blocks(request, index, employees, shifts, weekly_limit, baseline))
+        return parts
+
+    def solve(
+        self,
+        request: CompiledRequest,
+        index: EligibilityIndex,
+        weekly_limit: Callable[[EmployeeRecord], int],
+        solve_part: PartSolver,
+        observer: Optional[SolveObserver] = None,
+        baseline: Sequence[AssignmentSegment] = (),
+        time_limit: Optional[float] = None,
+        report: Optional[Callable[[List[AssignmentSegment], int], SolveResponse]] = None,
+    ) -> DecomposedSolution:
+        """Solve the parts of ``request`` and stitch them back together.
+
+        ``baseline`` is a schedule of the whole request that budgets and seeds the
+        parts. With ``time_limit``, parts share the request's search time: they run
+        in waves of ``max_workers`` and each wave gets an equal slice. ``report``
+        builds a response from a whole-week schedule and the milliseconds elapsed;
+        with it, ``observer`` sees the stitched week whenever a part improves.
+        """
+        parts = self.split(request, index, weekly_limit, baseline)
+        logger.info(
+            f"Decomposed {len(request.shifts)} shifts / {len(request.employees)} employees "
+            f"into {len(parts)} sub-problems"
+        )
+        if time_limit is not None and parts:
+            waves = -(-len(parts) // self._max_workers)
+            for part in parts:
+                part.time_limit = max(MIN_PART_SECONDS, time_limit / waves)
+
+        locked = self._locked_segments(request)
+        group = _PartGroup(observer, locked, self._progress_seed(parts, baseline), self._stitcher(request, report))
+        if observer is not None:
+            observer.bind_stop(group.stop_all)
+
+        if len(parts) <= 1 or self._max_workers == 1:
+            responses = [solve_part(part, group.observer(position)) for position, part in enumerate(parts)]
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(parts), self._max_workers)) as pool:
+                responses = list(pool.map(
+                    lambda position: solve_part(parts[position], group.observer(position)), range(len(parts))
+                ))
+
+        assignments = list(locked)
+        for response in responses:
+            assignments.extend(seg for seg in response.assignments if not seg.locked)
+
+        dropped = self._drop_labor_violations(request, assignments) if len(parts) > 1 else 0
+        stitched = self._fill_open_slots(request, index, weekly_limit, assignments)
+
+        statuses = {response.metrics.status for response in responses}
+        if statuses <= {"OPTIMAL"} and not stitched and not dropped:
+            status = "OPTIMAL"
+        elif statuses <= {"OPTIMAL", "FEASIBLE"}:
+            status = "FEASIBLE"
+        else:
+            status = "GREEDY_SOLUTION"
+        objectives = [response.metrics.objective_value for response in responses]
+        objective_value = (
+            sum(objectives) if objectives and all(value is not None for value in objectives) else None
+        )
+        wall_time_ms = max((response.metrics.solver_wall_time_ms or 0 for response in responses), default=0)
+
+        return DecomposedSolution(
+            assignments=assignments,
+            status=status,
+            objective_value=objective_value,
+            wall_time_ms=wall_time_ms,
+            parts=len(parts),
+            stitched_assignments=stitched,
+            part_metrics=[response.metrics for response in responses],
+        )
+
+    def _locked_segments(self, request: CompiledRequest) -> List[AssignmentSegment]:
+        """Locked assignments of the request, so each appears exactly once whatever the parts return"""
+        return [
+            AssignmentSegment(
+                shift_id=locked.shift_id,
+                day=locked.day,
+                employee_id=locked.employee_id,
+                start_minute=locked.start_minute,
+                end_minute=locked.end_minute,
+                slot=locked.slot,
+                locked=True,
+            )
+            for locked in request.locked_assignments
+        ]
+
+    def _progress_seed(
+        self, parts: List[SubProblem], baseline: Sequence[AssignmentSegment]
+    ) -> List[List[AssignmentSegment]]:
+        """Unlocked baseline segments of each part, reported for it until its first solution"""
+        part_of = {shift.id: position for position, part in enumerate(parts) for shift in part.request.shifts}
+        seed: List[List[AssignmentSegment]] = [[] for _ in parts]
+        for seg in baseline:
+            if not seg.locked and seg.shift_id in part_of:
+                seed[part_of[seg.shift_id]].append(seg)
+        return seed
+
+    def _stitcher(
+        self, request: CompiledRequest, report: Optional[Callable[[List[AssignmentSegment], int], SolveResponse]]
+    ) -> Optional[Callable[[List[AssignmentSegment], int], SolveResponse]]:
+        """Progress response of joined part schedules, without the segments that break a rule across parts"""
+        if report is None:
+            return None
+
+        def stitch(assignments: List[AssignmentSegment], wall_time_ms: int) -> SolveResponse:
+            kept, _ = self._labor_checked(request, assignments)
+            return report(kept, wall_time_ms)
+
+        return stitch
+
+    def _components(
+        self, request: CompiledRequest, index: EligibilityIndex
+    ) -> List[Tuple[List[EmployeeRecord], List[ShiftRecord]]]:
+        """Connected components of the employee–shift graph (eligibility and locks)."""
+        employee_count = len(request.employees)
+        parent = list(range(employee_count + len(request.shifts)))
+
+        def find(node: int) -> int:
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        def union(a: int, b: int) -> None:
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                parent[root_b] = root_a
+
+        employee_pos = {emp.id: pos for pos, emp in enumerate(request.employees)}
+        shift_pos = {shift.id: employee_count + pos for pos, shift in enumerate(request.shifts)}
+        for shift in request.shifts:
+            for emp in index.feasible_employees(shift):
+                union(employee_pos[emp.id], shift_pos[shift.id])
+            if request.options.segment_mode:  # Employees who can cover part of the shift count too
+                for emp, _, _ in index.partial_windows(shift):
+                    union(employee_pos[emp.id], shift_pos[shift.id])
+        for locked in request.locked_assignments:
+            if locked.employee_id in employee_pos and locked.shift_id in shift_pos:
+                union(employee_pos[locked.employee_id], shift_pos[locked.shift_id])
+
+        groups: Dict[int, Tuple[List[EmployeeRecord], List[ShiftRecord]]] = {}
+        for pos, emp in enumerate(request.employees):
+            groups.setdefault(find(pos), ([], []))[0].append(emp)
+        for shift in request.shifts:
+            groups.setdefault(find(shift_pos[shift.id]), ([], []))[1].append(shift)
+
+        # Components without employees can only stay uncovered; without shifts there is nothing to do
+        return [(employees, shifts) for employees, shifts in groups.values() if employees and shifts]
+
+    def _day_blocks(
+        self,
+        request: CompiledRequest,
+        index: EligibilityIndex,
+        employees: List[EmployeeRecord],
+        shifts: List[ShiftRecord],
+        weekly_limit: Callable[[EmployeeRecord], int],
+        baseline: Sequence[AssignmentSegment],
+    ) -> List[SubProblem]:
+        """Cut one oversized component into runs of consecutive days, or groups of one day's shifts."""
+        blocks = self._blocks(index, employees, shifts, baseline)
+
+        component_ids = {emp.id for emp in employees}
+        locked_minutes: Dict[str, int] = defaultdict(int)
+        for locked in request.locked_assignments:
+            if locked.employee_id in component_ids:
+                locked_minutes[locked.employee_id] += locked.end_minute - locked.start_minute
+
+        # Minutes each employee could work in each block (one slot per shift), and worked there in the baseline
+        demand: List[Dict[str, int]] = []
+        placed: List[Dict[str, int]] = []
+        block_employees: List[List[EmployeeRecord]] = []
+        for block, members in blocks:
+            block_demand: Dict[str, int] = defaultdict(int)
+            for shift in block:
+                for emp in index.feasible_employees(shift):
+                    if members is None or emp.id in members:
+                        block_demand[emp.id] += shift.duration
+            block_shift_ids = {shift.id for shift in block}
+            block_placed: Dict[str, int] = defaultdict(int)
+            for seg in baseline:
+                if not seg.locked and seg.shift_id in block_shift_ids and seg.employee_id in block_demand:
+                    block_placed[seg.employee_id] += seg.end_minute - seg.start_minute
+            locked_ids = {
+                locked.employee_id for locked in request.locked_assignments if locked.shift_id in block_shift_ids
+            }
+            demand.append(block_demand)
+            placed.append(block_placed)
+            block_employees.append([emp for emp in employees if emp.id in block_demand or emp.id in locked_ids])
+
+        caps: List[Dict[str, int]] = [{} for _ in blocks]
+        for emp in employees:
+            remaining = max(0, weekly_limit(emp) - locked_minutes[emp.id])
+            total_demand = sum(block_demand.get(emp.id, 0) for block_demand in demand)
+            if total_demand <= remaining:
+                continue  # The weekly limit cannot bind, no need to split it
+            slack = max(0, remaining - sum(block_placed.get(emp.id, 0) for block_placed in placed))
+            for block_caps, block_demand, block_placed in zip(caps, demand, placed):
+                if emp.id in block_demand:
+                    block_caps[emp.id] = (
+                        block_placed.get(emp.id, 0) + slack * block_demand[emp.id] // total_demand
+                    )
+
+        positions = {emp.id: emp.position for emp in employees}
+        parts = []
+        for (block, members), block_caps, block_members in zip(blocks, caps, block_employees):
+            block_shift_ids = {shift.id for shift in block}
+            block_days = {shift.day for shift in block}
+            member_ids = {emp.id for emp in block_members}
+            # Members' other locks on the block's days keep them from overlapping a group of the same day
+            locked = [
+                locked for locked in request.locked_assignments
+                if locked.shift_id in block_shift_ids or (locked.employee_id in member_ids and locked.day in block_days)
+            ]
+            sub_request = self._sub_request(request, block_members, block, locked)
+            part_index = None
+            if members is not None:
+                part_index = EligibilityIndex(index.employees, members={positions[emp_id] for emp_id in members})
+            parts.append(SubProblem(sub_request, minute_caps=block_caps or None, index=part_index))
+        return parts
+
+    def _blocks(
+        self,
+        index: EligibilityIndex,
+        employees: List[EmployeeRecord],
+        shifts: List[ShiftRecord],
+        baseline: Sequence[AssignmentSegment],
+    ) -> List[Tuple[List[ShiftRecord], Optional[Set[str]]]]:
+        """Runs of consecutive days within the part limits, with the employees each may use (None for all)."""
+        shifts_by_day: Dict[Weekday, List[ShiftRecord]] = defaultdict(list)
+        for shift in shifts:
+            shifts_by_day[shift.day].append(shift)
+
+        blocks: List[Tuple[List[ShiftRecord], Optional[Set[str]]]] = []
+        current: List[ShiftRecord] = []
+        current_employees: Set[str] = set()
+        for day in WEEKDAY_ORDER:
+            day_shifts = shifts_by_day.get(day, [])
+            if not day_shifts:
+                continue
+            day_employees = {emp.id for shift in day_shifts for emp in index.feasible_employees(shift)}
+            if len(day_shifts) > self._max_shifts or len(day_employees) > self._max_employees:
+                if current:
+                    blocks.append((current, None))
+                    current, current_employees = [], set()
+                blocks.extend(self._day_groups(index, day_shifts, day_employees, baseline))
+                continue
+            if current and (
+                len(current) + len(day_shifts) > self._max_shifts
+                or len(current_employees | day_employees) > self._max_employees
+            ):
+                blocks.append((current, None))
+                current, current_employees = [], set()
+            current.extend(day_shifts)
+            current_employees |= day_employees
+        if current:
+            blocks.append((current, None))
+        return blocks
+
+    def _day_groups(
+        self,
+        index: EligibilityIndex,
+        day_shifts: List[ShiftRecord],
+        day_employees: Set[str],
+        baseline: Sequence[AssignmentSegment],
+    ) -> List[Tuple[List[ShiftRecord], Optional[Set[str]]]]:
+        """Cut a day over the part limits into groups of shifts that share out its employees.
+
+        Shifts are grouped by store and role so that each group keeps the employees
+        who mostly work it. An employee joins the group of their baseline shift that
+        day, or else the group where they could work the most minutes.
+        """
+        count = max(
+            -(-len(day_shifts) // self._max_shifts),
+            -(-len(day_employees) // self._max_employees),
+        )
+        ordered = sorted(day_shifts, key=lambda shift: (shift.store_id, shift.role_key, shift.start_minute))
+        size = -(-len(ordered) // count)
+        groups = [ordered[start:start + size] for start in range(0, len(ordered), size)]
+        group_of = {shift.id: number for number, group in enumerate(groups) for shift in group}
+
+        assigned: Dict[str, int] = {}
+        for seg in baseline:
+            if not seg.locked and seg.shift_id in group_of and seg.employee_id in day_employees:
+                assigned.setdefault(seg.employee_id, group_of[seg.shift_id])
+        minutes: Dict[str, List[int]] = defaultdict(lambda: [0] * len(groups))
+        for number, group in enumerate(groups):
+            for shift in group:
+                for emp in index.feasible_employees(shift):
+                    if emp.id not in assigned:
+                        minutes[emp.id][number] += shift.duration
+        for emp_id, per_group in minutes.items():
+            assigned[emp_id] = max(range(len(groups)), key=per_group.__getitem__)
+
+        members: List[Set[str]] = [set() for _ in groups]
+        for emp_id, number in assigned.items():
+            members[number].add(emp_id)
+        return [(group, group_members) for group, group_members in zip(groups, members)]
+
+    def _sub_request(
+        self, request: CompiledRequest, employees: List[EmployeeRecord], shifts: List[ShiftRecord], locked: List
+    ) -> CompiledRequest:
+        shift_ids = {shift.id for shift in shifts}
+        return request.replace(
+            employees=employees,
+            shifts=shifts,
+            locked_assignments=locked,
+            previous_assignments=[seg for seg in request.previous_assignments if seg.shift_id in shift_ids],
+        )
+
+    def _fill_open_slots(
+        self,
+        request: CompiledRequest,
+        index: EligibilityIndex,
+        weekly_limit: Callable[[EmployeeRecord], int],
+        assignments: List[AssignmentSegment],
+    ) -> int:
+        """Give slots left open by budget splitting to employees with leftover weekly minutes."""
+        taken: Set[Tuple[str, int]] = {(seg.shift_id, seg.slot) for seg in assignments}
+        workload: Dict[str, int] = defaultdict(int)
+        logs: Dict[str, WorkLog] = defaultdict(WorkLog)
+        apply_carry_over(logs, request.carry_over)
+        for seg in assignments:
+            workload[seg.employee_id] += seg.end_minute - seg.start_minute
+            logs[seg.employee_id].add(seg.day, seg.start_minute, seg.end_minute)
+
+        filled = 0
+        for shift in request.shifts:
+            duration = shift.duration
+            for slot_number in range(shift.capacity):
+                if (shift.id, slot_number) in taken:
+                    continue
+                candidates = sorted(index.feasible_employees(shift), key=lambda emp: workload[emp.id])
+                for emp in candidates:
+                    if workload[emp.id] + duration > weekly_limit(emp):
+                        continue
+                    if not logs[emp.id].allows(shift.day, shift.start_minute, shift.end_minute):
+                        continue
+                    assignments.append(AssignmentSegment(
+                        shift_id=shift.id,
+                        day=shift.day,
+                        employee_id=emp.id,
+                        start_minute=shift.start_minute,
+                        end_minute=shift.end_minute,
+                        slot=slot_number,
+                        locked=False,
+                    ))
+                    taken.add((shift.id, slot_number))
+                    workload[emp.id] += duration
+                    logs[emp.id].add(shift.day, shift.start_minute, shift.end_minute)
+                    filled += 1
+                    break
+        return filled
+
+    def _drop_labor_violations(self, request: CompiledRequest, assignments: List[AssignmentSegment]) -> int:
+        """Remove unlocked segments that break a labor rule once the day blocks are joined.
+
+        Each block respects the rules on its own, but a run of working days or a
+        rest gap can span two blocks. Segments are replayed in time order with
+        locked ones first, and any unlocked segment that no longer fits is dropped
+        so stitching can reassign its slot.
+        """
+        kept, dropped = self._labor_checked(request, assignments)
+        if dropped:
+            logger.info(f"Dropped {dropped} assignments breaking labor rules across day blocks")
+            assignments[:] = kept
+        return dropped
+
+    def _labor_checked(
+        self, request: CompiledRequest, assignments: List[AssignmentSegment]
+    ) -> Tuple[List[AssignmentSegment], int]:
+        """Locked segments plus the unlocked ones that fit the labor rules in time order, and how many did not"""
+        logs: Dict[str, WorkLog] = defaultdict(WorkLog)
+        apply_carry_over(logs, request.carry_over)
+        for seg in assignments:
+            if seg.locked:
+                logs[seg.employee_id].add(seg.day, seg.start_minute, seg.end_minute)
+        kept: List[AssignmentSegment] = []
+        dropped = 0
+        unlocked = sorted(
+            (seg for seg in assignments if not seg.locked),
+            key=lambda seg: (DAY_POSITION[seg.day], seg.start_minute),
+        )
+        for seg in unlocked:
+            log = logs[seg.employee_id]
+            if log.allows(seg.day, seg.start_minute, seg.end_minute):
+                log.add(seg.day, seg.start_minute, seg.end_minute)
+                kept.append(seg)
+            else:
+                dropped += 1
+        return [seg for seg in assignments if seg.locked] + kept, dropped
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import AbstractSet, Dict, List, Optional, Sequence, Tuple
+
+from .compiled import EmployeeRecord, ShiftRecord
+
+# (day position, work_type_id, lowercased role, store_id)
+BucketKey = Tuple[int, Optional[str], str, str]
+# (start_minute, end_minute, employee position)
+Window = Tuple[int, int, int]
+
+
+class EligibilityIndex:
+    """
+    Precomputed shift -> feasible employee lookup, built once per solve request.
+
+    Employees are bucketed by (day, work type/role, store). Each bucket keeps the
+    availability windows of its employees sorted by start minute, so finding who
+    can cover a shift is a bisect plus a scan over the windows that open early
+    enough, instead of a pass over every employee and their availability.
+
+    A bucket only scans the windows of the store's own employees and of those
+    who work across stores. Positions are those of the compiled employee
+    records, which stay valid for every request sharing this index. With
+    ``members``, only the employees at those positions are offered.
+    """
+
+    def __init__(
+        self, employees: Sequence[EmployeeRecord], members: Optional[AbstractSet[int]] = None
+    ) -> None:
+        self._employees: List[EmployeeRecord] = list(employees)
+
+        # Windows per (day, home store), and per day for employees who may work in other stores
+        home_windows: Dict[Tuple[int, str], List[Window]] = defaultdict(list)
+        roaming_windows: Dict[int, List[Window]] = defaultdict(list)
+        for emp in self._employees:
+            if members is not None and emp.position not in members:
+                continue
+            for day, start, end in emp.windows:
+                home_windows[(day, emp.home_store_id)].append((start, end, emp.position))
+                if emp.can_work_across_stores:
+                    roaming_windows[day].append((start, end, emp.position))
+        self._home_windows: Dict[Tuple[int, str], List[Window]] = dict(home_windows)
+        self._roaming_windows: Dict[int, List[Window]] = dict(roaming_windows)
+
+        self._buckets: Dict[BucketKey, Tuple[List[int], List[Window]]] = {}
+        self._feasible: Dict[Tuple[BucketKey, int, int], Tuple[EmployeeRecord, ...]] = {}
+        self._partial: Dict[Tuple[BucketKey, int, int], Tuple[Tuple[EmployeeRecord, int, int], ...]] = {}
+
+    @property
+    def employees(self) -> List[EmployeeRecord]:
+        return self._employees
+
+    def feasible_employees(self, shift: ShiftRecord) -> List[EmployeeRecord]:
+        """Employees who can work ``shift`` based on role, store, and availability.
+
+        Results keep the request's employee order and are memoized per shift shape.
+        """
+        key = self._bucket_key(shift)
+        cache_key = (key, shift.start_minute, shift.end_minute)
+        feasible = self._feasible.get(cache_key)
+        if feasible is None:
+            starts, windows = self._bucket(key)
+            # Only windows opening at or before the shift start can contain it
+            upper = bisect_right(starts, shift.start_minute)
+            positions = {pos for _, end, pos in windows[:upper] if end >= shift.end_minute}
+            feasible = tuple(self._employees[pos] for pos in sorted(positions))
+            self._feasible[cache_key] = feasible
+        return list(feasible)
+
+    def partial_windows(self, shift: ShiftRecord) -> List[Tuple[EmployeeRecord, int, int]]:
+        """Employees available for only part of ``shift``, with the longest part each can work.
+
+        Employees who can work the whole shift are left out; results are memoized per shift shape.
+        """
+        key = self._bucket_key(shift)
+        cache_key = (key, shift.start_minute, shift.end_minute)
+        partial = self._partial.get(cache_key)
+        if partial is None:
+            starts, windows = self._bucket(key)
+            full = {emp.position for emp in self.feasible_employees(shift)}
+            best: Dict[int, Tuple[int, int]] = {}
+            for start, end, pos in windows[:bisect_left(starts, shift.end_minute)]:
+                lo, hi = max(start, shift.start_minute), min(end, shift.end_minute)
+                if hi <= lo or pos in full:
+                    continue
+                if pos not in best or hi - lo > best[pos][1] - best[pos][0]:
+                    best[pos] = (lo, hi)
+            partial = tuple((self._employees[pos], lo, hi) for pos, (lo, hi) in sorted(best.items()))
+            self._partial[cache_key] = partial
+        return list(partial)
+
+    def _bucket_key(self, shift: ShiftRecord) -> BucketKey:
+        return (shift.day_position, shift.work_type_id, shift.role_key, shift.store_id)
+
+    def _bucket(self, key: BucketKey) -> Tuple[List[int], List[Window]]:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            day, work_type_id, role, store_id = key
+            employees = self._employees
+            windows = [
+                window
+                for window in self._home_windows.get((day, store_id), [])
+                if self._matches(window[2], work_type_id, role, store_id)
+            ]
+            windows.extend(
+                window
+                for window in self._roaming_windows.get(day, [])
+                if employees[window[2]].home_store_id != store_id
+                and self._matches(window[2], work_type_id, role, store_id)
+            )
+            windows.sort()
+            bucket = ([start for start, _, _ in windows], windows)
+            self._buckets[key] = bucket
+        return bucket
+
+    def _matches(self, pos: int, work_type_id: Optional[str], role: str, store_id: str) -> bool:
+        emp = self._employees[pos]
+        same_store = emp.home_store_id == store_id
+
+        # Check store compatibility
+        if not same_store and not emp.can_work_across_stores:
+            return False
+
+        # Same store with a work type - validate by exact work type ID
+        if work_type_id and same_store:
+            return work_type_id in emp.role_ids
+
+        # Cross-store (or no work type) - validate by work type name; no role names means any role
+        role_names = emp.role_names
+        return not role_names or role in role_names
@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from ortools.sat.python import cp_model
+
+from ..domain.models import (
+    CarryOver,
+    InfeasibilityConflict,
+    InfeasibilityExplanation,
+    Weekday,
+)
+from .candidates import CandidateMatrix
+from .compiled import CompiledRequest, EmployeeRecord
+from .labor import MAX_CONSECUTIVE_DAYS, MAX_DAILY_MINUTES, MIN_REST_MINUTES, MINUTES_PER_DAY
+
+if TYPE_CHECKING:
+    from .cpsat import ShiftSlot
+
+logger = logging.getLogger(__name__)
+
+EXPLANATION_SECONDS = 5.0  # Budget for finding and shrinking the conflicting set
+# Larger explanation models take seconds to build and rarely yield a proof within the budget
+MAX_EXPLAINED_CANDIDATES = 10_000
+
+
+@dataclass(frozen=True)
+class _Rule:
+    """One guarded constraint group of the explanation model."""
+    kind: str
+    employee: Optional[EmployeeRecord] = None
+    slot: Optional["ShiftSlot"] = None
+    day: Optional[int] = None
+    limit: Optional[int] = None
+    carry: Optional[CarryOver] = None
+
+
+class InfeasibilityExplainer:
+    """
+    Smallest set of rules that cannot all hold, for a request CP-SAT proved infeasible.
+
+    Every rule group (one slot's coverage, one employee's weekly limit, overlaps
+    and rest, daily cap, run of working days or what the previous week carries
+    in) is enforced only under its own assumption literal. A run of days that
+    starts in the previous week needs both the run and the carry-over rule.
+    CP-SAT returns a subset of the assumptions that is already infeasible;
+    dropping its rules one at a time, and keeping each drop that leaves the rest
+    infeasible, shrinks it to a set where every rule is needed.
+
+    The model uses every feasible candidate, so a conflict found here does not
+    depend on candidate pruning, and whole-shift assignments only.
+    """
+
+    def __init__(
+        self,
+        request: CompiledRequest,
+        slots: List["ShiftSlot"],
+        candidates_by_shift: Dict[str, List[EmployeeRecord]],
+        weekly_limits: Dict[str, int],
+        locked_minutes: Dict[str, int],
+    ) -> None:
+        self._model = cp_model.CpModel()
+        self._rules: List[_Rule] = []
+        self._literals: List[cp_model.IntVar] = []
+        self._carry_literals: Dict[str, cp_model.IntVar] = {}
+
+        candidates = CandidateMatrix(request.employees, slots, request.locked_assignments)
+        for slot in slots:
+            if slot.locked_employee_id:
+                continue
+            employees = candidates_by_shift.get(slot.shift.id, [])
+            if not employees and request.options.allow_uncovered:
+                continue
+            slot_vars = []
+            for employee in employees:
+                var = self._model.NewBoolVar(f"assign_{employee.id}_{slot.shift.id}_{slot.slot_number}")
+                candidates.add(employee.id, slot.shift.id, slot.slot_number, var)
+                slot_vars.append(var)
+            if len(slot_vars) > 1:
+                self._model.AddAtMostOne(slot_vars)
+            self._model.AddBoolOr(slot_vars).OnlyEnforceIf(self._guard(_Rule("coverage", slot=slot)))
+        candidates.freeze()
+
+        carry_over = {carry.employee_id: carry for carry in request.carry_over}
+        for employee in request.employees:
+            variables, durations, starts, _ = candidates.employee_terms(employee.id)
+            locked = candidates.locked_intervals(employee.id)
+            budget = weekly_limits[employee.id] - locked_minutes[employee.id]
+            if sum(durations) > budget:
+                self._model.Add(cp_model.LinearExpr.WeightedSum(variables, durations) <= budget).OnlyEnforceIf(
+                    self._guard(_Rule("weekly_limit", employee, limit=weekly_limits[employee.id]))
+                )
+            carry = carry_over.get(employee.id)
+            self._add_overlap_rule(employee, variables, durations, starts, locked)
+            self._add_carried_rest(employee, variables, starts, locked, carry)
+            self._add_day_rules(employee, variables, durations, starts, locked, carry)
+
+    def explain(self, time_limit: float = EXPLANATION_SECONDS) -> Optional[InfeasibilityExplanation]:
+        """The conflicting rules, or None when the rules can all hold (or no proof came in time)."""
+        deadline = time.monotonic() + time_limit
+        solver = cp_model.CpSolver()
+        # Cores are reported by the single-worker search
+        solver.parameters.num_search_workers = 1
+        positions = {literal.Index(): pos for pos, literal in enumerate(self._literals)}
+
+        def core_of(active: List[int]) -> Tuple[int, Optional[List[int]]]:
+            solver.parameters.max_time_in_seconds = max(deadline - time.monotonic(), 0.01)
+            self._model.ClearAssumptions()
+            self._model.AddAssumptions([self._literals[pos] for pos in active])
+            status = solver.Solve(self._model)
+            if status != cp_model.INFEASIBLE:
+                return status, None
+            return status, [positions[index] for index in solver.SufficientAssumptionsForInfeasibility()]
+
+        status, core = core_of(list(range(len(self._literals))))
+        if core is None:
+            logger.info(f"Explanation model is {solver.StatusName(status)} with every rule enforced")
+            return None
+        initial = len(core)
+
+        # Deletion pass: rules before ``position`` are known to be needed
+        minimal = True
+        position = 0
+        while position < len(core):
+            if time.monotonic() >= deadline:
+                minimal = False
+                break
+            status, smaller = core_of(core[:position] + core[position + 1:])
+            if smaller is not None:
+                needed = core[:position]
+                core = needed + [pos for pos in smaller if pos not in needed]
+            else:
+                minimal = minimal and status != cp_model.UNKNOWN
+                position += 1
+        logger.info(f"Conflicting set shrunk from {initial} to {len(core)} rules (minimal: {minimal})")
+
+        conflicts = [self._conflict(self._rules[pos]) for pos in core]
+        conflicts.sort(key=lambda conflict: (conflict.kind, conflict.employee_id or "", conflict.shift_id or ""))
+        return InfeasibilityExplanation(conflicts=conflicts, minimal=minimal)
+
+    def _guard(self, rule: _Rule) -> cp_model.IntVar:
+        literal = self._model.NewBoolVar(f"rule_{len(self._rules)}")
+        self._rules.append(rule)
+        self._literals.append(literal)
+        return literal
+
+    def _carry_literal(self, employee: EmployeeRecord, carry: CarryOver) -> cp_model.IntVar:
+        """The employee's carry-over rule, shared by the carried rest and the carried days."""
+        literal = self._carry_literals.get(employee.id)
+        if literal is None:
+            literal = self._carry_literals[employee.id] = self._guard(_Rule("carry_over", employee, carry=carry))
+        return literal
+
+    def _add_overlap_rule(
+        self,
+        employee: EmployeeRecord,
+        variables: List[cp_model.IntVar],
+        durations: List[int],
+        starts: List[int],
+        locked: List[Tuple[int, int]],
+    ) -> None:
+        """No overlap, with rest, between the employee's shifts, as one rule.
+
+        A no-overlap cannot take an enforcement literal, so it runs on intervals
+        whose presence an assignment implies only while the rule is enforced, and
+        on locked intervals that are present only then.
+        """
+        if not variables:
+            return
+        spans = sorted(
+            [(start, start + duration) for duration, start in zip(durations, starts)]
+            + [(start, start + duration) for start, duration in locked]
+        )
+        reach = -MIN_REST_MINUTES
+        for start, end in spans:
+            if start < reach:
+                break
+            reach = max(reach, end + MIN_REST_MINUTES)
+        else:
+            return  # No two of the employee's shifts are close enough to conflict
+        literal = self._guard(_Rule("no_overlap", employee))
+        intervals = []
+        for i, (start, duration) in enumerate(locked):
+            # As in the solve model, rest never reaches into the next lock
+            rest = MIN_REST_MINUTES
+            if i + 1 < len(locked):
+                rest = max(0, min(rest, locked[i + 1][0] - start - duration))
+            intervals.append(self._model.NewOptionalFixedSizedIntervalVar(
+                start, duration + rest, literal, f"locked_interval_{employee.id}_{start}"
+            ))
+        for var, duration, start in zip(variables, durations, starts):
+            present = self._model.NewBoolVar(f"present_{var.Name()}")
+            self._model.AddBoolOr([var.Not(), present, literal.Not()])
+            intervals.append(self._model.NewOptionalFixedSizedIntervalVar(
+                start, duration + MIN_REST_MINUTES, present, f"interval_{var.Name()}"
+            ))
+        self._model.AddNoOverlap(intervals)
+
+    def _add_carried_rest(
+        self,
+        employee: EmployeeRecord,
+        variables: List[cp_model.IntVar],
+        starts: List[int],
+        locked: List[Tuple[int, int]],
+        carry: Optional[CarryOver],
+    ) -> None:
+        """No shift inside the rest after the previous Sunday's last shift, as in the solve model."""
+        if carry is None or carry.last_shift_end_minute is None:
+            return
+        rest_end = carry.last_shift_end_minute - MINUTES_PER_DAY + MIN_REST_MINUTES
+        if rest_end <= 0 or (locked and locked[0][0] < rest_end):
+            return  # A lock on Monday already starts inside the rest; locks take precedence
+        clashing = [var for var, start in zip(variables, starts) if start < rest_end]
+        if clashing:
+            literal = self._carry_literal(employee, carry)
+            for var in clashing:
+                self._model.AddImplication(literal, var.Not())
+
+    def _add_day_rules(
+        self,
+        employee: EmployeeRecord,
+        variables: List[cp_model.IntVar],
+        durations: List[int],
+        starts: List[int],
+        locked: List[Tuple[int, int]],
+        carry: Optional[CarryOver] = None,
+    ) -> None:
+        """Daily caps, one rule per day, and the consecutive-day limit as one rule.
+
+        Days carried in from the previous week count as locked days before Monday,
+        in windows that are enforced only under the carry-over rule as well.
+        """
+        day_vars: Dict[int, List[cp_model.IntVar]] = defaultdict(list)
+        day_durations: Dict[int, List[int]] = defaultdict(list)
+        for var, duration, start in zip(variables, durations, starts):
+            day_vars[start // MINUTES_PER_DAY].append(var)
+            day_durations[start // MINUTES_PER_DAY].append(duration)
+        locked_by_day: Dict[int, int] = defaultdict(int)
+        for start, duration in locked:
+            locked_by_day[start // MINUTES_PER_DAY] += duration
+        carried_days = min(carry.consecutive_days, MAX_CONSECUTIVE_DAYS) if carry is not None else 0
+        for day in range(-carried_days, 0):
+            locked_by_day[day] = 1
+
+        for day, durations_of_day in day_durations.items():
+            if locked_by_day[day] + sum(durations_of_day) > MAX_DAILY_MINUTES:
+                self._model.Add(
+                    cp_model.LinearExpr.WeightedSum(day_vars[day], durations_of_day)
+                    <= max(0, MAX_DAILY_MINUTES - locked_by_day[day])
+                ).OnlyEnforceIf(self._guard(_Rule("daily_limit", employee, day=day, limit=MAX_DAILY_MINUTES)))
+
+        window = MAX_CONSECUTIVE_DAYS + 1
+        literal = None
+        worked: Dict[int, object] = {}
+        for first in range(-carried_days, 7 - window + 1):
+            days = range(first, first + window)
+            if not all(day in day_vars or locked_by_day[day] for day in days):
+                continue
+            if sum(1 for day in days if locked_by_day[day]) > MAX_CONSECUTIVE_DAYS:
+                continue
+            for day in days:
+                if day in worked:
+                    continue
+                if locked_by_day[day]:
+                    worked[day] = 1
+                    continue
+                indicator = worked[day] = self._model.NewBoolVar(f"works_{employee.id}_{day}")
+                for var in day_vars[day]:
+                    self._model.AddImplication(var, indicator)
+            if literal is None:
+                literal = self._guard(_Rule("consecutive_days", employee, limit=MAX_CONSECUTIVE_DAYS))
+            enforcement = [literal] if first >= 0 else [literal, self._carry_literal(employee, carry)]
+            self._model.Add(sum(worked[day] for day in days) <= MAX_CONSECUTIVE_DAYS).OnlyEnforceIf(enforcement)
+
+    def _conflict(self, rule: _Rule) -> InfeasibilityConflict:
+        employee = rule.employee
+        if rule.kind == "coverage":
+            shift = rule.slot.shift
+            return InfeasibilityConflict(
+                kind="coverage",
+                shift_id=shift.id,
+                slot=rule.slot.slot_number,
+                day=shift.day,
+                message=(
+                    f"Slot {rule.slot.slot_number} of shift {shift.id} ({shift.role}, {shift.day.value} "
+                    f"{_clock(shift.start_minute)}-{_clock(shift.end_minute)}) must be covered"
+                ),
+            )
+        if rule.kind == "weekly_limit":
+            return InfeasibilityConflict(
+                kind="weekly_limit",
+                employee_id=employee.id,
+                limit_minutes=rule.limit,
+                message=f"{employee.name} works at most {rule.limit} minutes per week",
+            )
+        if rule.kind == "no_overlap":
+            return InfeasibilityConflict(
+                kind="no_overlap",
+                employee_id=employee.id,
+                message=(
+                    f"{employee.name} cannot work overlapping shifts or with less than "
+                    f"{MIN_REST_MINUTES} minutes of rest between them"
+                ),
+            )
+        if rule.kind == "daily_limit":
+            day = Weekday.from_iso_index(rule.day)
+            return InfeasibilityConflict(
+                kind="daily_limit",
+                employee_id=employee.id,
+                day=day,
+                limit_minutes=rule.limit,
+                message=f"{employee.name} works at most {rule.limit} minutes on {day.value}",
+            )
+        if rule.kind == "carry_over":
+            carried = []
+            if rule.carry.consecutive_days:
+                carried.append(f"{rule.carry.consecutive_days} working days in a row")
+            if rule.carry.last_shift_end_minute is not None:
+                carried.append(f"a shift ending at {_clock(rule.carry.last_shift_end_minute)} on Sunday")
+            return InfeasibilityConflict(
+                kind="carry_over",
+                employee_id=employee.id,
+                message=f"{employee.name} comes from the previous week with {' and '.join(carried)}",
+            )
+        return InfeasibilityConflict(
+            kind="consecutive_days",
+            employee_id=employee.id,
+            message=f"{employee.name} works at most {rule.limit} consecutive days",
+        )
+
+
+def _clock(minute: int) -> str:
+    return f"{minute // 60:02d}:{minute % 60:02d}"
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from ..domain.models import AssignmentSegment, LockedAssignment
+from .candidates import CandidateMatrix
+from .segments import StintSet
+
+
+def solution_values(source: Union[cp_model.CpSolver, cp_model.CpSolverSolutionCallback]) -> np.ndarray:
+    """Values of every model variable in the current solution, indexed by variable index.
+
+    Works for a finished solve and inside a solution callback alike, with one
+    read of the response instead of one ``Value`` call per variable.
+    """
+    response = source.ResponseProto() if isinstance(source, cp_model.CpSolver) else source.Response()
+    return np.asarray(response.solution, dtype=np.int64)
+
+
+def extract_assignments(
+    candidates: CandidateMatrix,
+    values: np.ndarray,
+    locked_assignments: List[LockedAssignment],
+    stints: Optional[StintSet] = None,
+) -> List[AssignmentSegment]:
+    """Locked assignments followed by the assignment variables and stints set in ``values``.
+
+    The employees chosen for a shift take its unlocked slot numbers in ascending
+    order, in request order of the employees, so equal schedules get equal slot numbers.
+    """
+    assignments = [
+        AssignmentSegment(
+            shift_id=locked.shift_id,
+            day=locked.day,
+            employee_id=locked.employee_id,
+            # Locked assignments keep their own times
+            start_minute=locked.start_minute,
+            end_minute=locked.end_minute,
+            slot=locked.slot,
+            locked=True,
+        )
+        for locked in locked_assignments
+    ]
+
+    chosen = candidates.chosen(values)
+    employees = candidates.employees
+    slots = candidates.slots
+    handed_out: Dict[str, int] = defaultdict(int)
+    for slot_pos, emp_pos in sorted(
+        zip(candidates.entry_slot[chosen].tolist(), candidates.entry_employee[chosen].tolist())
+    ):
+        shift = slots[slot_pos].shift
+        slot_number = candidates.free_slot_numbers[shift.id][handed_out[shift.id]]
+        handed_out[shift.id] += 1
+        assignments.append(AssignmentSegment(
+            shift_id=shift.id,
+            day=shift.day,
+            employee_id=employees[emp_pos].id,
+            # Solved assignments use the shift template times
+            start_minute=shift.start_minute,
+            end_minute=shift.end_minute,
+            slot=slot_number,
+            locked=False,
+        ))
+    if stints:
+        assignments.extend(stints.segments(values))
+    return merge_contiguous(assignments)
+
+
+def merge_contiguous(segments: List[AssignmentSegment]) -> List[AssignmentSegment]:
+    """Join segments of one employee in one shift slot that end where the next one starts.
+
+    The order is kept; a merged segment stays in the place of its first part.
+    """
+    groups: Dict[Tuple[str, str, int, bool], List[AssignmentSegment]] = defaultdict(list)
+    for seg in segments:
+        groups[(seg.employee_id, seg.shift_id, seg.slot, seg.locked)].append(seg)
+
+    absorbed: Set[int] = set()
+    for group in groups.values():
+        if len(group) < 2:
+            continue
+        group.sort(key=lambda seg: seg.start_minute)
+        head = group[0]
+        for seg in group[1:]:
+            if seg.start_minute == head.end_minute:
+                head.end_minute = seg.end_minute
+                absorbed.add(id(seg))
+            else:
+                head = seg
+    if not absorbed:
+        return segments
+    return [seg for seg in segments if id(seg) not in absorbed]
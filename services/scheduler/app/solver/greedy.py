@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from ..domain.models import AssignmentSegment, Weekday
+from .compiled import CompiledRequest, EmployeeRecord, ShiftRecord
+from .eligibility import EligibilityIndex
+from .labor import WorkLog, apply_carry_over
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for the improvement phase; the solver time limit caps it further
+DEFAULT_LOCAL_SEARCH_SECONDS = 1.0
+
+
+class _Roster(WorkLog):
+    """Booked intervals of one employee plus the weekly minute totals the budgets need."""
+
+    __slots__ = ("minutes", "unlocked_minutes")
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.minutes = 0
+        self.unlocked_minutes = 0
+
+    def add(self, day: Weekday, start: int, end: int, locked: bool = False) -> None:
+        super().add(day, start, end)
+        self.minutes += end - start
+        if not locked:
+            self.unlocked_minutes += end - start
+
+    def remove(self, day: Weekday, start: int, end: int) -> None:
+        super().remove(day, start, end)
+        self.minutes -= end - start
+        self.unlocked_minutes -= end - start
+
+
+@dataclass
+class _Placement:
+    shift: ShiftRecord
+    slot: int
+    employee_id: str
+
+    @property
+    def duration(self) -> int:
+        return self.shift.duration
+
+    @property
+    def key(self) -> Tuple[str, int]:
+        return self.shift.id, self.slot
+
+
+@dataclass
+class GreedyResult:
+    assignments: List[AssignmentSegment]
+    wall_time_ms: int
+    open_slots: int
+    repaired_slots: int  # Slots filled by the local-search phase
+
+
+class GreedySolver:
+    """
+    Constructive heuristic with a time-boxed local-search repair phase.
+
+    Shifts are filled most-constrained first; each open slot walks its ranked
+    candidate list until someone fits (weekly limit, block budget, no overlap,
+    labor rules).
+    Slots still open afterwards are repaired with ejection moves: a blocked
+    candidate hands one of their own shifts to another employee and takes the
+    open slot instead.
+    """
+
+    def __init__(
+        self,
+        weekly_limit: Callable[[EmployeeRecord], int],
+        local_search_seconds: float = DEFAULT_LOCAL_SEARCH_SECONDS,
+    ) -> None:
+        self._weekly_limit = weekly_limit
+        self._local_search_seconds = local_search_seconds
+
+    def solve(
+        self,
+        request: CompiledRequest,
+        index: EligibilityIndex,
+        minute_caps: Optional[Dict[str, int]] = None,
+    ) -> GreedyResult:
+        started = time.perf_counter()
+        state = _GreedyState(request, index, self._weekly_limit, minute_caps or {})
+
+        open_slots: List[Tuple[ShiftRecord, int]] = []
+        # Most constrained shifts first, so scarce employees go where they are needed
+        ordered = sorted(request.shifts, key=lambda shift: (len(index.feasible_employees(shift)), shift.start_minute))
+        for shift in ordered:
+            for slot_number in range(shift.capacity):
+                if (shift.id, slot_number) in state.locked_slots:
+                    continue
+                if not state.place_first_fit(shift, slot_number):
+                    open_slots.append((shift, slot_number))
+
+        repaired = 0
+        if open_slots:
+            budget = self._local_search_seconds
+            if request.options.solver_time_limit_seconds:
+                budget = min(budget, float(request.options.solver_time_limit_seconds))
+            deadline = time.perf_counter() + budget
+            still_open = []
+            for shift, slot_number in open_slots:
+                if time.perf_counter() < deadline and state.repair(shift, slot_number):
+                    repaired += 1
+                else:
+                    still_open.append((shift, slot_number))
+            open_slots = still_open
+
+        wall_time_ms = int((time.perf_counter() - started) * 1000)
+        logger.info(f"Greedy filled {len(state.placements)} slots ({repaired} by local search), {len(open_slots)} open")
+        return GreedyResult(
+            assignments=state.assignments(),
+            wall_time_ms=wall_time_ms,
+            open_slots=len(open_slots),
+            repaired_slots=repaired,
+        )
+
+
+class _GreedyState:
+    """
+    Placements so far; limits, block budgets and rosters are indexed by employee position.
+
+    Placements are keyed by (shift id, slot), overall and per employee, so the
+    ejection moves of the repair phase take one out in constant time.
+    """
+
+    def __init__(
+        self,
+        request: CompiledRequest,
+        index: EligibilityIndex,
+        weekly_limit: Callable[[EmployeeRecord], int],
+        minute_caps: Dict[str, int],
+    ) -> None:
+        self._request = request
+        self._index = index
+        # Locks and carry-over name employees by id, some of them outside the request
+        self._rosters: Dict[str, _Roster] = defaultdict(_Roster)
+        employees = index.employees
+        self._roster_at: List[_Roster] = [self._rosters[emp.id] for emp in employees]
+        self._limits: List[int] = [weekly_limit(emp) for emp in employees]
+        self._caps: List[Optional[int]] = [minute_caps.get(emp.id) for emp in employees]
+        self._by_employee: Dict[str, Dict[Tuple[str, int], _Placement]] = defaultdict(dict)
+        self._previous_pairs: Set[Tuple[str, str]] = {
+            (seg.employee_id, seg.shift_id) for seg in request.previous_assignments if not seg.locked
+        }
+        self.placements: Dict[Tuple[str, int], _Placement] = {}
+        self.locked_slots: Set[Tuple[str, int]] = set()
+        apply_carry_over(self._rosters, request.carry_over)
+        for locked in request.locked_assignments:
+            self.locked_slots.add((locked.shift_id, locked.slot))
+            self._rosters[locked.employee_id].add(locked.day, locked.start_minute, locked.end_minute, locked=True)
+
+    def place_first_fit(self, shift: ShiftRecord, slot_number: int) -> bool:
+        for emp in self._ranked(shift, with_room=True):
+            if self._fits(emp, shift):
+                self._place(shift, slot_number, emp.id)
+                return True
+        return False
+
+    def repair(self, shift: ShiftRecord, slot_number: int) -> bool:
+        """Free a blocked candidate by moving one of their shifts to someone else."""
+        duration = shift.duration
+        for emp in self._ranked(shift):
+            if self._fits(emp, shift):
+                # Earlier repairs may have freed this candidate already
+                self._place(shift, slot_number, emp.id)
+                return True
+            roster = self._roster_at[emp.position]
+            own = self._by_employee[emp.id].values()
+            blockers = [
+                placement for placement in own
+                if placement.shift.day_position == shift.day_position
+                and placement.shift.start_minute < shift.end_minute
+                and shift.start_minute < placement.shift.end_minute
+            ]
+            if len(blockers) > 1:
+                continue
+            if not blockers and roster.overlaps(shift.day, shift.start_minute, shift.end_minute):
+                continue  # Blocked by a locked assignment, which cannot move
+            movable = blockers or [
+                placement for placement in own if placement.duration >= self._overflow(emp, duration)
+            ]
+            for placement in movable:
+                if not self._fits(emp, shift, freed=placement):
+                    continue
+                target = self._relocation_target(placement, exclude=emp.id)
+                if target is None:
+                    continue
+                self._unplace(placement)
+                self._place(placement.shift, placement.slot, target.id)
+                self._place(shift, slot_number, emp.id)
+                return True
+        return False
+
+    def assignments(self) -> List[AssignmentSegment]:
+        segments = [
+            AssignmentSegment(
+                shift_id=locked.shift_id,
+                day=locked.day,
+                employee_id=locked.employee_id,
+                start_minute=locked.start_minute,
+                end_minute=locked.end_minute,
+                slot=locked.slot,
+                locked=True,
+            )
+            for locked in self._request.locked_assignments
+        ]
+        segments.extend(
+            AssignmentSegment(
+                shift_id=placement.shift.id,
+                day=placement.shift.day,
+                employee_id=placement.employee_id,
+                # Use the original shift template times
+                start_minute=placement.shift.start_minute,
+                end_minute=placement.shift.end_minute,
+                slot=placement.slot,
+                locked=False,
+            )
+            for placement in self.placements.values()
+        )
+        return segments
+
+    def _ranked(self, shift: ShiftRecord, with_room: bool = False) -> List[EmployeeRecord]:
+        """Candidates for ``shift``, optionally only those with enough weekly minutes left."""
+        candidates = self._index.feasible_employees(shift)
+        if with_room:
+            duration = shift.duration
+            candidates = [emp for emp in candidates if self._headroom(emp) >= duration]
+        rosters = self._roster_at
+        if self._previous_pairs:
+            # Prior assignees first, then under-utilized employees, higher targets as tiebreaker
+            candidates.sort(key=lambda emp: (
+                (emp.id, shift.id) not in self._previous_pairs,
+                rosters[emp.position].minutes,
+                -emp.weekly_minutes_target,
+            ))
+        else:
+            candidates.sort(key=lambda emp: (rosters[emp.position].minutes, -emp.weekly_minutes_target))
+        return candidates
+
+    def _headroom(self, emp: EmployeeRecord) -> int:
+        """Minutes the employee can still take under their weekly limit and block budget."""
+        pos = emp.position
+        roster = self._roster_at[pos]
+        headroom = self._limits[pos] - roster.minutes
+        cap = self._caps[pos]
+        if cap is not None:
+            headroom = min(headroom, cap - roster.unlocked_minutes)
+        return headroom
+
+    def _overflow(self, emp: EmployeeRecord, duration: int) -> int:
+        """Minutes ``emp`` must shed before ``duration`` more fits their limits."""
+        return max(duration - self._headroom(emp), 0)
+
+    def _fits(self, emp: EmployeeRecord, shift: ShiftRecord, freed: Optional[_Placement] = None) -> bool:
+        roster = self._roster_at[emp.position]
+        released = freed.duration if freed is not None else 0
+        if self._headroom(emp) + released < shift.duration:
+            return False
+        if freed is None:
+            return roster.allows(shift.day, shift.start_minute, shift.end_minute)
+        # Check against the roster without the freed shift
+        roster.remove(freed.shift.day, freed.shift.start_minute, freed.shift.end_minute)
+        try:
+            return roster.allows(shift.day, shift.start_minute, shift.end_minute)
+        finally:
+            roster.add(freed.shift.day, freed.shift.start_minute, freed.shift.end_minute)
+
+    def _relocation_target(self, placement: _Placement, exclude: str) -> Optional[EmployeeRecord]:
+        for emp in self._ranked(placement.shift, with_room=True):
+            if emp.id != exclude and self._fits(emp, placement.shift):
+                return emp
+        return None
+
+    def _place(self, shift: ShiftRecord, slot_number: int, employee_id: str) -> None:
+        placement = _Placement(shift, slot_number, employee_id)
+        self.placements[placement.key] = placement
+        self._by_employee[employee_id][placement.key] = placement
+        self._rosters[employee_id].add(shift.day, shift.start_minute, shift.end_minute)
+
+    def _unplace(self, placement: _Placement) -> None:
+        del self.placements[placement.key]
+        del self._by_employee[placement.employee_id][placement.key]
+        shift = placement.shift
+        self._rosters[placement.employee_id].remove(shift.day, shift.start_minute, shift.end_minute)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from ..domain.models import CarryOver, Weekday
+
+# Belgian labor law compliance
+MIN_REST_MINUTES = 30  # Minimum rest between shifts
+MAX_DAILY_MINUTES = 12 * 60  # Maximum 12 hours per day
+MAX_CONSECUTIVE_DAYS = 6  # Maximum consecutive working days
+
+MINUTES_PER_DAY = 24 * 60
+DAY_POSITION: Dict[Weekday, int] = {Weekday.from_iso_index(i): i for i in range(7)}
+
+
+class WorkLog:
+    """
+    Booked intervals of one employee with the counters the labor rules need.
+
+    Intervals are kept sorted per day, so overlap and rest checks are a bisect;
+    daily minutes are updated on every add and remove, so the daily cap and the
+    consecutive-day rule never rescan the schedule.
+    """
+
+    __slots__ = ("intervals", "day_minutes", "carried_days")
+
+    def __init__(self) -> None:
+        self.intervals: Dict[int, List[Tuple[int, int]]] = {}
+        self.day_minutes: List[int] = [0] * 7
+        self.carried_days = 0  # Working days in a row that end on the previous Sunday
+
+    def carry_in(self, consecutive_days: int, last_shift_end_minute: Optional[int]) -> None:
+        """Take over the end of the previous week: its run of working days and its last Sunday shift."""
+        self.carried_days = consecutive_days
+        if last_shift_end_minute is not None:
+            # Position -1 is the previous Sunday; only the end of its last shift matters for the rest check
+            self.intervals[-1] = [(0, last_shift_end_minute)]
+
+    def add(self, day: Weekday, start: int, end: int) -> None:
+        position = DAY_POSITION[day]
+        insort(self.intervals.setdefault(position, []), (start, end))
+        self.day_minutes[position] += end - start
+
+    def remove(self, day: Weekday, start: int, end: int) -> None:
+        position = DAY_POSITION[day]
+        self.intervals[position].remove((start, end))
+        self.day_minutes[position] -= end - start
+
+    def overlaps(self, day: Weekday, start: int, end: int) -> bool:
+        return self._conflicts(DAY_POSITION[day], start, end)
+
+    def allows(self, day: Weekday, start: int, end: int) -> bool:
+        """Whether ``[start, end)`` on ``day`` can be added without breaking a labor rule."""
+        position = DAY_POSITION[day]
+        if self.day_minutes[position] + end - start > MAX_DAILY_MINUTES:
+            return False
+        if self._conflicts(position, start - MIN_REST_MINUTES, end + MIN_REST_MINUTES):
+            return False
+        # Rest also applies across midnight
+        if start < MIN_REST_MINUTES and self._conflicts(
+            position - 1, start - MIN_REST_MINUTES + MINUTES_PER_DAY, MINUTES_PER_DAY + 1
+        ):
+            return False
+        if end > MINUTES_PER_DAY - MIN_REST_MINUTES and self._conflicts(
+            position + 1, -1, end + MIN_REST_MINUTES - MINUTES_PER_DAY
+        ):
+            return False
+        if self.day_minutes[position]:
+            return True  # Already a working day, the run of working days does not change
+        run = 1
+        before = position - 1
+        while before >= 0 and self.day_minutes[before]:
+            run, before = run + 1, before - 1
+        if before < 0:
+            run += self.carried_days
+        after = position + 1
+        while after < 7 and self.day_minutes[after]:
+            run, after = run + 1, after + 1
+        return run <= MAX_CONSECUTIVE_DAYS
+
+    def _conflicts(self, position: int, start: int, end: int) -> bool:
+        intervals = self.intervals.get(position)
+        if not intervals:
+            return False
+        pos = bisect_left(intervals, (start, end))
+        if pos < len(intervals) and intervals[pos][0] < end:
+            return True
+        return pos > 0 and intervals[pos - 1][1] > start
+
+
+def apply_carry_over(logs: Mapping[str, WorkLog], carry_over: Sequence[CarryOver]) -> None:
+    """Start each employee's log from the previous week's state; ``logs`` creates missing entries."""
+    for carry in carry_over:
+        logs[carry.employee_id].carry_in(carry.consecutive_days, carry.last_shift_end_minute)
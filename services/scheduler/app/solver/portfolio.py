@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable, List, Optional
+
+from ..domain.models import SolveResponse
+
+logger = logging.getLogger(__name__)
+
+GREEDY = "greedy"
+CPSAT = "cpsat"
+
+
+class PortfolioRace:
+    """
+    Races the greedy heuristic against a running CP-SAT search.
+
+    Greedy runs on a background thread while CP-SAT searches (the native search
+    releases the GIL). Whichever first produces a schedule reaching the target
+    coverage wins and the CP-SAT search is stopped; if neither does, the caller
+    picks the better of the two results once both are done.
+    """
+
+    def __init__(self, target_coverage: float) -> None:
+        self._target = target_coverage
+        self._lock = threading.Lock()
+        self._stops: List[Callable[[], None]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._greedy_response: Optional[SolveResponse] = None
+        self._greedy_error: Optional[BaseException] = None
+        self.winner: Optional[str] = None
+
+    def start_greedy(self, solve_greedy: Callable[[], SolveResponse]) -> None:
+        def run() -> None:
+            try:
+                response = solve_greedy()
+            except BaseException as exc:  # Surfaced from wait_greedy on the solving thread
+                self._greedy_error = exc
+                return
+            self._greedy_response = response
+            if response.metrics.coverage_ratio >= self._target and self._claim(GREEDY):
+                logger.info(f"Portfolio: greedy reached {response.metrics.coverage_ratio:.1%} coverage first")
+                self._stop_search()
+
+        self._thread = threading.Thread(target=run, name="portfolio-greedy", daemon=True)
+        self._thread.start()
+
+    def bind_stop(self, stop: Callable[[], None]) -> None:
+        with self._lock:
+            self._stops.append(stop)
+            decided = self.winner is not None
+        if decided:
+            stop()
+
+    @property
+    def greedy_won(self) -> bool:
+        return self.winner == GREEDY
+
+    @property
+    def cpsat_won(self) -> bool:
+        return self.winner == CPSAT
+
+    def offer_cpsat(self, coverage_ratio: float) -> bool:
+        """Record a CP-SAT solution; True when it wins the race and the search should stop."""
+        if coverage_ratio >= self._target and self._claim(CPSAT):
+            logger.info(f"Portfolio: CP-SAT reached {coverage_ratio:.1%} coverage first")
+            return True
+        return self.winner is not None
+
+    def wait_greedy(self) -> SolveResponse:
+        if self._thread is not None:
+            self._thread.join()
+        if self._greedy_error is not None:
+            raise self._greedy_error
+        assert self._greedy_response is not None
+        return self._greedy_response
+
+    def _claim(self, contender: str) -> bool:
+        with self._lock:
+            if self.winner is not None:
+                return False
+            self.winner = contender
+            return True
+
+    def _stop_search(self) -> None:
+        with self._lock:
+            stops = list(self._stops)
+        for stop in stops:
+            stop()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from ortools.sat.python import cp_model
+
+DEFAULT_PROFILE = "balanced"
+DEFAULT_TIME_LIMIT_SECONDS = 15.0
+
+
+@dataclass(frozen=True)
+class SolverProfile:
+    """Named set of CP-SAT parameters trading solve time against schedule quality."""
+    name: str
+    max_time_seconds: Optional[float]  # Caps the request's time limit; None keeps the request limit
+    min_search_workers: int
+    max_search_workers: Optional[int]  # None uses every core available to the solve
+    probing_level: int
+    linearization_level: int
+    fairness_seconds: Optional[float]  # Cap of the workload-balancing pass; 0 skips it, None uses the time left
+
+    def search_workers(self, available: int) -> int:
+        workers = max(self.min_search_workers, available)
+        if self.max_search_workers is not None:
+            workers = min(workers, self.max_search_workers)
+        return workers
+
+    def time_limit(self, time_limit_seconds: Optional[int]) -> float:
+        """Seconds a solve with the request's ``time_limit_seconds`` may search under this profile."""
+        time_limit = float(time_limit_seconds or DEFAULT_TIME_LIMIT_SECONDS)
+        if self.max_time_seconds is not None:
+            time_limit = min(time_limit, self.max_time_seconds)
+        return time_limit
+
+    def apply(self, solver: cp_model.CpSolver, time_limit_seconds: Optional[int], available_workers: int) -> None:
+        solver.parameters.max_time_in_seconds = self.time_limit(time_limit_seconds)
+        solver.parameters.num_search_workers = self.search_workers(available_workers)
+        solver.parameters.log_search_progress = False
+        solver.parameters.cp_model_presolve = True
+        solver.parameters.cp_model_probing_level = self.probing_level
+        solver.parameters.linearization_level = self.linearization_level
+
+
+PROFILES: Dict[str, SolverProfile] = {
+    # First good answer quickly: short cap, no probing, default linearization
+    "fast": SolverProfile(
+        name="fast",
+        max_time_seconds=5.0,
+        min_search_workers=1,
+        max_search_workers=4,
+        probing_level=0,
+        linearization_level=1,
+        fairness_seconds=0.0,
+    ),
+    # The long-standing defaults, with workers following the cores instead of a fixed 2
+    "balanced": SolverProfile(
+        name="balanced",
+        max_time_seconds=DEFAULT_TIME_LIMIT_SECONDS,
+        min_search_workers=2,
+        max_search_workers=8,
+        probing_level=0,
+        linearization_level=2,
+        fairness_seconds=2.0,
+    ),
+    # Uses the full request time limit and every available core
+    "quality": SolverProfile(
+        name="quality",
+        max_time_seconds=None,
+        min_search_workers=2,
+        max_search_workers=None,
+        probing_level=2,
+        linearization_level=2,
+        fairness_seconds=None,
+    ),
+}
+
+
+def get_profile(name: Optional[str]) -> SolverProfile:
+    profile = PROFILES.get(name or DEFAULT_PROFILE)
+    if profile is None:
+        raise ValueError(f"Unknown solver profile {name!r}, expected one of {', '.join(PROFILES)}")
+    return profile
+
+
+def cores_per_solve(concurrent_solves: int = 1) -> int:
+    """CPU cores each of ``concurrent_solves`` simultaneous solves may use."""
+    return max(1, (os.cpu_count() or 2) // max(1, concurrent_solves))
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Optional, Protocol
+
+from ortools.sat.python import cp_model
+
+from ..domain.models import SolveResponse
+
+
+class SolveObserver(Protocol):
+    """Receives intermediate solutions from a running solve and can stop it."""
+
+    def on_solution(self, response: SolveResponse) -> None:
+        ...
+
+    def bind_stop(self, stop: Callable[[], None]) -> None:
+        """Called before the search starts with a function that stops it early."""
+        ...
+
+
+class SolutionProgressCallback(cp_model.CpSolverSolutionCallback):
+    """
+    Forwards improving CP-SAT solutions to a handler.
+
+    Solutions arriving faster than ``min_interval_seconds`` are skipped (the first
+    one always goes through) so building responses never dominates the search.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[["SolutionProgressCallback"], None],
+        min_interval_seconds: float = 0.25,
+    ) -> None:
+        super().__init__()
+        self._handler = handler
+        self._min_interval = min_interval_seconds
+        self._last_report = 0.0
+        self.solutions_found = 0
+
+    def on_solution_callback(self) -> None:
+        self.solutions_found += 1
+        now = time.monotonic()
+        if self.solutions_found > 1 and now - self._last_report < self._min_interval:
+            return
+        self._last_report = now
+        self._handler(self)
+
+
+class QueueObserver:
+    """
+    Observer of a solve that runs in another process than its caller.
+
+    Improving schedules are put on ``progress`` as ``(tag, response)``, and
+    ``cancelled`` is the caller's cancel flag; both may be multiprocessing manager
+    proxies. Each solution callback checks the flag before reporting and stops
+    the search once it is set. A watcher thread checks it too, since a search
+    may be cancelled before it finds its first solution. ``close`` ends the watcher.
+    """
+
+    def __init__(self, tag: str, progress: Any, cancelled: Any, poll_seconds: float = 0.2) -> None:
+        self._tag = tag
+        self._progress = progress
+        self._cancelled = cancelled
+        self._poll_seconds = poll_seconds
+        self._stop: Optional[Callable[[], None]] = None
+        self._done = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def on_solution(self, response: SolveResponse) -> None:
+        if self._cancelled.is_set():
+            self._request_stop()
+            return
+        self._progress.put((self._tag, response))
+
+    def bind_stop(self, stop: Callable[[], None]) -> None:
+        with self._lock:
+            self._stop = stop
+            if self._watcher is None:
+                self._watcher = threading.Thread(target=self._watch, name=f"cancel-{self._tag}", daemon=True)
+                self._watcher.start()
+
+    def close(self) -> None:
+        self._done.set()
+        with self._lock:
+            watcher = self._watcher
+        if watcher is not None:
+            watcher.join()
+
+    def _watch(self) -> None:
+        while not self._done.wait(self._poll_seconds):
+            if self._cancelled.is_set():
+                self._request_stop()
+                return
+
+    def _request_stop(self) -> None:
+        with self._lock:
+            stop = self._stop
+        if stop is not None:
+            stop()
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from ..domain.models import AssignmentSegment
+from .compiled import EmployeeRecord, ShiftRecord
+from .labor import MIN_REST_MINUTES
+
+if TYPE_CHECKING:
+    from .cpsat import ShiftSlot
+
+
+def grid(shift: ShiftRecord, slot_size: int) -> List[int]:
+    """Minutes where a segment of ``shift`` may start or end: every ``slot_size`` from its start, and its end."""
+    return list(range(shift.start_minute, shift.end_minute, slot_size)) + [shift.end_minute]
+
+
+def aligned_window(boundaries: List[int], start: int, end: int, min_minutes: int) -> Optional[Tuple[int, int]]:
+    """Largest grid-aligned part of ``[start, end)``, or None when it is shorter than ``min_minutes``."""
+    lo = boundaries[bisect_left(boundaries, start)] if start <= boundaries[-1] else None
+    hi = boundaries[bisect_right(boundaries, end) - 1] if end >= boundaries[0] else None
+    if lo is None or hi is None or hi - lo < min_minutes:
+        return None
+    return lo, hi
+
+
+def covers_span(start: int, end: int, windows: List[Tuple[int, int]]) -> bool:
+    """Whether the union of ``windows`` contains ``[start, end)``."""
+    reached = start
+    for lo, hi in sorted(windows):
+        if lo > reached:
+            break
+        reached = max(reached, hi)
+    return reached >= end
+
+
+@dataclass
+class Stint:
+    """One employee's contiguous part of a shift slot, placed on the slot's grid."""
+    employee: EmployeeRecord
+    slot: "ShiftSlot"
+    presence: cp_model.IntVar
+    start: cp_model.IntVar  # Absolute minute of the week
+    end: cp_model.IntVar
+    size: cp_model.IntVar
+    interval: cp_model.IntervalVar  # Within the slot, without rest
+
+    def rest_interval(self, model: cp_model.CpModel) -> cp_model.IntervalVar:
+        """The stint extended by the minimum rest, for the employee's no-overlap."""
+        return model.NewOptionalIntervalVar(
+            self.start,
+            self.size + MIN_REST_MINUTES,
+            self.end + MIN_REST_MINUTES,
+            self.presence,
+            f"stint_rest_{self.employee.id}_{self.slot.shift.id}_{self.slot.slot_number}",
+        )
+
+
+class StintSet:
+    """
+    Segment variables of the slots that may be split between employees.
+
+    A stint is four variables and an optional interval whatever the shift length:
+    start and end range over the ``slot_size_minutes`` grid instead of one
+    Boolean per employee per tick. A slot is fully covered when its stints do not
+    overlap and their sizes add up to its duration.
+    """
+
+    def __init__(self) -> None:
+        self.stints: List[Stint] = []
+        self._by_employee: Dict[str, List[Stint]] = {}
+        self._presence_index = np.empty(0, dtype=np.int64)
+        self._start_index = np.empty(0, dtype=np.int64)
+        self._end_index = np.empty(0, dtype=np.int64)
+
+    def __bool__(self) -> bool:
+        return bool(self.stints)
+
+    def add(
+        self,
+        model: cp_model.CpModel,
+        employee: EmployeeRecord,
+        slot: "ShiftSlot",
+        boundaries: List[int],
+        window: Tuple[int, int],
+        min_minutes: int,
+    ) -> Stint:
+        offset = slot.day_start_minute - slot.start_minute
+        lo, hi = window
+        points = [offset + point for point in boundaries if lo <= point <= hi]
+        name = f"{employee.id}_{slot.shift.id}_{slot.slot_number}"
+        presence = model.NewBoolVar(f"stint_{name}")
+        start = model.NewIntVarFromDomain(cp_model.Domain.FromValues(points[:-1]), f"stint_start_{name}")
+        end = model.NewIntVarFromDomain(cp_model.Domain.FromValues(points[1:]), f"stint_end_{name}")
+        size = model.NewIntVar(0, hi - lo, f"stint_size_{name}")
+        model.Add(size >= min_minutes).OnlyEnforceIf(presence)
+        model.Add(size == 0).OnlyEnforceIf(presence.Not())
+        interval = model.NewOptionalIntervalVar(start, size, end, presence, f"stint_interval_{name}")
+        stint = Stint(employee, slot, presence, start, end, size, interval)
+        self.stints.append(stint)
+        self._by_employee.setdefault(employee.id, []).append(stint)
+        return stint
+
+    def freeze(self) -> None:
+        """Record variable indices for bulk reads; call once all stints exist."""
+        count = len(self.stints)
+        self._presence_index = np.fromiter((st.presence.Index() for st in self.stints), dtype=np.int64, count=count)
+        self._start_index = np.fromiter((st.start.Index() for st in self.stints), dtype=np.int64, count=count)
+        self._end_index = np.fromiter((st.end.Index() for st in self.stints), dtype=np.int64, count=count)
+
+    def employee_stints(self, employee_id: str) -> List[Stint]:
+        return self._by_employee.get(employee_id, [])
+
+    def assigned_minutes(self, values: np.ndarray) -> int:
+        """Minutes covered by the stints present in ``values``."""
+        present = values[self._presence_index] > 0
+        return int((values[self._end_index][present] - values[self._start_index][present]).sum())
+
+    def segments(self, values: np.ndarray) -> List[AssignmentSegment]:
+        """Assignment segments of the stints present in ``values``."""
+        present = np.flatnonzero(values[self._presence_index])
+        starts = values[self._start_index][present].tolist()
+        ends = values[self._end_index][present].tolist()
+        segments = []
+        for pos, start, end in zip(present.tolist(), starts, ends):
+            stint = self.stints[pos]
+            shift = stint.slot.shift
+            offset = stint.slot.day_start_minute - shift.start_minute
+            segments.append(AssignmentSegment(
+                shift_id=shift.id,
+                day=shift.day,
+                employee_id=stint.employee.id,
+                start_minute=start - offset,
+                end_minute=end - offset,
+                slot=stint.slot.slot_number,
+                locked=False,
+            ))
+        return segments
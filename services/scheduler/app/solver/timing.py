@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+
+from ..domain.models import PhaseTimings, SolveResponse
+
+PHASES = ("validation", "eligibility", "slot_building", "model_build", "solve", "extraction")
+
+
+class PhaseTimer:
+    """
+    Lap timer for the phases of one solve.
+
+    ``lap(phase)`` charges the time since the previous lap to ``phase``, so the
+    solver only marks phase boundaries instead of wrapping each phase in a block.
+    Timings of nested solves (greedy fallback, decomposed parts) are folded in
+    with ``add`` when their responses are attached to the outer one.
+    """
+
+    def __init__(self) -> None:
+        self._started = self._last = time.perf_counter()
+        self._ms: Dict[str, float] = defaultdict(float)
+        self.num_variables: Optional[int] = None
+        self.num_constraints: Optional[int] = None
+
+    def lap(self, phase: str) -> None:
+        now = time.perf_counter()
+        self._ms[phase] += (now - self._last) * 1000
+        self._last = now
+
+    def add(self, timings: Optional[PhaseTimings]) -> None:
+        if timings is None:
+            return
+        for phase in PHASES:
+            self._ms[phase] += getattr(timings, f"{phase}_ms")
+
+    def add_model_size(self, num_variables: Optional[int], num_constraints: Optional[int]) -> None:
+        if num_variables is not None:
+            self.num_variables = (self.num_variables or 0) + num_variables
+        if num_constraints is not None:
+            self.num_constraints = (self.num_constraints or 0) + num_constraints
+
+    def attach(self, response: SolveResponse, algorithm: Optional[str] = None) -> SolveResponse:
+        """Fold the response's own timings into this timer and store the result on it."""
+        metrics = response.metrics
+        self.add(metrics.timings)
+        self.add_model_size(metrics.num_variables, metrics.num_constraints)
+        metrics.timings = PhaseTimings(
+            total_ms=round((time.perf_counter() - self._started) * 1000, 3),
+            **{f"{phase}_ms": round(self._ms[phase], 3) for phase in PHASES},
+        )
+        metrics.num_variables = self.num_variables
+        metrics.num_constraints = self.num_constraints
+        if metrics.algorithm is None:
+            metrics.algorithm = algorithm
+        return response
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from pydantic import parse_obj_as
+
+from .config import Settings, settings
+from .domain.models import (
+    AvailabilitySlot,
+    Employee,
+    Shift,
+    SolveRequest,
+    TemplateInfo,
+    TemplateSolveRequest,
+    TemplateUpload,
+    WeekOverrides,
+)
+
+
+class UnknownTemplateError(KeyError):
+    """Raised when a request references a template version that is not registered."""
+
+
+def template_version(upload: TemplateUpload) -> str:
+    """Content hash of an upload, independent of employee and shift ordering."""
+    payload = upload.dict()
+    payload["employees"].sort(key=lambda emp: emp["id"])
+    payload["shifts"].sort(key=lambda shift: shift["id"])
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:24]
+
+
+def apply_overrides(
+    employees: List[Employee], shifts: List[Shift], overrides: WeekOverrides, source: str
+) -> Tuple[List[Employee], List[Shift]]:
+    """Employees and shifts of one week after its overrides.
+
+    Raises ``ValueError`` for overrides naming employees or shifts that ``source``
+    does not have, or adding ones it already has, and for invalid availability.
+    Availability is parsed again, since trusted callers skip validation.
+    """
+    employee_ids = {emp.id for emp in employees}
+    shift_ids = {shift.id for shift in shifts}
+    for employee_id in [*overrides.availability, *overrides.absent_employees]:
+        if employee_id not in employee_ids:
+            raise ValueError(f"Override for employee {employee_id}, who is not in {source}")
+    for shift_id in overrides.removed_shifts:
+        if shift_id not in shift_ids:
+            raise ValueError(f"Removed shift {shift_id} is not in {source}")
+    for emp in overrides.extra_employees:
+        if emp.id in employee_ids:
+            raise ValueError(f"Extra employee {emp.id} is already in {source}")
+    for shift in overrides.extra_shifts:
+        if shift.id in shift_ids:
+            raise ValueError(f"Extra shift {shift.id} is already in {source}")
+
+    availability = {
+        employee_id: parse_obj_as(List[AvailabilitySlot], slots)
+        for employee_id, slots in overrides.availability.items()
+    }
+    absent = set(overrides.absent_employees)
+    removed = set(overrides.removed_shifts)
+    return (
+        [
+            emp if emp.id not in availability
+            else emp.copy(update={"availability": availability[emp.id]})
+            for emp in employees
+            if emp.id not in absent
+        ] + overrides.extra_employees,
+        [shift for shift in shifts if shift.id not in removed] + overrides.extra_shifts,
+    )
+
+
+class TemplateRegistry:
+    """
+    Versioned employee and shift templates, so weekly solves send only their changes.
+
+    Versions are content hashes and never change once uploaded. The most recently
+    used versions stay parsed in memory; when a SQLite path is configured, every
+    version is also stored on disk and survives restarts and memory eviction.
+    Without it, an evicted version answers 404 and the caller uploads it again.
+    """
+
+    def __init__(self, config: Settings = settings) -> None:
+        self._max_entries = config.template_max_entries
+        self._entries: "OrderedDict[str, TemplateUpload]" = OrderedDict()
+        self._infos: "OrderedDict[str, TemplateInfo]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk: Optional[_TemplateStore] = None
+        if config.template_sqlite_path:
+            self._disk = _TemplateStore(config.template_sqlite_path)
+
+    def put(self, upload: TemplateUpload) -> TemplateInfo:
+        version_id = template_version(upload)
+        try:
+            return self.info(version_id)
+        except UnknownTemplateError:
+            pass
+        info = TemplateInfo(
+            version_id=version_id,
+            store_id=upload.store_id,
+            employee_count=len(upload.employees),
+            shift_count=len(upload.shifts),
+            created_at=datetime.now(timezone.utc),
+        )
+        if self._disk is not None:
+            self._disk.put(info, upload)
+        with self._lock:
+            self._store(info, upload)
+        return info
+
+    def info(self, version_id: str) -> TemplateInfo:
+        return self._load(version_id)[0]
+
+    def resolve(self, request: TemplateSolveRequest) -> SolveRequest:
+        """Expand a template reference and its week overrides into a full solve request.
+
+        Raises ``UnknownTemplateError`` for an unregistered version and ``ValueError``
+        for overrides naming employees or shifts the template does not have.
+        """
+        info, upload = self._load(request.template_version)
+        overrides = request.overrides
+        employees, shifts = apply_overrides(
+            upload.employees, upload.shifts, overrides, f"template {info.version_id}"
+        )
+        # Every part is already validated, so the request is assembled without a second pass
+        solve_request = SolveRequest.construct(
+            store_id=upload.store_id,
+            iso_week=request.iso_week,
+            shifts=shifts,
+            employees=employees,
+            locked_assignments=request.locked_assignments,
+            options=request.options,
+            previous_assignments=request.previous_assignments,
+        )
+        solve_request._eligibility_key = eligibility_key(info.version_id, overrides)
+        return solve_request
+
+    def _load(self, version_id: str) -> "tuple[TemplateInfo, TemplateUpload]":
+        with self._lock:
+            upload = self._entries.get(version_id)
+            if upload is not None:
+                self._entries.move_to_end(version_id)
+                self._infos.move_to_end(version_id)
+                return self._infos[version_id], upload
+        stored = self._disk.get(version_id) if self._disk is not None else None
+        if stored is None:
+            raise UnknownTemplateError(version_id)
+        with self._lock:
+            self._store(*stored)
+        return stored
+
+    def _store(self, info: TemplateInfo, upload: TemplateUpload) -> None:
+        self._entries[info.version_id] = upload
+        self._infos[info.version_id] = info
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._infos.popitem(last=False)
+
+
+def employees_key(prefix: str, employees: List[Employee]) -> str:
+    """Eligibility key of an employee set that has no template version."""
+    payload = "[" + ",".join(emp.json() for emp in employees) + "]"
+    return f"{prefix}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:24]}"
+
+
+def eligibility_key(version_id: str, overrides: WeekOverrides) -> str:
+    """Template version plus whatever the overrides change about its employees."""
+    if not (overrides.availability or overrides.absent_employees or overrides.extra_employees):
+        return version_id
+    changes = overrides.json(include={"availability", "absent_employees", "extra_employees"})
+    return f"{version_id}:{hashlib.sha256(changes.encode('utf-8')).hexdigest()[:16]}"
+
+
+class _TemplateStore:
+    """SQLite table of every uploaded template version."""
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        # Opened lazily so solver worker processes importing this module never touch the file
+        if self._connection is None:
+            self._connection = sqlite3.connect(self._path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS templates ("
+                " version_id TEXT PRIMARY KEY, info TEXT NOT NULL, payload BLOB NOT NULL)"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def get(self, version_id: str) -> "Optional[tuple[TemplateInfo, TemplateUpload]]":
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT info, payload FROM templates WHERE version_id = ?", (version_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return TemplateInfo.parse_raw(row[0]), TemplateUpload.parse_raw(bytes(row[1]))
+
+    def put(self, info: TemplateInfo, upload: TemplateUpload) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO templates (version_id, info, payload) VALUES (?, ?, ?)",
+                (info.version_id, info.json(), upload.json().encode("utf-8")),
+            )
+            self._conn.commit()
+
+
+template_registry = TemplateRegistry()
@@ -0,0 +1 @@
+"""Solver benchmark suite: seeded store-week generator plus a runner comparing against a baseline."""
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from ..app.domain.models import (
+    AvailabilitySlot,
+    Employee,
+    LockedAssignment,
+    Shift,
+    SolveOptions,
+    SolveRequest,
+    Weekday,
+)
+from ..app.solver.compiled import compile_request
+from ..app.solver.cpsat import CPSATSolver
+from ..app.solver.eligibility import EligibilityIndex
+from ..app.solver.greedy import GreedySolver
+
+ISO_WEEK = "2024-W21"
+
+# (work type id, role name)
+ROLES: List[Tuple[str, str]] = [
+    ("wt-cashier", "Cashier"),
+    ("wt-sales", "Sales Associate"),
+    ("wt-stock", "Stock Clerk"),
+    ("wt-lead", "Shift Lead"),
+]
+# Typical retail shift templates (start, end) in minutes from midnight
+SHIFT_TEMPLATES: List[Tuple[int, int]] = [
+    (6 * 60, 14 * 60),
+    (8 * 60, 12 * 60),
+    (9 * 60, 17 * 60),
+    (10 * 60, 18 * 60),
+    (12 * 60, 16 * 60),
+    (14 * 60, 22 * 60),
+    (17 * 60, 21 * 60),
+]
+# Contract mix with weekly target minutes
+CONTRACTS: List[Tuple[str, float, int]] = [
+    ("FULL_TIME", 0.4, 38 * 60),
+    ("PART_TIME", 0.3, 24 * 60),
+    ("STUDENT", 0.2, 16 * 60),
+    ("FLEXI_JOB", 0.1, 12 * 60),
+]
+WEEKDAYS: List[Weekday] = [Weekday.from_iso_index(i) for i in range(7)]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """Shape of a generated store-week."""
+    name: str
+    employees: int
+    shifts: int
+    stores: int = 1
+    max_capacity: int = 2
+    cross_store_ratio: float = 0.0  # Share of employees allowed to work in other stores
+    locked_ratio: float = 0.0  # Share of slots pre-assigned as locked assignments
+    time_limit_seconds: int = 5
+    allow_uncovered: bool = True
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in [
+        Scenario("small", employees=12, shifts=14),
+        Scenario("single-store", employees=25, shifts=40),
+        Scenario("locked", employees=25, shifts=40, locked_ratio=0.3),
+        Scenario("multi-store", employees=80, shifts=120, stores=3, cross_store_ratio=0.3),
+        Scenario("large", employees=150, shifts=250, stores=2, cross_store_ratio=0.2),
+        Scenario("region", employees=400, shifts=700, stores=8, max_capacity=3, cross_store_ratio=0.25, time_limit_seconds=10),
+    ]
+}
+DEFAULT_SCENARIOS = list(SCENARIOS)
+
+
+def generate(scenario: Scenario, seed: int = 0) -> SolveRequest:
+    """Build a reproducible ``SolveRequest`` of the given shape."""
+    rng = random.Random(f"{scenario.name}:{seed}")
+    store_ids = [f"store-{n + 1:02d}" for n in range(scenario.stores)]
+    employees = [_employee(rng, n, store_ids, scenario) for n in range(scenario.employees)]
+    shifts = [_shift(rng, n, store_ids, scenario) for n in range(scenario.shifts)]
+    request = SolveRequest(
+        store_id=store_ids[0],
+        iso_week=ISO_WEEK,
+        shifts=shifts,
+        employees=employees,
+        options=SolveOptions(
+            solver_time_limit_seconds=scenario.time_limit_seconds,
+            allow_uncovered=scenario.allow_uncovered,
+            use_cache=False,
+        ),
+    )
+    if scenario.locked_ratio > 0:
+        request = request.copy(update={"locked_assignments": _locks(rng, request, scenario.locked_ratio)})
+    return request
+
+
+def _employee(rng: random.Random, n: int, store_ids: List[str], scenario: Scenario) -> Employee:
+    contract, _, target = rng.choices(CONTRACTS, weights=[weight for _, weight, _ in CONTRACTS])[0]
+    roles = rng.sample(ROLES, rng.choice([1, 2, 2, 3]))
+    availability = []
+    for day in WEEKDAYS:
+        if contract == "STUDENT" and day not in (Weekday.SAT, Weekday.SUN) and rng.random() < 0.6:
+            # Students mostly work evenings on weekdays
+            availability.append(AvailabilitySlot(day=day, start_minute=16 * 60, end_minute=22 * 60))
+        elif rng.random() < 0.8:
+            start = rng.choice([6, 6, 8, 9]) * 60
+            end = rng.choice([18, 21, 22, 22]) * 60
+            availability.append(AvailabilitySlot(day=day, start_minute=start, end_minute=end))
+        else:
+            availability.append(AvailabilitySlot(day=day, is_off=True, start_minute=0, end_minute=0))
+    return Employee(
+        id=f"emp-{n + 1:04d}",
+        name=f"Employee {n + 1}",
+        home_store_id=store_ids[n % len(store_ids)],
+        can_work_across_stores=rng.random() < scenario.cross_store_ratio,
+        contract_type=contract,
+        weekly_minutes_target=target,
+        role_ids=[work_type_id for work_type_id, _ in roles],
+        role_names=[role_name for _, role_name in roles],
+        availability=availability,
+    )
+
+
+def _shift(rng: random.Random, n: int, store_ids: List[str], scenario: Scenario) -> Shift:
+    work_type_id, role = rng.choice(ROLES)
+    start, end = rng.choice(SHIFT_TEMPLATES)
+    return Shift(
+        id=f"shift-{n + 1:05d}",
+        role=role,
+        day=rng.choice(WEEKDAYS),
+        start_minute=start,
+        end_minute=end,
+        capacity=rng.randint(1, scenario.max_capacity),
+        store_id=rng.choice(store_ids),
+        work_type_id=work_type_id,
+    )
+
+
+def _locks(rng: random.Random, request: SolveRequest, ratio: float) -> List[LockedAssignment]:
+    """Lock a share of a valid greedy schedule, so the locks never conflict with each other."""
+    greedy = GreedySolver(CPSATSolver()._get_weekly_limit, local_search_seconds=0)
+    compiled = compile_request(request)
+    result = greedy.solve(compiled, EligibilityIndex(compiled.employees))
+    chosen = rng.sample(result.assignments, int(len(result.assignments) * ratio))
+    return [
+        LockedAssignment(
+            employee_id=seg.employee_id,
+            shift_id=seg.shift_id,
+            day=seg.day,
+            start_minute=seg.start_minute,
+            end_minute=seg.end_minute,
+            slot=seg.slot,
+        )
+        for seg in chosen
+    ]
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+from ..app.domain.models import SolveRequest, SolveResponse
+from ..app.solver.compiled import compile_request
+from ..app.solver.cpsat import CPSATSolver
+from ..app.solver.eligibility import EligibilityIndex
+from .generator import DEFAULT_SCENARIOS, SCENARIOS, generate
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# A result regresses when coverage drops by more than this
+COVERAGE_TOLERANCE = 0.005
+# ...or when it is this many times slower than the baseline and at least MIN_TIME_DELTA_MS slower
+TIME_TOLERANCE = 1.5
+MIN_TIME_DELTA_MS = 50
+
+
+@dataclass
+class BenchmarkResult:
+    scenario: str
+    path: str  # "cpsat" (full solve) or "greedy" (fallback heuristic only)
+    seed: int
+    status: str
+    coverage_ratio: float
+    objective_value: Optional[int]
+    total_ms: int
+    build_ms: int  # Model build time (CP-SAT path) from the response's phase timings
+    solve_ms: int  # Presolve and search, or the greedy run
+
+    @property
+    def key(self) -> str:
+        return f"{self.scenario}/{self.path}/{self.seed}"
+
+
+def run_cpsat(solver: CPSATSolver, request: SolveRequest) -> SolveResponse:
+    return solver.solve(request)
+
+
+def run_greedy(solver: CPSATSolver, request: SolveRequest) -> SolveResponse:
+    compiled = compile_request(request)
+    return solver._solve_greedy(compiled, EligibilityIndex(compiled.employees))
+
+
+PATHS = {"cpsat": run_cpsat, "greedy": run_greedy}
+
+
+def run_case(solver: CPSATSolver, scenario: str, path: str, seed: int, repeat: int) -> BenchmarkResult:
+    request = generate(SCENARIOS[scenario], seed)
+    best: Optional[BenchmarkResult] = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = PATHS[path](solver, request)
+        total_ms = int((time.perf_counter() - started) * 1000)
+        timings = response.metrics.timings
+        result = BenchmarkResult(
+            scenario=scenario,
+            path=path,
+            seed=seed,
+            status=response.metrics.status,
+            coverage_ratio=round(response.metrics.coverage_ratio, 4),
+            objective_value=response.metrics.objective_value,
+            total_ms=total_ms,
+            build_ms=int(timings.model_build_ms) if timings else 0,
+            solve_ms=int(timings.solve_ms) if timings else 0,
+        )
+        # Keep the fastest run; the schedule itself is the same for a fixed seed
+        if best is None or result.total_ms < best.total_ms:
+            best = result
+    assert best is not None
+    return best
+
+
+def compare(results: List[BenchmarkResult], baseline: Dict[str, dict]) -> List[str]:
+    """Regressions of ``results`` against a stored baseline, as readable messages."""
+    regressions = []
+    for result in results:
+        base = baseline.get(result.key)
+        if base is None:
+            continue
+        if result.coverage_ratio < base["coverage_ratio"] - COVERAGE_TOLERANCE:
+            regressions.append(
+                f"{result.key}: coverage {result.coverage_ratio:.3f} < baseline {base['coverage_ratio']:.3f}"
+            )
+        if (
+            result.status == base["status"]
+            and result.objective_value is not None
+            and base["objective_value"] is not None
+            and result.objective_value > base["objective_value"]
+        ):
+            regressions.append(
+                f"{result.key}: objective {result.objective_value} > baseline {base['objective_value']}"
+            )
+        if (
+            result.total_ms > base["total_ms"] * TIME_TOLERANCE
+            and result.total_ms - base["total_ms"] >= MIN_TIME_DELTA_MS
+        ):
+            regressions.append(f"{result.key}: {result.total_ms} ms > baseline {base['total_ms']} ms")
+    return regressions
+
+
+def _print_table(results: List[BenchmarkResult], baseline: Dict[str, dict]) -> None:
+    header = f"{'case':<28} {'status':<16} {'coverage':>8} {'objective':>10} {'build ms':>9} {'solve ms':>9} {'total ms':>9} {'base ms':>8}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        base = baseline.get(result.key, {})
+        objective = "-" if result.objective_value is None else str(result.objective_value)
+        print(
+            f"{result.key:<28} {result.status:<16} {result.coverage_ratio:>8.3f} {objective:>10} "
+            f"{result.build_ms:>9} {result.solve_ms:>9} {result.total_ms:>9} {base.get('total_ms', '-'):>8}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the scheduler solver against a stored baseline")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Repeatable; defaults to the standard set")
+    parser.add_argument("--path", action="append", choices=sorted(PATHS), help="Repeatable; defaults to both")
+    parser.add_argument("--seeds", type=int, default=2, help="Instances per scenario")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per instance, the fastest is kept")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline with these results")
+    parser.add_argument("--output", help="Also write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.WARNING)
+    solver = CPSATSolver()
+    results = [
+        run_case(solver, scenario, path, seed, args.repeat)
+        for scenario in args.scenario or DEFAULT_SCENARIOS
+        for seed in range(args.seeds)
+        for path in args.path or list(PATHS)
+    ]
+
+    baseline: Dict[str, dict] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)["results"]
+
+    _print_table(results, baseline)
+    report = {
+        "machine": {"platform": platform.platform(), "python": platform.python_version(), "cpus": os.cpu_count()},
+        "results": {result.key: asdict(result) for result in results},
+    }
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2)
+
+    if args.update_baseline:
+        merged = {**baseline, **report["results"]}
+        with open(args.baseline, "w") as handle:
+            json.dump({"machine": report["machine"], "results": merged}, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+        print(f"\nBaseline updated: {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline)
+    if regressions:
+        print("\nRegressions:")
+        for message in regressions:
+            print(f"  {message}")
+        return 1
+    print("\nNo regressions" if baseline else "\nNo baseline to compare against")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
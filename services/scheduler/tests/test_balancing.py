@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any, Dict, List
+
+from services.scheduler.app.domain.models import SolveRequest
+from services.scheduler.app.solver.cpsat import CPSATSolver
+
+DAYS = ["MON", "TUE", "WED", "THU", "FRI", "SAT"]
+
+
+def _employee(employee_id: str, target: int, store_id: str = "store-01") -> Dict[str, Any]:
+    return {
+        "id": employee_id,
+        "name": employee_id,
+        "home_store_id": store_id,
+        "can_work_across_stores": True,
+        "contract_type": "FULL_TIME",
+        "weekly_minutes_target": target,
+        "role_ids": [],
+        "role_names": ["cashier"],
+        "availability": [{"day": day, "start_minute": 0, "end_minute": 1440} for day in DAYS],
+    }
+
+
+def _week(employees: List[Dict[str, Any]], days: List[str], profile: str = "balanced") -> SolveRequest:
+    return SolveRequest.parse_obj({
+        "store_id": "store-01",
+        "iso_week": "2024-W21",
+        "employees": employees,
+        "shifts": [
+            {"id": day, "role": "cashier", "day": day, "start_minute": 540, "end_minute": 780, "store_id": "store-01"}
+            for day in days
+        ],
+        "options": {"profile": profile, "use_cache": False},
+    })
+
+
+def test_shifts_are_shared_out_by_weekly_target() -> None:
+    week = _week([_employee("ana", 960), _employee("bo", 480)], DAYS)
+
+    response = CPSATSolver().solve(week)
+
+    assert Counter(seg.employee_id for seg in response.assignments) == {"ana": 4, "bo": 2}
+    assert response.metrics.target_deviation_minutes == 0
+
+
+def test_home_store_employee_is_preferred() -> None:
+    week = _week([_employee("visitor", 240, store_id="store-02"), _employee("local", 240)], ["MON"])
+
+    response = CPSATSolver().solve(week)
+
+    assert [seg.employee_id for seg in response.assignments] == ["local"]
+
+
+def test_skipped_balancing_keeps_the_first_stage_schedule() -> None:
+    employees = [_employee("ana", 240), _employee("bo", 480), _employee("cy", 720)]
+
+    balanced = CPSATSolver().solve(_week(employees, DAYS))
+    first_stage = CPSATSolver().solve(_week(employees, DAYS, profile="fast"))  # The fast profile skips balancing
+
+    assert balanced.metrics.coverage_ratio == first_stage.metrics.coverage_ratio == 1.0
+    assert Counter(seg.employee_id for seg in balanced.assignments) == {"ana": 1, "bo": 2, "cy": 3}
+    assert first_stage.metrics.target_deviation_minutes > balanced.metrics.target_deviation_minutes == 0
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import json
+import logging
+from collections import defaultdict
+from dataclasses import asdict
+from typing import Dict
+
+import pytest
+
+from services.scheduler.app.solver.labor import DAY_POSITION, WorkLog
+from services.scheduler.benchmarks.generator import SCENARIOS, generate
+from services.scheduler.benchmarks.runner import BenchmarkResult, compare, main
+
+
+def _result(**changes) -> BenchmarkResult:
+    fields = dict(
+        scenario="large", path="cpsat", seed=0, status="FEASIBLE", coverage_ratio=1.0,
+        objective_value=100, total_ms=1000, build_ms=100, solve_ms=800,
+    )
+    fields.update(changes)
+    return BenchmarkResult(**fields)
+
+
+@pytest.mark.parametrize("scenario", sorted(SCENARIOS))
+def test_generated_week_is_reproducible_and_has_the_scenario_shape(scenario: str) -> None:
+    shape = SCENARIOS[scenario]
+    week = generate(shape, 0)
+
+    assert week == generate(shape, 0)
+    assert week != generate(shape, 1)
+    assert (len(week.employees), len(week.shifts)) == (shape.employees, shape.shifts)
+    assert len({shift.store_id for shift in week.shifts}) == shape.stores
+    assert all(1 <= shift.capacity <= shape.max_capacity for shift in week.shifts)
+    assert week.options.solver_time_limit_seconds == shape.time_limit_seconds
+
+
+def test_generated_locks_never_conflict() -> None:
+    week = generate(SCENARIOS["locked"], 0)
+    shifts = {shift.id: shift for shift in week.shifts}
+    logs: Dict[str, WorkLog] = defaultdict(WorkLog)
+
+    assert week.locked_assignments
+    for lock in sorted(week.locked_assignments, key=lambda lock: (DAY_POSITION[lock.day], lock.start_minute)):
+        assert lock.slot < shifts[lock.shift_id].capacity
+        assert logs[lock.employee_id].allows(lock.day, lock.start_minute, lock.end_minute), lock
+        logs[lock.employee_id].add(lock.day, lock.start_minute, lock.end_minute)
+
+
+def test_compare_flags_coverage_objective_and_time_regressions() -> None:
+    baseline = {"large/cpsat/0": asdict(_result())}
+
+    assert compare([_result(coverage_ratio=0.997, total_ms=1400, objective_value=90)], baseline) == []
+    assert compare([_result(seed=1, coverage_ratio=0.5)], baseline) == []  # Not in the baseline
+    assert len(compare([_result(coverage_ratio=0.99)], baseline)) == 1
+    assert len(compare([_result(objective_value=101)], baseline)) == 1
+    assert compare([_result(status="OPTIMAL", objective_value=101)], baseline) == []
+    assert len(compare([_result(total_ms=1600)], baseline)) == 1
+
+
+def test_small_times_never_regress_below_the_minimum_delta() -> None:
+    baseline = {"large/cpsat/0": asdict(_result(total_ms=10))}
+
+    assert compare([_result(total_ms=59)], baseline) == []
+    assert len(compare([_result(total_ms=60)], baseline)) == 1
+
+
+def test_baseline_update_then_compare(tmp_path) -> None:
+    path = tmp_path / "baseline.json"
+    args = ["--scenario", "small", "--path", "greedy", "--seeds", "1", "--repeat", "1", "--baseline", str(path)]
+    try:
+        assert main(args + ["--update-baseline"]) == 0
+        assert main(args) == 0
+    finally:
+        logging.disable(logging.NOTSET)
+
+    assert set(json.loads(path.read_text())["results"]) == {"small/greedy/0"}
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from typing import List
+
+import pytest
+
+from services.scheduler.app.cache import SolveResultCache, request_fingerprint
+from services.scheduler.app.config import Settings
+from services.scheduler.app.domain.models import SolveResponse
+from services.scheduler.app.solver.cpsat import CPSATSolver
+from services.scheduler.benchmarks.generator import SCENARIOS, generate
+from services.scheduler.benchmarks.runner import run_greedy
+
+
+@pytest.fixture(scope="module")
+def responses() -> List[SolveResponse]:
+    solver = CPSATSolver()
+    return [run_greedy(solver, generate(SCENARIOS["small"], seed)) for seed in range(3)]
+
+
+def test_fingerprint_ignores_order_and_transport_options() -> None:
+    week = generate(SCENARIOS["small"], 0)
+    shuffled = week.copy(deep=True)
+    shuffled.employees.reverse()
+    shuffled.shifts.reverse()
+    shuffled.employees[0].availability.reverse()
+    shuffled.options.use_cache = not week.options.use_cache
+    shuffled.options.deadline_seconds = 5
+
+    assert request_fingerprint(shuffled) == request_fingerprint(week)
+
+    shuffled.shifts[0].end_minute -= 15
+    assert request_fingerprint(shuffled) != request_fingerprint(week)
+
+
+def test_key_is_none_when_the_request_opts_out() -> None:
+    cache = SolveResultCache(Settings())
+    week = generate(SCENARIOS["small"], 0)
+
+    week.options.use_cache = False
+    assert cache.key_for(week) is None
+    week.options.use_cache = True
+    assert cache.key_for(week) == request_fingerprint(week)
+    assert SolveResultCache(Settings(cache_max_entries=0)).key_for(week) is None
+
+
+def test_least_recently_used_entry_is_evicted(responses: List[SolveResponse]) -> None:
+    cache = SolveResultCache(Settings(cache_max_entries=2))
+    cache.put("a", responses[0])
+    cache.put("b", responses[1])
+    assert cache.get("a") == responses[0]
+
+    cache.put("c", responses[2])
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (responses[0], responses[2])
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.entries) == (3, 1, 1, 2)
+
+
+def test_byte_bound_evicts_and_skips_oversized_entries(responses: List[SolveResponse]) -> None:
+    size = len(responses[0].json().encode("utf-8"))
+    cache = SolveResultCache(Settings(cache_max_bytes=size))
+    cache.put("a", responses[0])
+    cache.put("b", responses[0])
+
+    assert cache.get("a") is None
+    assert cache.stats().bytes == size
+
+    cache.put("huge", responses[0].copy(update={"assignments": responses[0].assignments * 2}))
+    assert cache.get("huge") is None
+    assert cache.get("b") == responses[0]
+
+
+def test_disk_tier_survives_a_restart(tmp_path, responses: List[SolveResponse]) -> None:
+    config = Settings(cache_sqlite_path=str(tmp_path / "cache.sqlite"), cache_sqlite_max_entries=2)
+    first = SolveResultCache(config)
+    for key, response in zip("abc", responses):
+        first.put(key, response)
+
+    restarted = SolveResultCache(config)
+
+    assert restarted.get("a") is None  # Evicted from the disk tier as the oldest row
+    assert restarted.get("c") == responses[2]
+    assert restarted.get_memory("c") == responses[2]
+    stats = restarted.stats()
+    assert (stats.disk_hits, stats.disk_entries, stats.entries) == (1, 2, 1)
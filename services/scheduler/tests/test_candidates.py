@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from services.scheduler.app.domain.models import LockedAssignment, Weekday
+from services.scheduler.app.solver.candidates import CandidateMatrix
+from services.scheduler.app.solver.compiled import compile_employees, compile_request
+from services.scheduler.app.solver.cpsat import CPSATSolver
+from services.scheduler.app.solver.eligibility import EligibilityIndex
+from services.scheduler.app.solver.labor import DAY_POSITION, MINUTES_PER_DAY
+from services.scheduler.benchmarks.generator import SCENARIOS, generate
+
+
+def _matrix() -> Tuple[CandidateMatrix, List[Tuple[str, int]], cp_model.CpModel]:
+    """Matrix of the locked week with a variable per eligible employee and free slot, in shift order."""
+    request = compile_request(generate(SCENARIOS["locked"], 0))
+    index = EligibilityIndex(request.employees)
+    _, slots = CPSATSolver()._build_shift_slots(request.shifts, request.locked_assignments)
+    outside = LockedAssignment(
+        employee_id="emp-0001", shift_id="elsewhere", day=Weekday.SUN, start_minute=60, end_minute=180
+    )
+    matrix = CandidateMatrix(request.employees, slots, [*request.locked_assignments, outside])
+    model = cp_model.CpModel()
+    entries = []
+    for pos, slot in enumerate(slots):
+        if slot.locked_employee_id:
+            continue
+        for emp in index.feasible_employees(slot.shift):
+            matrix.add(emp.id, slot.shift.id, slot.slot_number, model.NewBoolVar(f"{emp.id}:{pos}"))
+            entries.append((emp.id, pos))
+    matrix.freeze()
+    return matrix, entries, model
+
+
+def test_employee_terms_are_the_employees_entries_in_creation_order() -> None:
+    matrix, entries, _ = _matrix()
+    expected: Dict[str, List[int]] = defaultdict(list)
+    for employee_id, pos in entries:
+        expected[employee_id].append(pos)
+
+    for emp in matrix.employees:
+        variables, durations, starts, slots = matrix.employee_terms(emp.id)
+        assert slots == expected[emp.id]
+        assert [var.Name() for var in variables] == [f"{emp.id}:{pos}" for pos in slots]
+        assert durations == [matrix.slots[pos].duration for pos in slots]
+        assert starts == [matrix.slots[pos].day_start_minute for pos in slots]
+
+
+def test_locked_work_includes_locks_outside_the_request() -> None:
+    matrix, _, _ = _matrix()
+
+    for emp in matrix.employees:
+        held = [pos for pos, slot in enumerate(matrix.slots) if slot.locked_employee_id == emp.id]
+        assert matrix.locked_slots(emp.id) == held
+        intervals = sorted((matrix.slots[pos].day_start_minute, matrix.slots[pos].duration) for pos in held)
+        if emp.id == "emp-0001":
+            intervals = sorted(intervals + [(6 * MINUTES_PER_DAY + 60, 120)])
+        assert matrix.locked_intervals(emp.id) == intervals
+
+
+def test_chosen_entries_and_their_minutes() -> None:
+    matrix, entries, model = _matrix()
+    values = np.zeros(len(model.Proto().variables), dtype=np.int64)
+    picked = [0, 3, len(entries) - 1]
+    values[[matrix.variables[entry].Index() for entry in picked]] = 1
+
+    assert matrix.chosen(values).tolist() == picked
+    assert matrix.assigned_minutes(values) == sum(matrix.slots[entries[entry][1]].duration for entry in picked)
+
+
+def test_solved_week_keeps_weekly_limits_and_never_overlaps_locked_work() -> None:
+    solver = CPSATSolver()
+    week = generate(SCENARIOS["locked"], 1)
+
+    response = solver.solve(week)
+
+    assert response.metrics.algorithm == "cpsat" and response.metrics.status == "OPTIMAL"
+    work: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+    for seg in response.assignments:
+        start = DAY_POSITION[seg.day] * MINUTES_PER_DAY + seg.start_minute
+        work[seg.employee_id].append((start, start + seg.end_minute - seg.start_minute))
+    for emp in compile_employees(week.employees):
+        intervals = sorted(work[emp.id])
+        assert sum(end - start for start, end in intervals) <= solver._get_weekly_limit(emp)
+        assert all(prev_end <= start for (_, prev_end), (start, _) in zip(intervals, intervals[1:])), emp.id
+    assert {(lock.shift_id, lock.employee_id) for lock in week.locked_assignments} <= {
+        (seg.shift_id, seg.employee_id) for seg in response.assignments
+    }
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from services.scheduler.app.domain.models import SolveRequest
+from services.scheduler.app.solver.cpsat import CPSATSolver
+from services.scheduler.benchmarks.generator import SCENARIOS, generate
+from services.scheduler.benchmarks.runner import run_greedy
+
+
+def _employee(employee_id: str) -> Dict[str, Any]:
+    return {
+        "id": employee_id,
+        "name": employee_id,
+        "home_store_id": "store-01",
+        "can_work_across_stores": False,
+        "contract_type": "FULL_TIME",
+        "weekly_minutes_target": 2400,
+        "role_ids": [],
+        "role_names": ["cashier"],
+        "availability": [{"day": "SAT", "start_minute": 0, "end_minute": 1440}],
+    }
+
+
+def _saturday(capacity: int, staff: int, locks: Optional[List[Dict[str, Any]]] = None) -> SolveRequest:
+    """One Saturday shift of the given capacity, with ``staff`` cashiers who can all take it."""
+    return SolveRequest.parse_obj({
+        "store_id": "store-01",
+        "iso_week": "2024-W21",
+        "employees": [_employee(f"emp-{n}") for n in range(staff)],
+        "shifts": [{
+            "id": "sat", "role": "cashier", "day": "SAT", "start_minute": 540, "end_minute": 1020,
+            "capacity": capacity, "store_id": "store-01",
+        }],
+        "locked_assignments": locks or [],
+        "options": {"allow_uncovered": True, "soft_coverage": True, "use_cache": False},
+    })
+
+
+def _built_models(monkeypatch) -> list:
+    builds = []
+    build_model = CPSATSolver._build_model
+
+    def recording(self, *args, **kwargs):
+        builds.append(build_model(self, *args, **kwargs))
+        return builds[-1]
+
+    monkeypatch.setattr(CPSATSolver, "_build_model", recording)
+    return builds
+
+
+@pytest.mark.parametrize("capacity", [1, 3, 8])
+def test_each_candidate_gets_one_variable_per_shift(monkeypatch, capacity: int) -> None:
+    builds = _built_models(monkeypatch)
+
+    response = CPSATSolver().solve(_saturday(capacity, staff=8))
+
+    assert response.metrics.algorithm == "cpsat"
+    for build in builds:
+        assert {shift_id for _, shift_id in build.assign_vars} == {"sat"}
+        assert len(build.assign_vars) == len(build.candidates_by_shift["sat"])
+
+
+@pytest.mark.parametrize("capacity, staff", [(3, 8), (6, 6), (10, 8)])
+def test_a_shift_takes_distinct_employees_on_numbered_slots(capacity: int, staff: int) -> None:
+    response = CPSATSolver().solve(_saturday(capacity, staff))
+
+    employees = [seg.employee_id for seg in response.assignments]
+    assert len(employees) == len(set(employees)) == min(capacity, staff)
+    assert sorted(seg.slot for seg in response.assignments) == list(range(min(capacity, staff)))
+    assert response.metrics.coverage_ratio == pytest.approx(min(capacity, staff) / capacity)
+
+
+def test_locked_slots_keep_their_numbers() -> None:
+    locks = [
+        {"employee_id": "emp-0", "shift_id": "sat", "day": "SAT", "start_minute": 540, "end_minute": 1020, "slot": 2},
+        {"employee_id": "emp-1", "shift_id": "sat", "day": "SAT", "start_minute": 540, "end_minute": 1020, "slot": 0},
+    ]
+
+    response = CPSATSolver().solve(_saturday(4, staff=6, locks=locks))
+
+    slots = {seg.slot: seg.employee_id for seg in response.assignments}
+    assert sorted(slots) == [0, 1, 2, 3]
+    assert (slots[0], slots[2]) == ("emp-1", "emp-0")
+    assert {slots[1], slots[3]}.isdisjoint({"emp-0", "emp-1"})
+    assert [seg.locked for seg in sorted(response.assignments, key=lambda seg: seg.slot)] == [True, False, True, False]
+
+
+def test_shift_variables_cover_at_least_what_greedy_covers() -> None:
+    week = generate(SCENARIOS["single-store"], 0)
+    solver = CPSATSolver()
+    assert max(shift.capacity for shift in week.shifts) > 1
+
+    cpsat = solver.solve(week)
+
+    assert cpsat.metrics.algorithm == "cpsat"
+    assert cpsat.metrics.coverage_ratio >= run_greedy(solver, week).metrics.coverage_ratio
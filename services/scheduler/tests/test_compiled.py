@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import pytest
+
+from services.scheduler.app.domain.models import ScenarioRequest, SolveRequest
+from services.scheduler.app.scenarios import scenario_variants
+from services.scheduler.app.solver.compiled import compile_request
+from services.scheduler.app.solver.cpsat import CPSATSolver
+from services.scheduler.app.solver.labor import DAY_POSITION, MINUTES_PER_DAY
+from services.scheduler.benchmarks.generator import SCENARIOS, generate
+
+
+def _mixed_case_week() -> SolveRequest:
+    return SolveRequest.parse_obj({
+        "store_id": "store-01",
+        "iso_week": "2024-W21",
+        "employees": [{
+            "id": "ana",
+            "name": "Ana",
+            "home_store_id": "store-01",
+            "can_work_across_stores": False,
+            "contract_type": "FULL_TIME",
+            "weekly_minutes_target": 2400,
+            "role_ids": ["role-1"],
+            "role_names": ["CASHIER"],
+            "availability": [
+                {"day": "MON", "is_off": True, "start_minute": 0, "end_minute": 0},
+                {"day": "SUN", "start_minute": 480, "end_minute": 1200},
+            ],
+        }],
+        "shifts": [{
+            "id": "sun", "role": "Cashier", "day": "SUN", "start_minute": 540, "end_minute": 780,
+            "store_id": "store-01",
+        }],
+        "options": {"use_cache": False},
+    })
+
+
+def test_records_lower_roles_and_drop_days_off() -> None:
+    compiled = compile_request(_mixed_case_week())
+
+    (ana,), (sun,) = compiled.employees, compiled.shifts
+    assert (ana.position, ana.role_names, ana.role_ids) == (0, frozenset({"cashier"}), frozenset({"role-1"}))
+    assert ana.windows == ((6, 480, 1200),)
+    assert (sun.role, sun.role_key, sun.day_position, sun.duration) == ("Cashier", "cashier", 6, 240)
+    assert (sun.week_start, sun.week_end) == (6 * MINUTES_PER_DAY + 540, 6 * MINUTES_PER_DAY + 780)
+
+
+def test_mixed_case_roles_are_staffed() -> None:
+    response = CPSATSolver().solve(_mixed_case_week())
+
+    assert [(seg.employee_id, seg.shift_id) for seg in response.assignments] == [("ana", "sun")]
+
+
+@pytest.mark.parametrize("name", ["multi-store", "region"])
+def test_records_match_the_request(name: str) -> None:
+    request = generate(SCENARIOS[name], 0)
+
+    compiled = compile_request(request)
+
+    for position, (emp, record) in enumerate(zip(request.employees, compiled.employees)):
+        assert (record.position, record.id, record.home_store_id) == (position, emp.id, emp.home_store_id)
+        assert record.weekly_minutes_target == emp.weekly_minutes_target
+        assert record.role_names == {role.lower() for role in emp.role_names}
+        assert list(record.windows) == [
+            (DAY_POSITION[slot.day], slot.start_minute, slot.end_minute) for slot in emp.availability if not slot.is_off
+        ]
+    for shift, record in zip(request.shifts, compiled.shifts):
+        assert (record.id, record.day, record.capacity, record.store_id) == (
+            shift.id, shift.day, shift.capacity, shift.store_id
+        )
+        assert record.week_end - record.week_start == shift.end_minute - shift.start_minute
+        assert record.week_start == DAY_POSITION[shift.day] * MINUTES_PER_DAY + shift.start_minute
+    assert len(compiled.employees) == len(request.employees) and len(compiled.shifts) == len(request.shifts)
+
+
+def test_replace_shares_records() -> None:
+    compiled = compile_request(generate(SCENARIOS["small"], 0))
+
+    part = compiled.replace(shifts=compiled.shifts[:2])
+
+    assert part.employees is compiled.employees and part.options is compiled.options
+    assert part.shifts == compiled.shifts[:2] and len(compiled.shifts) > 2
+
+
+def test_requests_with_one_eligibility_key_share_employee_records() -> None:
+    base = generate(SCENARIOS["small"], 0)
+    closed = {"name": "closed", "changes": {"removed_shifts": [base.shifts[0].id]}}
+    request = ScenarioRequest(base=base, scenarios=[closed])
+    solver = CPSATSolver()
+
+    (_, first), (_, second) = scenario_variants(request)
+
+    assert solver._eligibility_index(first).employees is solver._eligibility_index(second).employees
+    assert solver._eligibility_index(base).employees is not solver._eligibility_index(first).employees
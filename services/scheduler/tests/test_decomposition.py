@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+from services.scheduler.app.domain.models import SolveResponse
+from services.scheduler.app.solver.cpsat import CPSATSolver
+from services.scheduler.app.solver.decomposition import DecomposedSolution, ProblemDecomposer
+from services.scheduler.app.solver.labor import DAY_POSITION, WorkLog
+from services.scheduler.benchmarks.generator import SCENARIOS, generate
+from services.scheduler.benchmarks.runner import run_greedy
+
+
+def test_decomposed_week_covers_at_least_greedy_with_cpsat_parts(monkeypatch) -> None:
+    request = generate(SCENARIOS["large"], 0)
+    solutions: List[DecomposedSolution] = []
+    solve = ProblemDecomposer.solve
+
+    def recording_solve(self, *args, **kwargs) -> DecomposedSolution:
+        solution = solve(self, *args, **kwargs)
+        solutions.append(solution)
+        return solution
+
+    monkeypatch.setattr(ProblemDecomposer, "solve", recording_solve)
+    solver = CPSATSolver()
+
+    response = solver.solve(request)
+
+    assert len(solutions) == 1 and solutions[0].parts > 1
+    assert response.metrics.coverage_ratio >= run_greedy(solver, request).metrics.coverage_ratio
+    assert any(metrics.status in ("OPTIMAL", "FEASIBLE") for metrics in solutions[0].part_metrics)
+
+
+class _Progress:
+    def __init__(self, stop_after: Optional[int] = None) -> None:
+        self.responses: List[SolveResponse] = []
+        self.stop_after = stop_after
+        self.stop: Optional[Callable[[], None]] = None
+
+    def bind_stop(self, stop: Callable[[], None]) -> None:
+        self.stop = stop
+
+    def on_solution(self, response: SolveResponse) -> None:
+        self.responses.append(response)
+        if self.stop is not None and len(self.responses) == self.stop_after:
+            self.stop()
+
+
+def _follows_labor_rules(response: SolveResponse) -> bool:
+    logs: Dict[str, WorkLog] = defaultdict(WorkLog)
+    for seg in sorted(response.assignments, key=lambda seg: (DAY_POSITION[seg.day], seg.start_minute)):
+        if not logs[seg.employee_id].allows(seg.day, seg.start_minute, seg.end_minute):
+            return False
+        logs[seg.employee_id].add(seg.day, seg.start_minute, seg.end_minute)
+    return True
+
+
+def test_decomposed_week_reports_stitched_progress() -> None:
+    progress = _Progress()
+
+    response = CPSATSolver().solve(generate(SCENARIOS["large"], 0), observer=progress)
+
+    assert progress.responses
+    coverage = [report.metrics.coverage_ratio for report in progress.responses]
+    assert coverage == sorted(coverage)
+    assert all(report.metrics.status == "FEASIBLE" for report in progress.responses)
+    assert all(_follows_labor_rules(report) for report in progress.responses)
+    assert response.metrics.coverage_ratio >= coverage[-1]
+
+
+def test_stop_from_a_progress_report_ends_every_part() -> None:
+    request = generate(SCENARIOS["large"], 0)
+    progress = _Progress(stop_after=1)
+
+    response = CPSATSolver().solve(request, observer=progress)
+
+    assert len(progress.responses) == 1
+    assert response.metrics.coverage_ratio >= progress.responses[0].metrics.coverage_ratio
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from typing import List
+
+import pytest
+
+from services.scheduler.app.domain.models import Employee, Shift, SolveRequest
+from services.scheduler.app.solver.compiled import compile_request
+from services.scheduler.app.solver.eligibility import EligibilityIndex
+from services.scheduler.benchmarks.generator import SCENARIOS, generate
+
+
+def _scan(shift: Shift, employees: List[Employee]) -> List[str]:
+    """The per-shift scan over every employee that the index replaces."""
+    feasible = []
+    for emp in employees:
+        same_store = emp.home_store_id == shift.store_id
+        if not same_store and not emp.can_work_across_stores:
+            continue
+        if shift.work_type_id and same_store:
+            if shift.work_type_id not in emp.role_ids:
+                continue
+        elif emp.role_names and shift.role.lower() not in [role.lower() for role in emp.role_names]:
+            continue
+        if any(
+            slot.day == shift.day and not slot.is_off
+            and slot.start_minute <= shift.start_minute and slot.end_minute >= shift.end_minute
+            for slot in emp.availability
+        ):
+            feasible.append(emp.id)
+    return feasible
+
+
+def _week(scenario: str) -> SolveRequest:
+    return generate(SCENARIOS[scenario], 0)
+
+
+@pytest.mark.parametrize("scenario", ["single-store", "multi-store", "region"])
+def test_index_matches_a_scan_over_every_employee(scenario: str) -> None:
+    week = _week(scenario)
+    compiled = compile_request(week)
+    index = EligibilityIndex(compiled.employees)
+
+    for shift, record in zip(week.shifts, compiled.shifts):
+        assert [emp.id for emp in index.feasible_employees(record)] == _scan(shift, week.employees), shift.id
+
+
+def test_members_limit_the_offered_employees() -> None:
+    week = _week("multi-store")
+    compiled = compile_request(week)
+    members = {emp.position for emp in compiled.employees[::2]}
+    index = EligibilityIndex(compiled.employees, members)
+
+    for shift, record in zip(week.shifts, compiled.shifts):
+        assert [emp.id for emp in index.feasible_employees(record)] == _scan(shift, week.employees[::2]), shift.id
+
+
+def test_partial_windows_leave_out_employees_who_fit_the_whole_shift() -> None:
+    compiled = compile_request(_week("multi-store"))
+    index = EligibilityIndex(compiled.employees)
+
+    for shift in compiled.shifts:
+        full = {emp.id for emp in index.feasible_employees(shift)}
+        for emp, start, end in index.partial_windows(shift):
+            assert emp.id not in full
+            assert shift.start_minute <= start < end <= shift.end_minute
+            assert end - start < shift.duration
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from services.scheduler.app.domain.models import SolveRequest
+from services.scheduler.app.solver.cpsat import CPSATSolver
+
+
+def _shift(shift_id: str, start: int, end: int) -> Dict[str, Any]:
+    return {
+        "id": shift_id,
+        "role": "cashier",
+        "day": "MON",
+        "start_minute": start,
+        "end_minute": end,
+        "store_id": "store-01",
+    }
+
+
+def _week(
+    shifts: List[Dict[str, Any]],
+    locks: Optional[List[Dict[str, Any]]] = None,
+    carry: Optional[Dict[str, Any]] = None,
+) -> SolveRequest:
+    """One employee available all Monday, with every shift required."""
+    return SolveRequest.parse_obj({
+        "store_id": "store-01",
+        "iso_week": "2024-W21",
+        "employees": [{
+            "id": "emp-01",
+            "name": "Ana",
+            "home_store_id": "store-01",
+            "can_work_across_stores": False,
+            "contract_type": "FULL_TIME",
+            "weekly_minutes_target": 2400,
+            "role_ids": [],
+            "role_names": ["cashier"],
+            "availability": [{"day": "MON", "start_minute": 0, "end_minute": 1440}],
+        }],
+        "shifts": shifts,
+        "locked_assignments": locks or [],
+        "options": {"allow_uncovered": False, "explain_infeasibility": True},
+        "carry_over": [{"employee_id": "emp-01", **carry}] if carry else [],
+    })
+
+
+def _monday_shift(carry: Dict[str, Any]) -> SolveRequest:
+    """One shift early on Monday, which only the carry-over rules out."""
+    return _week([_shift("mon", 10, 240)], carry=carry)
+
+
+@pytest.mark.parametrize(
+    "carry, kinds",
+    [
+        ({"last_shift_end_minute": 1440}, ["carry_over", "coverage"]),
+        ({"consecutive_days": 6}, ["carry_over", "consecutive_days", "coverage"]),
+    ],
+)
+def test_carry_over_conflicts_are_explained(carry: Dict[str, Any], kinds: list) -> None:
+    response = CPSATSolver().solve(_monday_shift(carry))
+
+    assert response.infeasibility is not None
+    assert [conflict.kind for conflict in response.infeasibility.conflicts] == kinds
+
+
+def test_carry_over_that_fits_is_not_a_conflict() -> None:
+    response = CPSATSolver().solve(_monday_shift({"consecutive_days": 5, "last_shift_end_minute": 600}))
+
+    assert response.infeasibility is None
+    assert response.metrics.coverage_ratio == 1.0
+
+
+def test_shift_overlapping_a_lock_is_explained() -> None:
+    lock = {"employee_id": "emp-01", "shift_id": "locked", "day": "MON", "start_minute": 600, "end_minute": 840}
+
+    response = CPSATSolver().solve(_week([_shift("locked", 600, 840), _shift("open", 700, 800)], locks=[lock]))
+
+    assert response.infeasibility is not None
+    assert [conflict.kind for conflict in response.infeasibility.conflicts] == ["coverage", "no_overlap"]
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, List, Set
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from services.scheduler.app.domain.models import AssignmentSegment, SolveRequest, Weekday
+from services.scheduler.app.solver.candidates import CandidateMatrix
+from services.scheduler.app.solver.compiled import compile_request
+from services.scheduler.app.solver.cpsat import CPSATSolver
+from services.scheduler.app.solver.extraction import extract_assignments, merge_contiguous
+from services.scheduler.benchmarks.generator import SCENARIOS, generate
+
+
+def _employee(employee_id: str) -> dict:
+    return {
+        "id": employee_id,
+        "name": employee_id,
+        "home_store_id": "store-01",
+        "can_work_across_stores": False,
+        "contract_type": "FULL_TIME",
+        "weekly_minutes_target": 2400,
+        "role_ids": [],
+        "role_names": [],
+        "availability": [{"day": "MON", "start_minute": 0, "end_minute": 1440}],
+    }
+
+
+def test_chosen_employees_take_the_free_slots_around_a_lock() -> None:
+    request = compile_request(SolveRequest.parse_obj({
+        "store_id": "store-01",
+        "iso_week": "2024-W21",
+        "employees": [_employee("ana"), _employee("bo"), _employee("cy"), _employee("dee")],
+        "shifts": [{
+            "id": "till", "role": "cashier", "day": "MON", "start_minute": 540, "end_minute": 780,
+            "capacity": 3, "store_id": "store-01",
+        }],
+        "locked_assignments": [
+            {"employee_id": "bo", "shift_id": "till", "day": "MON", "start_minute": 540, "end_minute": 780, "slot": 1},
+        ],
+    }))
+    _, slots = CPSATSolver()._build_shift_slots(request.shifts, request.locked_assignments)
+    matrix = CandidateMatrix(request.employees, slots, request.locked_assignments)
+    model = cp_model.CpModel()
+    # Whole-shift variables sit at the first free slot, added out of request order
+    for employee_id in ("dee", "cy", "ana"):
+        matrix.add(employee_id, "till", 0, model.NewBoolVar(employee_id))
+    matrix.freeze()
+    values = np.array([1, 0, 1], dtype=np.int64)  # dee and ana
+
+    assignments = extract_assignments(matrix, values, request.locked_assignments)
+
+    assert [(seg.employee_id, seg.slot, seg.locked) for seg in assignments] == [
+        ("bo", 1, True), ("ana", 0, False), ("dee", 2, False),
+    ]
+
+
+def _segment(employee_id: str, start: int, end: int, slot: int = 0, locked: bool = False) -> AssignmentSegment:
+    return AssignmentSegment(
+        shift_id="till", day=Weekday.MON, employee_id=employee_id,
+        start_minute=start, end_minute=end, slot=slot, locked=locked,
+    )
+
+
+def test_contiguous_segments_of_one_slot_are_merged_in_place() -> None:
+    segments = [
+        _segment("ana", 600, 660),
+        _segment("bo", 540, 600),
+        _segment("ana", 540, 600),
+        _segment("ana", 660, 720, slot=1),
+        _segment("ana", 700, 760),
+        _segment("bo", 600, 660, locked=True),
+    ]
+
+    merged = merge_contiguous(segments)
+
+    assert [(seg.employee_id, seg.start_minute, seg.end_minute, seg.slot) for seg in merged] == [
+        ("bo", 540, 600, 0), ("ana", 540, 660, 0), ("ana", 660, 720, 1), ("ana", 700, 760, 0), ("bo", 600, 660, 0),
+    ]
+
+
+def test_solved_slot_numbers_are_unique_and_keep_locked_ones() -> None:
+    week = generate(SCENARIOS["locked"], 1)
+    capacity = {shift.id: shift.capacity for shift in week.shifts}
+
+    response = CPSATSolver().solve(week)
+
+    slots: Dict[str, List[int]] = defaultdict(list)
+    for seg in response.assignments:
+        slots[seg.shift_id].append(seg.slot)
+    for shift_id, numbers in slots.items():
+        assert len(set(numbers)) == len(numbers) and max(numbers) < capacity[shift_id], shift_id
+    locked: Set[tuple] = {(lock.shift_id, lock.slot, lock.employee_id) for lock in week.locked_assignments}
+    assert locked == {(seg.shift_id, seg.slot, seg.employee_id) for seg in response.assignments if seg.locked}
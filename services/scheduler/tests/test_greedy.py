@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Any, Dict, List
+
+import pytest
+
+from services.scheduler.app.domain.models import SolveRequest
+from services.scheduler.app.solver.compiled import compile_request
+from services.scheduler.app.solver.cpsat import CPSATSolver
+from services.scheduler.app.solver.eligibility import EligibilityIndex
+from services.scheduler.app.solver.greedy import GreedySolver
+from services.scheduler.app.solver.labor import DAY_POSITION, WorkLog, apply_carry_over
+from services.scheduler.benchmarks.generator import SCENARIOS, generate
+from services.scheduler.benchmarks.runner import run_greedy
+
+
+def _employee(employee_id: str, roles: List[str], target: int) -> Dict[str, Any]:
+    return {
+        "id": employee_id,
+        "name": employee_id,
+        "home_store_id": "store-01",
+        "can_work_across_stores": False,
+        "contract_type": "FULL_TIME",
+        "weekly_minutes_target": target,
+        "role_ids": [],
+        "role_names": roles,
+        "availability": [{"day": "MON", "start_minute": 0, "end_minute": 1440}],
+    }
+
+
+def _shift(shift_id: str, role: str, start: int, end: int) -> Dict[str, Any]:
+    return {
+        "id": shift_id,
+        "role": role,
+        "day": "MON",
+        "start_minute": start,
+        "end_minute": end,
+        "store_id": "store-01",
+    }
+
+
+def test_blocked_slot_is_repaired_by_moving_a_shift() -> None:
+    # First fit gives "cook" to ana and "early-till" to cy, which leaves nobody for "late-till"
+    # until ana hands "cook" to bo
+    request = compile_request(SolveRequest.parse_obj({
+        "store_id": "store-01",
+        "iso_week": "2024-W21",
+        "employees": [
+            _employee("ana", ["cook", "cashier"], 2400),
+            _employee("bo", ["cook"], 1200),
+            _employee("cy", ["cashier"], 1200),
+        ],
+        "shifts": [
+            _shift("cook", "cook", 540, 780),
+            _shift("early-till", "cashier", 570, 810),
+            _shift("late-till", "cashier", 600, 840),
+        ],
+    }))
+
+    result = GreedySolver(lambda emp: 2400).solve(request, EligibilityIndex(request.employees))
+
+    assert (result.open_slots, result.repaired_slots) == (0, 1)
+    assert {seg.shift_id: seg.employee_id for seg in result.assignments} == {
+        "cook": "bo", "early-till": "cy", "late-till": "ana",
+    }
+
+
+@pytest.mark.parametrize("scenario", ["locked", "multi-store", "large"])
+def test_greedy_week_keeps_labor_rules_and_locks(scenario: str) -> None:
+    solver = CPSATSolver()
+    week = generate(SCENARIOS[scenario], 0)
+
+    response = run_greedy(solver, week)
+
+    assert len({(seg.shift_id, seg.slot) for seg in response.assignments}) == len(response.assignments)
+    locked = {(lock.shift_id, lock.employee_id) for lock in week.locked_assignments}
+    assert locked <= {(seg.shift_id, seg.employee_id) for seg in response.assignments if seg.locked}
+    logs: Dict[str, WorkLog] = defaultdict(WorkLog)
+    apply_carry_over(logs, week.carry_over)
+    for seg in sorted(response.assignments, key=lambda seg: (DAY_POSITION[seg.day], seg.start_minute)):
+        assert logs[seg.employee_id].allows(seg.day, seg.start_minute, seg.end_minute), seg
+        logs[seg.employee_id].add(seg.day, seg.start_minute, seg.end_minute)
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from services.scheduler.app.domain.models import HorizonSolveRequest, Weekday
+from services.scheduler.app.horizon import horizon_weeks, solve_horizon
+from services.scheduler.app.solver.cpsat import CPSATSolver
+from services.scheduler.app.solver.labor import DAY_POSITION
+
+MON, TUE, WED, THU, FRI, SAT, SUN = (Weekday.from_iso_index(i) for i in range(7))
+
+
+def _employee(emp_id: str, role: str) -> Dict[str, Any]:
+    return {
+        "id": emp_id,
+        "name": emp_id.title(),
+        "home_store_id": "store-01",
+        "can_work_across_stores": False,
+        "contract_type": "FULL_TIME",
+        "weekly_minutes_target": 2400,
+        "role_ids": [],
+        "role_names": [role],
+        "availability": [{"day": day.value, "start_minute": 0, "end_minute": 1440} for day in DAY_POSITION],
+    }
+
+
+def _shift(shift_id: str, role: str, day: Weekday, start: int, end: int) -> Dict[str, Any]:
+    return {
+        "id": shift_id, "role": role, "day": day.value, "start_minute": start, "end_minute": end,
+        "store_id": "store-01",
+    }
+
+
+def _horizon(weeks: List[Dict[str, Any]], carry: Optional[List[Dict[str, Any]]] = None) -> HorizonSolveRequest:
+    """Ana is the only cashier and Bo the only cook, so every shift has one possible assignee."""
+    return HorizonSolveRequest.parse_obj({
+        "store_id": "store-01",
+        "employees": [_employee("ana", "cashier"), _employee("bo", "cook")],
+        "weeks": weeks,
+        "options": {"allow_uncovered": True, "soft_coverage": True, "use_cache": False},
+        "carry_over": carry or [],
+    })
+
+
+# Ana works Tuesday to Sunday, ending late on Sunday; Bo works one Wednesday shift
+FIRST_WEEK = {
+    "iso_week": "2024-W21",
+    "shifts": [_shift(f"till-{day.value}", "cashier", day, 600, 840) for day in (TUE, WED, THU, FRI, SAT)]
+    + [_shift("till-SUN", "cashier", SUN, 1200, 1430), _shift("grill", "cook", WED, 600, 840)],
+}
+
+
+def _carry(carry_over: list) -> Dict[str, Any]:
+    return {carry.employee_id: carry for carry in carry_over}
+
+
+def test_a_week_carries_its_sunday_into_the_next() -> None:
+    second_week = {
+        "iso_week": "2024-W22",
+        "shifts": [
+            _shift("dawn", "cashier", MON, 10, 300),  # Too little rest after Sunday night
+            _shift("noon", "cashier", MON, 600, 840),  # A seventh day in a row
+            _shift("tue", "cashier", TUE, 600, 840),
+        ],
+    }
+
+    response = solve_horizon(CPSATSolver(), _horizon([FIRST_WEEK, second_week]))
+
+    first, second = response.weeks
+    assert len(first.assignments) == 7
+    assert [seg.shift_id for seg in second.assignments] == ["tue"]
+    ana, bo = (_carry(response.carry_over)[emp_id] for emp_id in ("ana", "bo"))
+    assert (ana.consecutive_days, ana.last_shift_end_minute) == (0, None)
+    assert ana.minutes_behind_target == 2 * 2400 - (5 * 240 + 230) - 240
+    assert (bo.consecutive_days, bo.minutes_behind_target) == (0, 2 * 2400 - 240)
+
+
+def test_carry_over_after_one_week() -> None:
+    carry = [{"employee_id": "bo", "minutes_behind_target": -60}]
+
+    response = solve_horizon(CPSATSolver(), _horizon([FIRST_WEEK], carry))
+
+    ana, bo = (_carry(response.carry_over)[emp_id] for emp_id in ("ana", "bo"))
+    assert (ana.consecutive_days, ana.last_shift_end_minute) == (6, 1430)
+    assert bo.consecutive_days == 0 and bo.last_shift_end_minute is None
+    assert bo.minutes_behind_target == -60 + 2400 - 240
+
+
+def test_absent_employees_rest_without_catching_up() -> None:
+    second_week = {
+        "iso_week": "2024-W22",
+        "shifts": [_shift("tue", "cashier", TUE, 600, 840)],
+        "overrides": {"absent_employees": ["ana"]},
+    }
+
+    response = solve_horizon(CPSATSolver(), _horizon([FIRST_WEEK, second_week]))
+
+    assert response.weeks[1].assignments == []
+    ana = _carry(response.carry_over)["ana"]
+    assert (ana.consecutive_days, ana.last_shift_end_minute) == (0, None)
+    assert ana.minutes_behind_target == 2400 - (5 * 240 + 230)
+
+
+def test_weeks_share_an_index_until_they_change_the_employees() -> None:
+    plain = {"iso_week": "2024-W22", "shifts": FIRST_WEEK["shifts"]}
+    absent = dict(plain, iso_week="2024-W23", overrides={"absent_employees": ["bo"]})
+
+    weeks = horizon_weeks(_horizon([FIRST_WEEK, plain, absent]))
+
+    assert [week.iso_week for week in weeks] == ["2024-W21", "2024-W22", "2024-W23"]
+    assert weeks[0]._eligibility_key == weeks[1]._eligibility_key != weeks[2]._eligibility_key
+    assert [emp.id for emp in weeks[2].employees] == ["ana"]
+
+
+def test_overrides_naming_unknown_employees_are_rejected() -> None:
+    week = dict(FIRST_WEEK, overrides={"absent_employees": ["cy"]})
+
+    with pytest.raises(ValueError):
+        horizon_weeks(_horizon([week]))
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from concurrent.futures import Future
+from typing import Iterator, List, Tuple
+
+import pytest
+
+from services.scheduler.app.cache import SolveResultCache
+from services.scheduler.app.config import Settings
+from services.scheduler.app.domain.models import JobStatus, SolveJobInfo
+from services.scheduler.app.jobs import JobManager, SolveJob
+from services.scheduler.app.service import SchedulerBusyError, SchedulerService
+from services.scheduler.app.solver.cpsat import CPSATSolver
+from services.scheduler.benchmarks.generator import SCENARIOS, generate
+from services.scheduler.benchmarks.runner import run_greedy
+
+CONFIG = Settings(solver_pool_workers=1, cache_max_entries=0, job_workers=1, job_stream_poll_seconds=0.05)
+
+
+@pytest.fixture
+def jobs() -> Iterator[JobManager]:
+    cache = SolveResultCache(CONFIG)
+    scheduler = SchedulerService(CONFIG, cache)
+    manager = JobManager(CONFIG, cache, scheduler)
+    try:
+        yield manager
+    finally:
+        manager.shutdown()
+        scheduler.shutdown()
+
+
+def _events(manager: JobManager, job: SolveJob) -> List[Tuple[str, SolveJobInfo]]:
+    async def collect() -> List[str]:
+        return [event async for event in manager.stream(job)]
+
+    events = []
+    for event in asyncio.run(collect()):
+        name, _, data = event.strip().split("\n")
+        events.append((name[len("event: "):], SolveJobInfo.parse_obj(json.loads(data[len("data: "):]))))
+    return events
+
+
+def _wait(job: SolveJob, done, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not done(job) and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+def test_job_streams_progress_then_its_result(jobs: JobManager) -> None:
+    job = jobs.submit(generate(SCENARIOS["large"], 0))
+
+    events = _events(jobs, job)
+
+    names = [name for name, _ in events]
+    assert names[-1] == "done" and set(names[:-1]) == {"progress"}
+    done = events[-1][1]
+    assert done.status == JobStatus.SUCCEEDED
+    assert done.solutions_found >= 1
+    assert done.result is not None and done.result.metrics.coverage_ratio == 1.0
+    assert jobs.get(job.id).info() == done
+
+
+def test_cancelled_job_keeps_the_best_schedule_so_far(jobs: JobManager) -> None:
+    job = jobs.submit(generate(SCENARIOS["region"], 0))
+    _wait(job, lambda job: job.solutions_found > 0 or job.status.is_terminal)
+
+    jobs.cancel(job.id)
+    _wait(job, lambda job: job.status.is_terminal)
+
+    info = job.info()
+    assert info.status == JobStatus.CANCELLED
+    assert info.result is not None and info.result.assignments
+
+
+def test_job_cancelled_while_queued_is_never_solved() -> None:
+    job = SolveJob(generate(SCENARIOS["small"], 0))
+
+    job.cancel()
+    job.run(lambda job: pytest.fail("a cancelled job was submitted"), SolveResultCache(CONFIG))
+
+    assert job.status == JobStatus.CANCELLED
+    assert job.result is None
+
+
+def test_full_job_queue_is_rejected() -> None:
+    pending: Future = Future()
+
+    class _Stalled:
+        def submit_job(self, *args) -> Future:
+            return pending
+
+    config = CONFIG.copy(update={"job_queue_size": 0})
+    manager = JobManager(config, SolveResultCache(config), _Stalled())
+    week = generate(SCENARIOS["small"], 0)
+    try:
+        manager.submit(week)
+        with pytest.raises(SchedulerBusyError):
+            manager.submit(generate(SCENARIOS["small"], 1))
+    finally:
+        pending.set_result(run_greedy(CPSATSolver(), week))
+        manager.shutdown()
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+
+from services.scheduler.app.domain.models import SolveRequest, SolveResponse, Weekday
+from services.scheduler.app.solver.cpsat import CPSATSolver
+from services.scheduler.app.solver.labor import DAY_POSITION, WorkLog, apply_carry_over
+from services.scheduler.benchmarks.runner import run_greedy
+
+MON, TUE, WED, THU, FRI, SAT, SUN = (Weekday.from_iso_index(i) for i in range(7))
+
+
+def _log(*booked: Tuple[Weekday, int, int]) -> WorkLog:
+    log = WorkLog()
+    for day, start, end in booked:
+        log.add(day, start, end)
+    return log
+
+
+@pytest.mark.parametrize(
+    "booked, candidate, allowed",
+    [
+        ([(MON, 480, 600)], (MON, 620, 700), False),  # 20 minutes of rest
+        ([(MON, 480, 600)], (MON, 630, 700), True),
+        ([(MON, 480, 600)], (MON, 540, 660), False),  # Overlap
+        ([(MON, 1200, 1430)], (TUE, 10, 300), False),  # Rest across midnight
+        ([(MON, 1200, 1430)], (TUE, 20, 300), True),
+        ([(TUE, 10, 300)], (MON, 1200, 1430), False),  # ...in both directions
+        ([(MON, 360, 720)], (MON, 780, 1140), True),  # Exactly 12 hours in the day
+        ([(MON, 360, 720)], (MON, 780, 1141), False),
+        ([(day, 540, 1020) for day in (MON, TUE, WED, THU, FRI, SAT)], (SUN, 540, 1020), False),
+        ([(day, 540, 1020) for day in (MON, TUE, WED, THU, FRI, SAT)], (SAT, 1080, 1200), True),  # Same day
+        ([(day, 540, 1020) for day in (MON, TUE, WED, FRI, SAT, SUN)], (THU, 540, 1020), False),  # Joins two runs
+        ([(day, 540, 1020) for day in (MON, TUE, WED, FRI, SAT)], (THU, 540, 1020), True),
+    ],
+)
+def test_work_log_rules(booked: list, candidate: Tuple[Weekday, int, int], allowed: bool) -> None:
+    assert _log(*booked).allows(*candidate) is allowed
+
+
+def test_removed_work_frees_its_day_and_rest() -> None:
+    log = _log((MON, 480, 600), (MON, 630, 1020))
+    assert not log.allows(MON, 1050, 1300)  # 13 hours in the day
+
+    log.remove(MON, 630, 1020)
+
+    assert log.allows(MON, 660, 1200)
+    assert log.day_minutes[DAY_POSITION[MON]] == 120
+
+
+def test_carry_over_counts_toward_rest_and_the_run_of_days() -> None:
+    log = WorkLog()
+    log.carry_in(consecutive_days=2, last_shift_end_minute=1430)
+
+    assert not log.allows(MON, 10, 300)
+    for day in (MON, TUE, WED, THU):
+        log.add(day, 540, 1020)
+    assert not log.allows(FRI, 540, 1020)  # Two carried days and five this week
+
+
+def _shift(shift_id: str, day: Weekday, start: int, end: int) -> Dict[str, Any]:
+    return {
+        "id": shift_id, "role": "cashier", "day": day.value, "start_minute": start, "end_minute": end,
+        "store_id": "store-01",
+    }
+
+
+def _week(shifts: List[Dict[str, Any]], carry: Optional[Dict[str, Any]] = None) -> SolveRequest:
+    """One full-time cashier available all week, with as many slots as CP-SAT can soft-cover."""
+    return SolveRequest.parse_obj({
+        "store_id": "store-01",
+        "iso_week": "2024-W21",
+        "employees": [{
+            "id": "emp-01",
+            "name": "Ana",
+            "home_store_id": "store-01",
+            "can_work_across_stores": False,
+            "contract_type": "FULL_TIME",
+            "weekly_minutes_target": 2400,
+            "role_ids": [],
+            "role_names": ["cashier"],
+            "availability": [{"day": day.value, "start_minute": 0, "end_minute": 1440} for day in DAY_POSITION],
+        }],
+        "shifts": shifts,
+        "options": {"allow_uncovered": True, "soft_coverage": True, "use_cache": False},
+        "carry_over": [{"employee_id": "emp-01", **carry}] if carry else [],
+    })
+
+
+WEEKS = {
+    "seven days": (_week([_shift(f"d{n}", day, 600, 840) for n, day in enumerate(DAY_POSITION)]), 6),
+    "daily cap": (_week([_shift("early", MON, 360, 780), _shift("late", MON, 810, 1200)]), 1),
+    "rest": (_week([_shift("early", MON, 480, 720), _shift("late", MON, 740, 960)]), 1),
+    "midnight rest": (_week([_shift("night", MON, 1200, 1440), _shift("dawn", TUE, 0, 240)]), 1),
+    "carried days": (
+        _week([_shift("mon", MON, 600, 840), _shift("tue", TUE, 600, 840)], {"consecutive_days": 6}), 1
+    ),
+}
+
+
+def _follows_labor_rules(week: SolveRequest, response: SolveResponse) -> bool:
+    logs: Dict[str, WorkLog] = defaultdict(WorkLog)
+    apply_carry_over(logs, week.carry_over)
+    for seg in sorted(response.assignments, key=lambda seg: (DAY_POSITION[seg.day], seg.start_minute)):
+        if not logs[seg.employee_id].allows(seg.day, seg.start_minute, seg.end_minute):
+            return False
+        logs[seg.employee_id].add(seg.day, seg.start_minute, seg.end_minute)
+    return True
+
+
+@pytest.mark.parametrize("name", sorted(WEEKS))
+def test_cpsat_and_greedy_apply_the_same_rules(name: str) -> None:
+    week, coverable = WEEKS[name]
+    solver = CPSATSolver()
+
+    cpsat = solver.solve(week)
+    greedy = run_greedy(solver, week)
+
+    assert cpsat.metrics.algorithm == "cpsat"
+    for response in (cpsat, greedy):
+        assert len(response.assignments) == coverable
+        assert _follows_labor_rules(week, response)
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+
+from services.scheduler.app.api.routes import metrics
+from services.scheduler.app.domain.models import SolveResponse
+from services.scheduler.app.metrics import record_solve, store_size
+from services.scheduler.app.solver.cpsat import CPSATSolver
+from services.scheduler.app.solver.timing import PHASES
+from services.scheduler.benchmarks.generator import SCENARIOS, generate
+from services.scheduler.benchmarks.runner import run_greedy
+
+
+def _phase_total(response: SolveResponse) -> float:
+    return sum(getattr(response.metrics.timings, f"{phase}_ms") for phase in PHASES)
+
+
+@pytest.mark.parametrize("scenario, algorithm", [("single-store", "cpsat"), ("large", "decomposed")])
+def test_solve_reports_its_phases_and_model_size(scenario: str, algorithm: str) -> None:
+    response = CPSATSolver().solve(generate(SCENARIOS[scenario], 0))
+
+    metrics = response.metrics
+    assert metrics.algorithm == algorithm
+    assert metrics.timings is not None
+    assert all(getattr(metrics.timings, f"{phase}_ms") >= 0 for phase in PHASES)
+    assert metrics.timings.model_build_ms > 0 and metrics.timings.solve_ms > 0
+    assert metrics.num_variables and metrics.num_constraints
+    if algorithm == "cpsat":
+        # Sequential phases fit in the wall time; parallel decomposed parts are summed past it
+        assert _phase_total(response) <= metrics.timings.total_ms + 1
+
+
+def test_greedy_solve_has_no_model() -> None:
+    response = run_greedy(CPSATSolver(), generate(SCENARIOS["single-store"], 0))
+
+    assert response.metrics.algorithm == "greedy"
+    assert response.metrics.timings.solve_ms > 0
+    assert response.metrics.num_variables is None
+
+
+@pytest.mark.parametrize("shifts, label", [(50, "small"), (51, "medium"), (1000, "large"), (1001, "xlarge")])
+def test_store_size_buckets(shifts: int, label: str) -> None:
+    week = generate(SCENARIOS["small"], 0)
+    week.shifts = [week.shifts[0]] * shifts
+
+    assert store_size(week) == label
+
+
+def test_recorded_solve_is_exposed_on_the_metrics_endpoint() -> None:
+    week = generate(SCENARIOS["single-store"], 0)
+    response = CPSATSolver().solve(week)
+    labels = {"algorithm": "cpsat", "store_size": "small"}
+    solves = {**labels, "status": response.metrics.status}
+    phase = {**labels, "phase": "solve"}
+    before = REGISTRY.get_sample_value("scheduler_solves_total", solves) or 0
+    observed = REGISTRY.get_sample_value("scheduler_solve_phase_seconds_count", phase) or 0
+
+    record_solve(week, response)
+
+    assert REGISTRY.get_sample_value("scheduler_solves_total", solves) == before + 1
+    assert REGISTRY.get_sample_value("scheduler_solve_phase_seconds_count", phase) == observed + 1
+    exposed = asyncio.run(metrics())
+    assert exposed.media_type.startswith("text/plain")
+    body = exposed.body.decode()
+    for name in ("scheduler_solves_total", "scheduler_model_variables", "scheduler_model_constraints"):
+        assert name in body
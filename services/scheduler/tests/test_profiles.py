@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import os
+import time
+from typing import List
+
+import pytest
+from ortools.sat.python import cp_model
+
+from services.scheduler.app.config import Settings
+from services.scheduler.app.service import SchedulerService
+from services.scheduler.app.solver.cpsat import CPSATSolver
+from services.scheduler.app.solver.portfolio import CPSAT, GREEDY, PortfolioRace
+from services.scheduler.app.solver.profiles import get_profile
+from services.scheduler.benchmarks.generator import SCENARIOS, generate
+from services.scheduler.benchmarks.runner import run_greedy
+
+
+@pytest.mark.parametrize(
+    "cores, pool_workers, balanced_workers, quality_workers",
+    [(32, 4, 8, 8), (16, 2, 8, 8), (4, 1, 4, 4), (1, 1, 2, 2)],
+)
+def test_default_pool_gives_each_solve_most_of_the_machine(
+    monkeypatch, cores: int, pool_workers: int, balanced_workers: int, quality_workers: int
+) -> None:
+    monkeypatch.setattr(os, "cpu_count", lambda: cores)
+    config = Settings()
+    scheduler = SchedulerService(config)
+
+    assert config.solver_pool_workers == pool_workers
+    for profile, expected in (("balanced", balanced_workers), ("quality", quality_workers)):
+        solver = cp_model.CpSolver()
+        get_profile(profile).apply(solver, None, scheduler.search_workers)
+        assert solver.parameters.num_search_workers == expected
+
+
+def test_configured_search_workers_override_the_split(monkeypatch) -> None:
+    monkeypatch.setattr(os, "cpu_count", lambda: 32)
+    scheduler = SchedulerService(Settings(solver_search_workers=16))
+
+    solver = cp_model.CpSolver()
+    get_profile("quality").apply(solver, None, scheduler.search_workers)
+
+    assert solver.parameters.num_search_workers == 16
+
+
+@pytest.mark.parametrize(
+    "profile, time_limit, expected", [("fast", 60, 5.0), ("balanced", None, 15.0), ("quality", 60, 60.0)]
+)
+def test_profiles_cap_the_request_time_limit(profile: str, time_limit, expected: float) -> None:
+    assert get_profile(profile).time_limit(time_limit) == expected
+
+
+def test_first_contender_to_reach_the_target_wins_and_stops_the_search() -> None:
+    race = PortfolioRace(target_coverage=0.9)
+    stops: List[str] = []
+    race.bind_stop(lambda: stops.append("search"))
+
+    assert not race.offer_cpsat(0.8)
+    race.start_greedy(lambda: run_greedy(CPSATSolver(), generate(SCENARIOS["single-store"], 0)))
+    race.wait_greedy()
+
+    assert race.winner == GREEDY and stops == ["search"]
+    assert race.offer_cpsat(1.0)  # Any later solution stops, but does not win
+    assert race.winner == GREEDY
+    race.bind_stop(lambda: stops.append("late"))
+    assert stops == ["search", "late"]
+
+
+def test_cpsat_reaching_the_target_wins_the_race() -> None:
+    race = PortfolioRace(target_coverage=0.9)
+
+    assert race.offer_cpsat(0.95)
+    assert race.winner == CPSAT
+
+
+def _slowed(method, seconds: float):
+    def slow(*args, **kwargs):
+        time.sleep(seconds)
+        return method(*args, **kwargs)
+    return slow
+
+
+def test_portfolio_returns_greedy_when_it_covers_first(monkeypatch) -> None:
+    monkeypatch.setattr(CPSATSolver, "_search", _slowed(CPSATSolver._search, 0.5))
+    week = generate(SCENARIOS["single-store"], 0)
+    week.options.portfolio = True
+
+    response = CPSATSolver().solve(week)
+
+    assert response.metrics.status == "GREEDY_SOLUTION"
+    assert response.metrics.coverage_ratio == 1.0
+
+
+def test_portfolio_returns_cpsat_without_waiting_for_greedy(monkeypatch) -> None:
+    monkeypatch.setattr(CPSATSolver, "_solve_greedy", _slowed(CPSATSolver._solve_greedy, 3.0))
+    week = generate(SCENARIOS["single-store"], 0)
+    week.options.portfolio = True
+    started = time.perf_counter()
+
+    response = CPSATSolver().solve(week)
+
+    assert time.perf_counter() - started < 3.0
+    assert response.metrics.status in ("OPTIMAL", "FEASIBLE")
+    assert response.metrics.coverage_ratio == 1.0
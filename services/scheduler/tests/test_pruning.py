@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Dict, List, Set
+
+import pytest
+
+from services.scheduler.app.solver import cpsat
+from services.scheduler.app.solver.cpsat import CPSATSolver
+from services.scheduler.benchmarks.generator import SCENARIOS, generate
+
+
+@pytest.mark.parametrize("scenario, seed", [("single-store", 0), ("locked", 0), ("multi-store", 1)])
+def test_pruned_coverage_matches_the_full_model(monkeypatch, scenario: str, seed: int) -> None:
+    request = generate(SCENARIOS[scenario], seed)
+    pruned = CPSATSolver().solve(request)
+
+    monkeypatch.setattr(cpsat, "INITIAL_CANDIDATES", len(request.employees))
+    full = CPSATSolver().solve(request)
+
+    assert pruned.metrics.coverage_ratio == full.metrics.coverage_ratio
+
+
+def _ranked(*employee_ids: str) -> List[SimpleNamespace]:
+    return [SimpleNamespace(id=employee_id) for employee_id in employee_ids]
+
+
+def test_prior_assignees_survive_the_cutoff() -> None:
+    ranked = _ranked("a", "b", "c", "d")
+
+    kept = CPSATSolver()._pruned(ranked, 2, "mon", {("d", "mon"), ("c", "tue")})
+
+    assert [emp.id for emp in kept] == ["a", "b", "d"]
+
+
+@pytest.mark.parametrize(
+    "limits, widened",
+    [
+        ({"open": 1, "held": 2, "far": 2}, {"open"}),  # The open shift's own list was cut
+        ({"open": 2, "held": 1, "far": 2}, {"held"}),  # Its candidate is busy on a cut shift
+        ({"open": 2, "held": 2, "far": 1}, {"far"}),  # Two hops out: the holder's candidate is busy there
+        ({"open": 2, "held": 2, "far": 2}, set()),  # Nothing was cut, so widening cannot help
+    ],
+)
+def test_widening_follows_the_holders_of_open_slot_candidates(limits: Dict[str, int], widened: Set[str]) -> None:
+    ranked = {"open": _ranked("a", "b"), "held": _ranked("a", "c"), "far": _ranked("c", "d")}
+    assigned = {("a", "held"), ("c", "far")}
+
+    assert CPSATSolver()._shifts_to_widen({"open": 1}, assigned, ranked, limits) == widened
+
+
+def test_widened_rounds_solve_with_cpsat(monkeypatch) -> None:
+    widen = CPSATSolver._shifts_to_widen
+    calls = []
+
+    def recording_widen(self, *args):
+        widened = widen(self, *args)
+        calls.append(widened)
+        return widened
+
+    monkeypatch.setattr(CPSATSolver, "_shifts_to_widen", recording_widen)
+
+    response = CPSATSolver().solve(generate(SCENARIOS["single-store"], 0))
+
+    assert calls and all(calls)
+    assert response.metrics.algorithm == "cpsat" and response.metrics.status in ("OPTIMAL", "FEASIBLE")
+    assert response.metrics.coverage_ratio == 1.0
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+
+import pytest
+
+from services.scheduler.app.domain.models import AssignmentSegment, RepairRequest, SolveRequest, SolveResponse
+from services.scheduler.app.repair import finish_repair, plan_repair
+from services.scheduler.app.solver.compiled import compile_employees
+from services.scheduler.app.solver.cpsat import CPSATSolver
+from services.scheduler.app.solver.labor import DAY_POSITION, WorkLog, apply_carry_over
+from services.scheduler.benchmarks.generator import SCENARIOS, generate
+
+
+def _repair(solver: CPSATSolver, repair: RepairRequest) -> SolveResponse:
+    """``SchedulerService.repair`` without the process pool."""
+    plan = plan_repair(repair)
+    return finish_repair(plan, solver.solve(plan.request) if plan.request is not None else None)
+
+
+def test_repaired_week_respects_labor_limits() -> None:
+    solver = CPSATSolver()
+    week = generate(SCENARIOS["single-store"], 0)
+    solved = solver.solve(week)
+    absent = solved.assignments[0].employee_id
+
+    repaired = _repair(solver, RepairRequest(
+        request=week,
+        assignments=solved.assignments,
+        disruption={"absent_employees": [absent]},
+        neighborhood_days=1,
+    ))
+
+    assert all(seg.employee_id != absent for seg in repaired.assignments)
+    assert len({(seg.shift_id, seg.slot) for seg in repaired.assignments}) == len(repaired.assignments)
+    logs: Dict[str, WorkLog] = defaultdict(WorkLog)
+    apply_carry_over(logs, week.carry_over)
+    minutes: Dict[str, int] = defaultdict(int)
+    for seg in sorted(repaired.assignments, key=lambda seg: (DAY_POSITION[seg.day], seg.start_minute)):
+        assert logs[seg.employee_id].allows(seg.day, seg.start_minute, seg.end_minute), seg
+        logs[seg.employee_id].add(seg.day, seg.start_minute, seg.end_minute)
+        minutes[seg.employee_id] += seg.end_minute - seg.start_minute
+    for employee in compile_employees(week.employees):
+        assert minutes[employee.id] <= solver._get_weekly_limit(employee)
+
+
+@pytest.fixture(scope="module")
+def solved() -> Tuple[SolveRequest, SolveResponse]:
+    week = generate(SCENARIOS["single-store"], 0)
+    return week, CPSATSolver().solve(week)
+
+
+def _spans(segments: List[AssignmentSegment]) -> Set[Tuple[str, str, int, int, int]]:
+    return {(seg.employee_id, seg.shift_id, seg.slot, seg.start_minute, seg.end_minute) for seg in segments}
+
+
+def test_only_the_disrupted_days_are_solved_again(solved) -> None:
+    week, response = solved
+    absent = response.assignments[0].employee_id
+    disrupted = {seg.day for seg in response.assignments if seg.employee_id == absent}
+
+    repaired = _repair(CPSATSolver(), RepairRequest(
+        request=week, assignments=response.assignments, disruption={"absent_employees": [absent]},
+    ))
+
+    assert absent not in {seg.employee_id for seg in repaired.assignments}
+    before = [seg for seg in response.assignments if seg.day not in disrupted]
+    after = [seg for seg in repaired.assignments if seg.day not in disrupted]
+    assert len(disrupted) < 7 and _spans(after) == _spans(before)
+
+
+def test_disruption_that_breaks_nothing_keeps_the_schedule(solved) -> None:
+    week, response = solved
+    idle = next(
+        emp.id for emp in week.employees if emp.id not in {seg.employee_id for seg in response.assignments}
+    )
+
+    repaired = _repair(CPSATSolver(), RepairRequest(
+        request=week, assignments=response.assignments, disruption={"absent_employees": [idle]},
+    ))
+
+    assert repaired.metrics.status == "UNCHANGED"
+    assert _spans(repaired.assignments) == _spans(response.assignments)
+
+
+def test_removed_shift_is_dropped_and_an_added_one_staffed(solved) -> None:
+    week, response = solved
+    removed = response.assignments[0].shift_id
+    extra = week.shifts[-1].copy(update={"id": "extra", "capacity": 1})
+
+    repaired = _repair(CPSATSolver(), RepairRequest(
+        request=week,
+        assignments=response.assignments,
+        disruption={"removed_shifts": [removed], "extra_shifts": [extra]},
+        neighborhood_days=1,
+    ))
+
+    shift_ids = [seg.shift_id for seg in repaired.assignments]
+    assert removed not in shift_ids
+    assert shift_ids.count("extra") == 1
+
+
+def test_schedule_naming_an_unknown_employee_is_rejected(solved) -> None:
+    week, response = solved
+    stranger = response.assignments[0].copy(update={"employee_id": "emp-unknown"})
+
+    with pytest.raises(ValueError):
+        plan_repair(RepairRequest(request=week, assignments=[stranger], disruption={}))
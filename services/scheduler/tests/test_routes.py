@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from services.scheduler.app.api import routes
+from services.scheduler.app.domain.models import TemplateUpload
+from services.scheduler.app.service import SchedulerBusyError, SchedulerUnavailableError
+from services.scheduler.app.templates import UnknownTemplateError
+from services.scheduler.benchmarks.generator import SCENARIOS, generate
+
+
+@pytest.mark.parametrize(
+    "error, status",
+    [
+        (UnknownTemplateError("v9"), 404),
+        (SchedulerBusyError("busy"), 429),
+        (SchedulerUnavailableError("down"), 503),
+        (ValueError("bad override"), 422),
+        (RuntimeError("boom"), 500),
+    ],
+)
+def test_service_errors_map_to_http_statuses(error: Exception, status: int) -> None:
+    with pytest.raises(HTTPException) as raised:
+        with routes._service_errors("Solve"):
+            raise error
+
+    assert raised.value.status_code == status
+    if status in (429, 503):
+        assert raised.value.headers == {"Retry-After": routes.RETRY_AFTER_SECONDS}
+
+
+def test_job_submission_maps_every_service_error(monkeypatch) -> None:
+    def submit(request):
+        raise SchedulerUnavailableError("Solver worker pool crashed, retry the request")
+
+    monkeypatch.setattr(routes.job_manager, "submit", submit)
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(routes.submit_job(generate(SCENARIOS["small"], 0)))
+
+    assert raised.value.status_code == 503
+
+
+def test_template_upload_maps_service_errors(monkeypatch) -> None:
+    def put(upload):
+        raise ValueError("Duplicate employee ids")
+
+    monkeypatch.setattr(routes.scheduler_service.templates, "put", put)
+    week = generate(SCENARIOS["small"], 0)
+    upload = TemplateUpload(store_id=week.store_id, employees=week.employees, shifts=week.shifts)
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(routes.upload_template(upload))
+
+    assert raised.value.status_code == 422
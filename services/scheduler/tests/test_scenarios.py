@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import pytest
+
+from services.scheduler.app.domain.models import ScenarioRequest, SolveRequest
+from services.scheduler.app.scenarios import compare, scenario_variants
+from services.scheduler.app.solver.cpsat import CPSATSolver
+from services.scheduler.benchmarks.generator import SCENARIOS, generate
+
+
+def _request(base: SolveRequest, **scenarios: dict) -> ScenarioRequest:
+    return ScenarioRequest(base=base, scenarios=[{"name": name, **scenario} for name, scenario in scenarios.items()])
+
+
+def test_variants_share_the_base_index_only_while_they_keep_its_employees() -> None:
+    base = generate(SCENARIOS["small"], 0)
+    employee_id = base.employees[0].id
+
+    variants = dict(scenario_variants(_request(
+        base,
+        closed=dict(changes={"removed_shifts": [base.shifts[0].id]}),
+        absent=dict(changes={"absent_employees": [employee_id]}),
+        roaming=dict(cross_store_employees=[employee_id]),
+    )))
+
+    assert list(variants) == ["base", "closed", "absent", "roaming"]
+    assert variants["base"]._eligibility_key is not None
+    assert variants["closed"]._eligibility_key == variants["base"]._eligibility_key
+    assert variants["absent"]._eligibility_key is None and variants["roaming"]._eligibility_key is None
+    assert base._eligibility_key is None  # The caller's request is left alone
+    assert len(variants["closed"].shifts) == len(base.shifts) - 1
+    assert employee_id not in {emp.id for emp in variants["absent"].employees}
+    assert next(emp for emp in variants["roaming"].employees if emp.id == employee_id).can_work_across_stores
+
+
+def test_locks_on_removed_shifts_and_absent_employees_are_dropped() -> None:
+    base = generate(SCENARIOS["locked"], 0)
+    lock = base.locked_assignments[0]
+    request = _request(
+        base,
+        closed=dict(changes={"removed_shifts": [lock.shift_id]}),
+        absent=dict(changes={"absent_employees": [lock.employee_id]}),
+    )
+    request.include_base = False
+
+    for name, variant in scenario_variants(request):
+        assert lock not in variant.locked_assignments, name
+        assert len(variant.locked_assignments) < len(base.locked_assignments)
+
+
+def test_unknown_cross_store_employee_is_rejected() -> None:
+    base = generate(SCENARIOS["small"], 0)
+
+    with pytest.raises(ValueError):
+        scenario_variants(_request(base, ghost=dict(cross_store_employees=["emp-unknown"])))
+
+
+def test_comparison_rows_follow_the_variants() -> None:
+    base = generate(SCENARIOS["single-store"], 0)
+    request = _request(base, short=dict(changes={"absent_employees": [emp.id for emp in base.employees[:5]]}))
+    solver = CPSATSolver()
+    solved = [(name, variant, solver.solve(variant)) for name, variant in scenario_variants(request)]
+
+    comparison = compare(request, solved)
+
+    assert [row.name for row in comparison.results] == ["base", "short"]
+    base_row, short_row = comparison.results
+    assert short_row.coverage_ratio <= base_row.coverage_ratio
+    capacity = sum((shift.end_minute - shift.start_minute) * shift.capacity for shift in base.shifts)
+    for row, (_, _, response) in zip(comparison.results, solved):
+        assert row.assigned_minutes == response.metrics.total_assigned_minutes
+        assert row.uncovered_minutes == capacity - row.assigned_minutes
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from services.scheduler.app.domain.models import Shift, SolveRequest
+from services.scheduler.app.solver.compiled import ShiftRecord
+from services.scheduler.app.solver.cpsat import CPSATSolver
+from services.scheduler.app.solver.segments import aligned_window, covers_span, grid
+
+
+def _employee(employee_id: str, start: int, end: int) -> Dict[str, Any]:
+    return {
+        "id": employee_id,
+        "name": employee_id,
+        "home_store_id": "store-01",
+        "can_work_across_stores": False,
+        "contract_type": "FULL_TIME",
+        "weekly_minutes_target": 2400,
+        "role_ids": [],
+        "role_names": ["cashier"],
+        "availability": [{"day": "MON", "start_minute": start, "end_minute": end}],
+    }
+
+
+def _week(hand_off: Tuple[int, int], slot_size: int, segment_mode: bool = True) -> SolveRequest:
+    """An 8:00-16:00 shift that only two employees, one before and one after ``hand_off``, can cover."""
+    return SolveRequest.parse_obj({
+        "store_id": "store-01",
+        "iso_week": "2024-W21",
+        "employees": [_employee("ana", 480, hand_off[1]), _employee("bo", hand_off[0], 960)],
+        "shifts": [{
+            "id": "till", "role": "cashier", "day": "MON", "start_minute": 480, "end_minute": 960,
+            "store_id": "store-01",
+        }],
+        "options": {
+            "segment_mode": segment_mode,
+            "slot_size_minutes": slot_size,
+            "allow_uncovered": True,
+            "use_cache": False,
+        },
+    })
+
+
+def _spans(week: SolveRequest) -> List[Tuple[str, int, int]]:
+    response = CPSATSolver().solve(week)
+    return sorted((seg.employee_id, seg.start_minute, seg.end_minute) for seg in response.assignments)
+
+
+def test_grid_windows_and_span_cover() -> None:
+    shift = Shift(id="till", role="cashier", day="MON", start_minute=480, end_minute=620, store_id="store-01")
+    boundaries = grid(ShiftRecord(shift), 60)
+
+    assert boundaries == [480, 540, 600, 620]
+    assert aligned_window(boundaries, 500, 620, 30) == (540, 620)
+    assert aligned_window(boundaries, 500, 590, 30) is None  # Only 540, shorter than the minimum
+    assert covers_span(480, 620, [(540, 620), (480, 560)])
+    assert not covers_span(480, 620, [(480, 530), (540, 620)])
+
+
+def test_shift_is_split_at_a_grid_point_both_employees_reach() -> None:
+    spans = _spans(_week((720, 750), slot_size=30))
+
+    assert len(spans) == 2
+    (_, ana_start, ana_end), (_, bo_start, bo_end) = spans
+    assert (ana_start, bo_end) == (480, 960) and ana_end == bo_start
+    assert ana_end in (720, 750)
+
+
+def test_hand_off_between_grid_points_leaves_the_gap_open() -> None:
+    # Ana leaves at 12:30 and Bo arrives then: on an hourly grid Ana stops at 12:00 and Bo starts at 13:00
+    assert _spans(_week((750, 750), slot_size=60)) == [("ana", 480, 720), ("bo", 780, 960)]
+    assert _spans(_week((750, 750), slot_size=30)) == [("ana", 480, 750), ("bo", 750, 960)]
+
+
+def test_whole_shift_mode_cannot_split() -> None:
+    assert _spans(_week((720, 750), slot_size=30, segment_mode=False)) == []
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from services.scheduler.app import service
+from services.scheduler.app.cache import SolveResultCache
+from services.scheduler.app.config import Settings
+from services.scheduler.app.domain.models import ScenarioRequest
+from services.scheduler.app.service import SchedulerService
+from services.scheduler.benchmarks.generator import SCENARIOS, generate
+
+
+def test_pool_solves_with_the_configured_solver() -> None:
+    config = Settings(solver_pool_workers=1, cache_max_entries=0)
+    scheduler = SchedulerService(config, SolveResultCache(config))
+    try:
+        response = asyncio.run(scheduler.solve(generate(SCENARIOS["small"], 0)))
+    finally:
+        scheduler.shutdown()
+
+    assert response.metrics.status in ("OPTIMAL", "FEASIBLE", "GREEDY_SOLUTION")
+    assert response.assignments
+
+
+def test_worker_entry_points_need_the_initializer(monkeypatch) -> None:
+    monkeypatch.setattr(service, "_worker_solver", None)
+
+    with pytest.raises(RuntimeError):
+        service._solve_in_worker(generate(SCENARIOS["small"], 0))
+
+
+def test_scenarios_are_compared_and_answered_from_the_cache() -> None:
+    config = Settings(solver_pool_workers=1)
+    scheduler = SchedulerService(config, SolveResultCache(config))
+    week = generate(SCENARIOS["small"], 0)
+    week.options.use_cache = True
+    request = ScenarioRequest(
+        base=week,
+        scenarios=[{"name": "short-staffed", "changes": {"absent_employees": [week.employees[0].id]}}],
+    )
+    try:
+        first = asyncio.run(scheduler.compare_scenarios(request))
+        second = asyncio.run(scheduler.compare_scenarios(request))
+    finally:
+        scheduler.shutdown()
+
+    assert [result.name for result in first.results] == ["base", "short-staffed"]
+    assert first == second
+    stats = scheduler.cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (2, 2, 2)
+
+
+def test_scenario_naming_an_unknown_employee_is_rejected() -> None:
+    config = Settings(solver_pool_workers=1, cache_max_entries=0)
+    scheduler = SchedulerService(config, SolveResultCache(config))
+    request = ScenarioRequest(
+        base=generate(SCENARIOS["small"], 0),
+        scenarios=[{"name": "ghost", "changes": {"absent_employees": ["emp-unknown"]}}],
+    )
+
+    with pytest.raises(ValueError):
+        asyncio.run(scheduler.compare_scenarios(request))
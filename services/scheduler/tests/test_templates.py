@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import pytest
+
+from services.scheduler.app.domain.models import AvailabilitySlot, WeekOverrides
+from services.scheduler.app.solver.compiled import compile_employees
+from services.scheduler.app.templates import apply_overrides
+from services.scheduler.benchmarks.generator import SCENARIOS, generate
+
+
+def test_availability_overrides_are_parsed() -> None:
+    request = generate(SCENARIOS["small"], 0)
+    employee = request.employees[0]
+    # As built by construct_trusted before nested dict values were converted
+    overrides = WeekOverrides.construct(
+        availability={employee.id: [{"day": "MON", "start_minute": 480, "end_minute": 960}]}
+    )
+
+    employees, _ = apply_overrides(request.employees, request.shifts, overrides, "the request")
+
+    assert employees[0].availability == [AvailabilitySlot(day="MON", start_minute=480, end_minute=960)]
+    assert compile_employees(employees)[0].windows == ((0, 480, 960),)
+
+
+def test_invalid_availability_overrides_are_rejected() -> None:
+    request = generate(SCENARIOS["small"], 0)
+    overrides = WeekOverrides.construct(
+        availability={request.employees[0].id: [{"day": "MON", "start_minute": 960, "end_minute": 480}]}
+    )
+
+    with pytest.raises(ValueError):
+        apply_overrides(request.employees, request.shifts, overrides, "the request")
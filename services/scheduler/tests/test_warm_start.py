@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from typing import Set, Tuple
+
+import pytest
+
+from services.scheduler.app.domain.models import SolveRequest, SolveResponse
+from services.scheduler.app.solver.cpsat import CPSATSolver
+from services.scheduler.benchmarks.generator import SCENARIOS, generate
+from services.scheduler.benchmarks.runner import run_greedy
+
+
+def _pairs(response: SolveResponse) -> Set[Tuple[str, str]]:
+    return {(seg.employee_id, seg.shift_id) for seg in response.assignments if not seg.locked}
+
+
+@pytest.fixture(scope="module")
+def solved() -> Tuple[SolveRequest, SolveResponse]:
+    week = generate(SCENARIOS["single-store"], 0)
+    return week, CPSATSolver().solve(week)
+
+
+def _resolve(week: SolveRequest, previous: SolveResponse) -> SolveRequest:
+    again = week.copy(deep=True)
+    again.previous_assignments = previous.assignments
+    again.options.change_penalty = 100
+    return again
+
+
+def test_unchanged_week_keeps_its_previous_schedule(solved) -> None:
+    week, first = solved
+
+    second = CPSATSolver().solve(_resolve(week, first))
+
+    assert _pairs(second) == _pairs(first)
+
+
+def test_added_shift_is_staffed_without_moving_anyone_else(solved) -> None:
+    week, first = solved
+    edited = _resolve(week, first)
+    edited.shifts.append(edited.shifts[0].copy(update={"id": "extra"}))
+
+    response = CPSATSolver().solve(edited)
+
+    assert _pairs(first) <= _pairs(response)
+    assert {shift_id for _, shift_id in _pairs(response) - _pairs(first)} == {"extra"}
+
+
+def test_greedy_fallback_prefers_prior_assignees(solved) -> None:
+    week, first = solved
+    solver = CPSATSolver()
+
+    assert _pairs(first) - _pairs(run_greedy(solver, week))  # The cold greedy week differs
+    assert _pairs(run_greedy(solver, _resolve(week, first))) == _pairs(first)
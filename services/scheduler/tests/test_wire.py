@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Set, Type
+
+import pytest
+from pydantic import BaseModel
+
+from services.scheduler.app.api.wire import construct_trusted
+from services.scheduler.app.domain.models import (
+    BatchSolveRequest,
+    HorizonSolveRequest,
+    RepairRequest,
+    ScenarioRequest,
+    SolveRequest,
+    TemplateSolveRequest,
+    TemplateUpload,
+)
+from services.scheduler.benchmarks.generator import SCENARIOS, generate
+
+
+def _week() -> Dict[str, Any]:
+    request = generate(SCENARIOS["locked"], 0)
+    data = json.loads(request.json())
+    first = data["locked_assignments"][0]
+    data["previous_assignments"] = [{**first, "slot": 0, "locked": False}]
+    data["carry_over"] = [{"employee_id": first["employee_id"], "consecutive_days": 3, "last_shift_end_minute": 1320}]
+    data["options"] = {"profile": "fast", "segment_mode": True}
+    return data
+
+
+def _overrides(week: Dict[str, Any]) -> Dict[str, Any]:
+    employee, shift = week["employees"][0], week["shifts"][0]
+    return {
+        "availability": {
+            employee["id"]: [
+                {"day": "MON", "start_minute": 480, "end_minute": 1020},
+                {"day": "TUE", "is_off": True, "start_minute": 0, "end_minute": 0},
+            ]
+        },
+        "absent_employees": [week["employees"][1]["id"]],
+        "extra_employees": [{**employee, "id": "emp-extra"}],
+        "removed_shifts": [week["shifts"][1]["id"]],
+        "extra_shifts": [{**shift, "id": "shift-extra", "capacity": 2}],
+    }
+
+
+def _payloads() -> Dict[Type[BaseModel], Dict[str, Any]]:
+    week = _week()
+    overrides = _overrides(week)
+    store = {key: week[key] for key in ("store_id", "shifts", "locked_assignments", "previous_assignments")}
+    return {
+        SolveRequest: week,
+        BatchSolveRequest: {
+            "iso_week": week["iso_week"], "stores": [store], "employees": week["employees"], "options": week["options"]
+        },
+        TemplateUpload: {key: week[key] for key in ("store_id", "employees", "shifts")},
+        TemplateSolveRequest: {
+            "template_version": "v1",
+            "iso_week": week["iso_week"],
+            "overrides": overrides,
+            "locked_assignments": week["locked_assignments"],
+            "options": week["options"],
+        },
+        HorizonSolveRequest: {
+            "store_id": week["store_id"],
+            "employees": week["employees"],
+            "weeks": [{"iso_week": week["iso_week"], "shifts": week["shifts"], "overrides": overrides}],
+            "carry_over": week["carry_over"],
+        },
+        RepairRequest: {
+            "request": week,
+            "assignments": week["previous_assignments"],
+            "disruption": overrides,
+            "neighborhood_days": 1,
+        },
+        ScenarioRequest: {"base": week, "scenarios": [{"name": "more", "changes": overrides}]},
+    }
+
+
+def _tree(value: Any) -> Any:
+    """Value with the type of every node, so a dict standing in for a model does not compare equal."""
+    if isinstance(value, BaseModel):
+        return type(value), {name: _tree(getattr(value, name)) for name in value.__fields__}
+    if isinstance(value, list):
+        return [_tree(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _tree(item) for key, item in value.items()}
+    return type(value), value
+
+
+@pytest.mark.parametrize("model", list(_payloads()), ids=lambda model: model.__name__)
+def test_trusted_construction_matches_validation(model: Type[BaseModel]) -> None:
+    data = _payloads()[model]
+    assert _tree(construct_trusted(model, data)) == _tree(model.parse_obj(data))
+
+
+def test_unsupported_shapes_are_rejected() -> None:
+    class Tagged(BaseModel):
+        tags: Set[str]
+
+    with pytest.raises(TypeError):
+        construct_trusted(Tagged, {"tags": ["a"]})